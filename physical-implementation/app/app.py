@@ -1,11 +1,23 @@
+import json
 from contextlib import asynccontextmanager
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 from dotenv import load_dotenv
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, StreamingResponse
 from fastapi.staticfiles import StaticFiles
 from fastapi import FastAPI, Depends, Query, Request
 from fastapi.exceptions import RequestValidationError
-from src.db import create_pool, aiomysql
+from src.cache import create_response_cache, params_key
+from src.reference_data import create_reference_resolver
+from src.serialization import JSONBytesResponse, dump_json, encode_json, json_loader
+from src.db import (
+    InstrumentedPool,
+    PoolTimeoutError,
+    aiomysql,
+    cfg,
+    create_router,
+    is_transient_lock_error,
+    retry_on_lock_errors,
+)
 from src.pages.medications import (
     MedicationIn,
     MedicationsAPIError,
@@ -24,26 +36,43 @@ from src.pages.patients import (
     PatientsResponse,
     create_patient,
     create_staff,
-    get_all_patients,
+    get_patients_page,
     get_all_staff,
+    stream_patients,
+    stream_staff,
 )
 from src.pages.core_dashboard import *
 from src.mnhs import Staff
 from src.models import *
-from typing import AsyncIterator, Optional, Literal
+from typing import Any, AsyncIterator, Callable, List, Optional, Literal, Tuple
 from fastapi.middleware.cors import CORSMiddleware
 from datetime import datetime, date, time, timezone
-from src.pages.appointments import schedule_appointment, get_all_appointments
+from src.pages.appointments import (
+    DEFAULT_PAGE_SIZE,
+    MAX_PAGE_SIZE,
+    get_all_appointments,
+    MAX_BULK_APPOINTMENTS,
+    SlotConflictError,
+    schedule_appointment,
+    schedule_appointments_bulk,
+    stream_appointments,
+)
 
 load_dotenv()
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
-    app.state.db_pool = await create_pool()
+    app.state.db = await create_router()
+    await app.state.db.start()
+    app.state.db_pool = app.state.db.primary
+    app.state.response_cache = create_response_cache()
+    app.state.reference_resolver = create_reference_resolver()
 
     yield
 
+    await app.state.db.close()
+
 
 app = FastAPI(
     title="IndexFive MNHS Management System API",
@@ -71,17 +100,137 @@ async def validation_exception_handler(request: Request, exc: RequestValidationE
     return JSONResponse(status_code=400, content={"message": message})
 
 
-async def get_conn() -> AsyncIterator[aiomysql.Connection]:
-    pool = app.state.db_pool
-    async with pool.acquire() as conn:
+@app.exception_handler(PoolTimeoutError)
+async def pool_timeout_exception_handler(request: Request, exc: PoolTimeoutError):
+    return JSONResponse(
+        status_code=503,
+        content={"message": str(exc)},
+        headers={"Retry-After": "1"},
+    )
+
+
+def _write_error_response(exc: Exception) -> JSONResponse:
+    if is_transient_lock_error(exc):
+        # Still deadlocking after retry_on_lock_errors gave up: ask to retry.
+        return JSONResponse(
+            status_code=503,
+            content={"message": "Database busy, please retry"},
+            headers={"Retry-After": "1"},
+        )
+    return JSONResponse(status_code=500, content={"message": str(exc)})
+
+
+@asynccontextmanager
+async def _checkout(
+    pool: InstrumentedPool, fallback: Optional[InstrumentedPool] = None
+) -> AsyncIterator[Tuple[InstrumentedPool, aiomysql.Connection]]:
+    """Acquire from ``pool`` (or ``fallback``) and always hand the connection back."""
+
+    try:
+        conn = await pool.acquire()
+    except Exception:
+        if fallback is None:
+            raise
+        pool, conn = fallback, await fallback.acquire()
+    try:
+        yield pool, conn
+    finally:
+        await pool.release(conn)
+
+
+async def get_conn(request: Request) -> AsyncIterator[aiomysql.Connection]:
+    """Primary connection for handlers that write.
+
+    Declare it as ``Depends(get_conn, scope="function")`` so the one COMMIT
+    runs before the response is sent; handlers never commit themselves.
+    Callbacks queued with :func:`_after_commit` run once the commit succeeded.
+    """
+
+    request.state.after_commit = []
+    async with _checkout(app.state.db.primary) as (_, conn):
         try:
             yield conn
-            if not conn.get_autocommit():
-                await conn.commit()
         except Exception:
-            if not conn.get_autocommit():
+            if conn.get_transaction_status():
                 await conn.rollback()
             raise
+        if conn.get_transaction_status():
+            await conn.commit()
+    for callback in request.state.after_commit:
+        callback()
+
+
+async def get_read_conn(request: Request) -> AsyncIterator[aiomysql.Connection]:
+    """Autocommit connection for read-only handlers.
+
+    Goes to a replica within ``MYSQL_REPLICA_MAX_LAG`` when one is configured
+    and falls back to the primary read pool otherwise, or when the replica
+    pool cannot hand out a connection. Every SELECT is its own autocommit
+    snapshot, so no COMMIT/ROLLBACK is sent. The pool used is kept on
+    ``request.state.db_pool``.
+    """
+
+    router = app.state.db
+    pool = router.read_pool()
+    fallback = router.primary_read if pool is not router.primary_read else None
+    async with _checkout(pool, fallback) as (request.state.db_pool, conn):
+        try:
+            yield conn
+        finally:
+            # Only an explicit snapshot transaction can still be open here.
+            if conn.get_transaction_status():
+                await conn.rollback()
+
+
+def _after_commit(request: Request, callback: Callable[[], None]) -> None:
+    request.state.after_commit.append(callback)
+
+
+def _invalidate_cached(request: Request, *namespaces: str) -> None:
+    """Drop cached dashboard responses once the request's write has committed."""
+
+    router = app.state.db
+    # Replicas may serve pre-write rows for up to max_lag seconds.
+    settle = router.max_lag if router.replicas else 0.0
+    _after_commit(
+        request,
+        lambda: app.state.response_cache.invalidate(
+            *namespaces, settle_seconds=settle
+        ),
+    )
+
+
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+
+
+def _wants_ndjson(request: Request) -> bool:
+    return NDJSON_MEDIA_TYPE in request.headers.get("accept", "")
+
+
+def _encode_ndjson(batch: List[Any]) -> bytes:
+    lines = [
+        item.model_dump_json() if isinstance(item, BaseModel) else json.dumps(item)
+        for item in batch
+    ]
+    return ("\n".join(lines) + "\n").encode()
+
+
+async def _ndjson_response(batches: AsyncIterator[List[Any]]) -> StreamingResponse:
+    """Stream ``batches`` one JSON record per line.
+
+    The first batch is awaited here so query and validation errors still reach
+    the caller's error handling before the 200 status is committed.
+    """
+
+    first = await anext(batches, None)
+
+    async def body() -> AsyncIterator[bytes]:
+        if first:
+            yield _encode_ndjson(first)
+        async for batch in batches:
+            yield _encode_ndjson(batch)
+
+    return StreamingResponse(body(), media_type=NDJSON_MEDIA_TYPE)
 
 
 def _utcnow_iso() -> str:
@@ -102,15 +251,32 @@ class AppointmentCreate(BaseModel):
     status: Literal["Scheduled", "Completed", "Cancelled", "No Show"]
 
 
+class AppointmentBulkCreate(BaseModel):
+    appointments: List[AppointmentCreate] = Field(
+        min_length=1, max_length=MAX_BULK_APPOINTMENTS
+    )
+
+
 # GET /api/patients
 @app.get("/api/patients", response_model=PatientsResponse)
 async def get_patients(
+    request: Request,
     query: PatientsQueryParams = Depends(),
-    conn: aiomysql.Connection = Depends(get_conn),
+    conn: aiomysql.Connection = Depends(get_read_conn),
 ):
     try:
-        patients = await get_all_patients(conn, query)
-        return PatientsResponse(patients=patients, lastSyncedAt=_utcnow_iso())
+        if _wants_ndjson(request):
+            return await _ndjson_response(stream_patients(conn, query))
+        patients, next_cursor = await get_patients_page(conn, query)
+        return JSONBytesResponse(
+            dump_json(
+                PatientsResponse.model_construct(
+                    patients=patients,
+                    nextCursor=next_cursor,
+                    lastSyncedAt=_utcnow_iso(),
+                )
+            )
+        )
     except PatientsAPIError as exc:
         return JSONResponse(
             status_code=exc.status_code, content={"message": exc.message}
@@ -121,11 +287,14 @@ async def get_patients(
 
 @app.post("/api/patients", response_model=PatientCreateResponse, status_code=201)
 async def post_patient(
+    request: Request,
     patient: PatientCreatePayload,
-    conn: aiomysql.Connection = Depends(get_conn),
+    conn: aiomysql.Connection = Depends(get_conn, scope="function"),
 ):
     try:
         created = await create_patient(conn, patient)
+        _invalidate_cached(request, "core-dashboard")
+        _after_commit(request, app.state.reference_resolver.invalidate)
         return PatientCreateResponse(patient=created)
     except PatientsAPIError as exc:
         await conn.rollback()
@@ -139,15 +308,27 @@ async def post_patient(
 
 # GET /api/staff - Simple version
 @app.get("/api/staff")
-async def get_staff(conn: aiomysql.Connection = Depends(get_conn)):
+async def get_staff(
+    request: Request, conn: aiomysql.Connection = Depends(get_read_conn)
+):
+    if _wants_ndjson(request):
+        return await _ndjson_response(stream_staff(conn))
     staff = await get_all_staff(conn)
-    return {"staff": staff, "lastSyncedAt": datetime.now().isoformat()}
+    return JSONBytesResponse(
+        encode_json({"staff": staff, "lastSyncedAt": datetime.now().isoformat()})
+    )
 
 
 @app.post("/api/staff", status_code=201)
-async def post_staff(staff: Staff, conn: aiomysql.Connection = Depends(get_conn)):
+async def post_staff(
+    request: Request,
+    staff: Staff,
+    conn: aiomysql.Connection = Depends(get_conn, scope="function"),
+):
     try:
         created = await create_staff(conn, staff.model_dump())
+        _invalidate_cached(request, "core-dashboard")
+        _after_commit(request, app.state.reference_resolver.invalidate)
         return {"staff": created, "message": "Staff created"}
     except Exception as e:
         await conn.rollback()
@@ -158,21 +339,40 @@ async def post_staff(staff: Staff, conn: aiomysql.Connection = Depends(get_conn)
 @app.get("/api/core-dashboard", response_model=CoreDashboardResponse)
 async def get_core_dashboard_stats(
     query: QueryCoreDashboardStats = Depends(),
-    conn: aiomysql.Connection = Depends(get_conn),
+    conn: aiomysql.Connection = Depends(get_read_conn),
 ):
     try:
-        return await get_core_dashboard_stats_mnhs(conn, query)
+        body = await app.state.response_cache.get_or_load(
+            "core-dashboard",
+            params_key(query),
+            json_loader(lambda: get_core_dashboard_stats_mnhs(conn, query)),
+        )
+        return JSONBytesResponse(body)
     except Exception as e:
         return JSONResponse(status_code=500, content={"message": str(e)})
 
 
 @app.get("/api/billing", response_model=BillingResponse)
 async def get_billing(
+    request: Request,
     query: BillingQueryParams = Depends(),
-    conn: aiomysql.Connection = Depends(get_conn),
+    conn: aiomysql.Connection = Depends(get_read_conn),
 ):
     try:
-        return await get_billing_dashboard(conn, query)
+        body = await app.state.response_cache.get_or_load(
+            "billing",
+            params_key(query.to_metadata_filters()),
+            json_loader(
+                lambda: get_billing_dashboard(
+                    conn,
+                    query,
+                    pool=request.state.db_pool,
+                    max_connections=cfg["fanout_connections"],
+                    consistent_snapshot=cfg["fanout_snapshot"],
+                )
+            ),
+        )
+        return JSONBytesResponse(body)
     except BillingAPIError as exc:
         return JSONResponse(status_code=exc.status_code, content=exc.to_payload())
     except Exception as exc:
@@ -188,12 +388,13 @@ async def get_billing(
     status_code=201,
 )
 async def post_billing_expense(
+    request: Request,
     payload: CreateExpenseRequest,
-    conn: aiomysql.Connection = Depends(get_conn),
+    conn: aiomysql.Connection = Depends(get_conn, scope="function"),
 ):
     try:
         expense = await create_billing_expense(conn, payload)
-        await conn.commit()
+        _invalidate_cached(request, "billing")
         return CreateExpenseResponse(expense=expense, message="Expense captured")
     except BillingAPIError as exc:
         await conn.rollback()
@@ -206,13 +407,42 @@ async def post_billing_expense(
         )
 
 
+@app.post(
+    "/api/billing/expenses/recompute",
+    response_model=RecomputeExpensesResponse,
+)
+async def post_billing_expenses_recompute(
+    request: Request,
+    payload: RecomputeExpensesRequest,
+    conn: aiomysql.Connection = Depends(get_conn, scope="function"),
+):
+    try:
+        expenses = await recompute_expenses(conn, payload.caids)
+        _invalidate_cached(request, "billing")
+        return RecomputeExpensesResponse(expenses=expenses)
+    except BillingAPIError as exc:
+        await conn.rollback()
+        return JSONResponse(status_code=exc.status_code, content=exc.to_payload())
+    except Exception as exc:
+        await conn.rollback()
+        return JSONResponse(
+            status_code=500,
+            content={"message": str(exc), "code": "BILLING_500"},
+        )
+
+
 @app.get("/api/medications", response_model=MedicationsResponse)
 async def get_medications(
     query: MedicationsQueryParams = Depends(),
-    conn: aiomysql.Connection = Depends(get_conn),
+    conn: aiomysql.Connection = Depends(get_read_conn),
 ):
     try:
-        return await get_low_stock(conn, query)
+        body = await app.state.response_cache.get_or_load(
+            "medications",
+            params_key(query),
+            json_loader(lambda: get_low_stock(conn, query)),
+        )
+        return JSONBytesResponse(body)
     except MedicationsAPIError as exc:
         return JSONResponse(
             status_code=exc.status_code, content={"message": exc.message}
@@ -223,11 +453,13 @@ async def get_medications(
 
 @app.post("/api/medications", status_code=201)
 async def post_medication(
+    request: Request,
     body: MedicationIn,
-    conn: aiomysql.Connection = Depends(get_conn),
+    conn: aiomysql.Connection = Depends(get_conn, scope="function"),
 ):
     try:
         med = await create_medication(conn, body)
+        _invalidate_cached(request, "medications", "core-dashboard")
         return {
             "medication": med,
             "message": "Medication created",
@@ -244,8 +476,9 @@ async def post_medication(
 
 @app.post("/api/medications/stock", status_code=201)
 async def post_medication_stock(
+    request: Request,
     body: StockEntryIn,
-    conn: aiomysql.Connection = Depends(get_conn),
+    conn: aiomysql.Connection = Depends(get_conn, scope="function"),
 ):
     if body.qtyReceived <= 0:
         return JSONResponse(
@@ -260,6 +493,7 @@ async def post_medication_stock(
 
     try:
         stock = await insert_stock_entry(conn, body)
+        _invalidate_cached(request, "medications", "core-dashboard", "billing")
         return {
             "stockEntry": stock,
             "message": "Stock entry recorded",
@@ -274,19 +508,52 @@ async def post_medication_stock(
         return JSONResponse(status_code=500, content={"message": str(exc)})
 
 
+@app.get("/api/pool/stats")
+async def get_pool_stats():
+    return app.state.db.stats()
+
+
+@app.get("/api/cache/stats")
+async def get_cache_stats():
+    return {
+        **app.state.response_cache.stats(),
+        "referenceData": app.state.reference_resolver.stats(),
+    }
+
+
 # GET /api/appointments
 @app.get("/api/appointments")
 async def get_appointments(
+    request: Request,
     date_range: Optional[str] = Query(default=None, alias="range"),
     status: Optional[str] = Query(default=None),
     hospital: Optional[str] = Query(default=None),
-    conn: aiomysql.Connection = Depends(get_conn),
+    limit: int = Query(default=DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = Query(default=None),
+    count: Optional[Literal["estimate"]] = Query(default=None),
+    conn: aiomysql.Connection = Depends(get_read_conn),
 ):
     try:
+        if _wants_ndjson(request):
+            return await _ndjson_response(
+                stream_appointments(
+                    conn,
+                    date_range=date_range,
+                    status=status,
+                    hospital=hospital,
+                    cursor=cursor,
+                )
+            )
         data = await get_all_appointments(
-            conn, date_range=date_range, status=status, hospital=hospital
+            conn,
+            date_range=date_range,
+            status=status,
+            hospital=hospital,
+            limit=limit,
+            cursor=cursor,
+            count=count,
         )
-        return data
+        return JSONBytesResponse(encode_json(data))
     except ValueError as exc:
         return JSONResponse(status_code=400, content={"message": str(exc)})
     except Exception as exc:
@@ -295,28 +562,60 @@ async def get_appointments(
 
 @app.post("/api/appointments", status_code=201)
 async def post_appointments(
-    body: AppointmentCreate, conn: aiomysql.Connection = Depends(get_conn)
+    request: Request,
+    body: AppointmentCreate,
+    conn: aiomysql.Connection = Depends(get_conn, scope="function"),
 ):
     try:
-        result = await schedule_appointment(
-            conn=conn,
-            date_=body.date,
-            time_=body.time,
-            hospital_name=body.hospital,
-            department_name=body.department,
-            patient_name=body.patient,
-            staff_name=body.staff,
-            reason=body.reason,
-            status=body.status,
-            appointment_id=body.id,
+        result = await retry_on_lock_errors(
+            conn,
+            lambda: schedule_appointment(
+                conn=conn,
+                date_=body.date,
+                time_=body.time,
+                hospital_name=body.hospital,
+                department_name=body.department,
+                patient_name=body.patient,
+                staff_name=body.staff,
+                reason=body.reason,
+                status=body.status,
+                appointment_id=body.id,
+                resolver=app.state.reference_resolver,
+            ),
         )
+        _invalidate_cached(request, "core-dashboard")
         return result
+    except SlotConflictError as exc:
+        await conn.rollback()
+        return JSONResponse(status_code=409, content={"message": str(exc)})
     except ValueError as exc:
         await conn.rollback()
         return JSONResponse(status_code=400, content={"message": str(exc)})
     except Exception as exc:
         await conn.rollback()
-        return JSONResponse(status_code=500, content={"message": str(exc)})
+        return _write_error_response(exc)
+
+
+@app.post("/api/appointments/bulk")
+async def post_appointments_bulk(
+    request: Request,
+    body: AppointmentBulkCreate,
+    conn: aiomysql.Connection = Depends(get_conn, scope="function"),
+):
+    try:
+        items = [item.model_dump() for item in body.appointments]
+        result = await retry_on_lock_errors(
+            conn,
+            lambda: schedule_appointments_bulk(
+                conn, items, resolver=app.state.reference_resolver
+            ),
+        )
+        if result["created"]:
+            _invalidate_cached(request, "core-dashboard")
+        return result
+    except Exception as exc:
+        await conn.rollback()
+        return _write_error_response(exc)
 
 
 #
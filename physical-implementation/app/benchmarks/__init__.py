@@ -0,0 +1,5 @@
+"""Performance scripts for the MNHS API.
+
+Run them from ``physical-implementation/app`` as ``python -m benchmarks.<name>``;
+they read the same ``.env`` connection settings as the API.
+"""
@@ -0,0 +1,167 @@
+"""Concurrent bookings of the same staff slots: no double bookings, throughput.
+
+From ``physical-implementation/app``::
+
+    python -m benchmarks.booking_contention [--workers 20] [--slots 5] [--attempts 200]
+
+``--workers`` connections book ``--attempts`` appointments between them, each
+picking one of ``--slots`` slots of a single staff member at random, through
+``schedule_appointment`` wrapped in ``retry_on_lock_errors`` exactly as
+``POST /api/appointments`` does. Every slot can be won once; everything else
+must end as a conflict. The run reports outcomes, lock retries, latency and
+throughput, checks that no slot holds two appointments, and deletes the rows
+it created. Bookings use a date in 2099 so they never meet real data.
+"""
+
+import argparse
+import asyncio
+import random
+import time as time_module
+from collections import Counter
+from datetime import date, time
+from typing import Dict, List, Tuple
+
+import aiomysql
+
+from benchmarks.common import connect, format_stats, summarize
+from src.db import retry_on_lock_errors
+from src.pages.appointments import SlotConflictError, schedule_appointment
+
+REASON = "contention-benchmark"
+BOOKING_DATE = date(2099, 1, 1)
+
+
+async def pick_references(conn: aiomysql.Connection) -> Tuple[str, str, str, str]:
+    """Return ``(hospital, department, patient id, staff id)`` from the data set."""
+
+    async with conn.cursor() as cur:
+        await cur.execute(
+            "SELECT h.Name, d.Name FROM Department d"
+            " JOIN Hospital h ON h.HID = d.HID ORDER BY d.DEP_ID LIMIT 1"
+        )
+        hospital, department = await cur.fetchone()
+        await cur.execute("SELECT MIN(IID) FROM Patient")
+        (iid,) = await cur.fetchone()
+        await cur.execute("SELECT MIN(STAFF_ID) FROM Staff")
+        (staff_id,) = await cur.fetchone()
+    return hospital, department, str(iid), str(staff_id)
+
+
+async def worker(
+    references: Tuple[str, str, str, str],
+    slots: List[time],
+    queue: "asyncio.Queue[int]",
+    outcomes: Counter,
+    latencies: List[float],
+) -> None:
+    hospital, department, patient, staff = references
+    conn = await connect(autocommit=False)
+    try:
+        while True:
+            try:
+                queue.get_nowait()
+            except asyncio.QueueEmpty:
+                return
+            slot = random.choice(slots)
+
+            async def book() -> Dict:
+                outcomes["attempts"] += 1
+                return await schedule_appointment(
+                    conn,
+                    BOOKING_DATE,
+                    slot,
+                    hospital,
+                    department,
+                    patient,
+                    staff,
+                    REASON,
+                )
+
+            started = time_module.perf_counter()
+            try:
+                await retry_on_lock_errors(conn, book)
+                await conn.commit()
+                outcomes["booked"] += 1
+            except SlotConflictError:
+                await conn.rollback()
+                outcomes["conflict"] += 1
+            except aiomysql.OperationalError as exc:
+                await conn.rollback()
+                outcomes[f"error {exc.args[0]}"] += 1
+            latencies.append((time_module.perf_counter() - started) * 1000)
+    finally:
+        conn.close()
+
+
+async def double_bookings(conn: aiomysql.Connection) -> List[Tuple]:
+    async with conn.cursor() as cur:
+        await cur.execute(
+            "SELECT ca.STAFF_ID, ca.Date, ca.Time, COUNT(*)"
+            " FROM ClinicalActivity ca JOIN Appointment ap ON ap.CAID = ca.CAID"
+            " WHERE ap.Reason = %s"
+            " GROUP BY ca.STAFF_ID, ca.Date, ca.Time HAVING COUNT(*) > 1",
+            (REASON,),
+        )
+        return list(await cur.fetchall())
+
+
+async def cleanup(conn: aiomysql.Connection) -> None:
+    async with conn.cursor() as cur:
+        await cur.execute(
+            "SELECT ap.CAID FROM Appointment ap WHERE ap.Reason = %s", (REASON,)
+        )
+        caids = [row[0] for row in await cur.fetchall()]
+        if caids:
+            placeholders = ", ".join(["%s"] * len(caids))
+            await cur.execute(
+                f"DELETE FROM Appointment WHERE CAID IN ({placeholders})", caids
+            )
+            await cur.execute(
+                f"DELETE FROM ClinicalActivity WHERE CAID IN ({placeholders})", caids
+            )
+
+
+async def main(workers: int, slot_count: int, attempts: int) -> None:
+    admin = await connect()
+    try:
+        await cleanup(admin)
+        references = await pick_references(admin)
+        slots = [time(8 + index // 4, (index % 4) * 15) for index in range(slot_count)]
+        queue: "asyncio.Queue[int]" = asyncio.Queue()
+        for index in range(attempts):
+            queue.put_nowait(index)
+
+        outcomes: Counter = Counter()
+        latencies: List[float] = []
+        started = time_module.perf_counter()
+        await asyncio.gather(
+            *(
+                worker(references, slots, queue, outcomes, latencies)
+                for _ in range(workers)
+            )
+        )
+        elapsed = time_module.perf_counter() - started
+
+        doubles = await double_bookings(admin)
+        print(f"workers={workers} slots={slot_count} requests={attempts}")
+        print(f"outcomes: {dict(outcomes)}")
+        print(f"lock retries: {outcomes['attempts'] - len(latencies)}")
+        print(format_stats("request latency", summarize(latencies)))
+        print(f"throughput: {len(latencies) / elapsed:.1f} requests/s")
+        print(f"double-booked slots: {len(doubles)} {doubles if doubles else ''}")
+        if outcomes["booked"] != slot_count:
+            print(f"warning: {outcomes['booked']} bookings for {slot_count} slots")
+    finally:
+        await cleanup(admin)
+        admin.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--workers", type=int, default=20)
+    parser.add_argument("--slots", type=int, default=5)
+    parser.add_argument("--attempts", type=int, default=200)
+    args = parser.parse_args()
+    if not 1 <= args.slots <= 64:
+        parser.error("--slots must be between 1 and 64 (15-minute slots from 08:00)")
+    asyncio.run(main(args.workers, args.slots, args.attempts))
@@ -0,0 +1,203 @@
+"""Appointment insert latency against table size, old vs new double-booking check.
+
+From ``physical-implementation/app``::
+
+    python -m benchmarks.booking_insert_latency [--sizes 1000,10000,100000] [--runs 200]
+
+Works on scratch copies of ``ClinicalActivity``/``Appointment`` (dropped on
+exit), so the real tables and their summary triggers are never touched.
+"legacy" carries the original self-join trigger and no slot index; "point"
+carries the ``assert_staff_slot_free`` check and
+``idx_ClinicalActivity_STAFF_ID_Date_Time``. At each size both copies hold the
+same booked history, then ``--runs`` bookings (activity + appointment, each
+committed) are timed against it.
+"""
+
+import argparse
+import asyncio
+import time as time_module
+from datetime import date, time, timedelta
+from typing import Dict, List, Tuple
+
+import aiomysql
+
+from benchmarks.common import connect, format_stats, summarize
+
+STAFF_COUNT = 200
+SLOTS_PER_DAY = 32
+HISTORY_CHUNK = 1000
+BASE_DATE = date(2000, 1, 1)
+SLOT_INDEX = "idx_ClinicalActivity_STAFF_ID_Date_Time"
+
+LEGACY_CHECK = """
+    IF EXISTS (
+        SELECT 1 FROM {ca} C
+        JOIN {appt} A ON A.CAID = C.CAID
+        JOIN {ca} C2
+          ON C2.CAID = NEW.CAID
+         AND C2.STAFF_ID = C.STAFF_ID
+         AND C.Time = C2.Time
+         AND C.Date = C2.Date
+         AND C.CAID <> C2.CAID
+    ) THEN
+        SIGNAL SQLSTATE '45000' SET MESSAGE_TEXT = 'Double booking';
+    END IF;
+"""
+
+POINT_CHECK = """
+    DECLARE v_staff_id INT;
+    DECLARE v_date DATE;
+    DECLARE v_time TIME;
+    SELECT C.STAFF_ID, C.Date, C.Time INTO v_staff_id, v_date, v_time
+    FROM {ca} C WHERE C.CAID = NEW.CAID;
+    IF v_time IS NOT NULL AND EXISTS (
+        SELECT 1 FROM {ca} C
+        JOIN {appt} A ON A.CAID = C.CAID
+        WHERE C.STAFF_ID = v_staff_id
+          AND C.Date = v_date
+          AND C.Time = v_time
+          AND C.CAID <> NEW.CAID
+    ) THEN
+        SIGNAL SQLSTATE '45000' SET MESSAGE_TEXT = 'Double booking';
+    END IF;
+"""
+
+VARIANTS = {
+    "legacy": LEGACY_CHECK,
+    "point": POINT_CHECK,
+}
+
+
+def tables(variant: str) -> Tuple[str, str]:
+    return f"bench_{variant}_ca", f"bench_{variant}_appt"
+
+
+def activity_row(i: int) -> Tuple[int, int, int, date, time]:
+    """``(IID, STAFF_ID, DEP_ID, Date, Time)`` with a distinct slot per ``i``."""
+
+    staff_id = i % STAFF_COUNT + 1
+    k = i // STAFF_COUNT
+    minutes = 8 * 60 + (k % SLOTS_PER_DAY) * 15
+    day = BASE_DATE + timedelta(days=k // SLOTS_PER_DAY)
+    return 1, staff_id, 1, day, time(minutes // 60, minutes % 60)
+
+
+async def execute(conn: aiomysql.Connection, sql: str, args=None) -> None:
+    async with conn.cursor() as cur:
+        await cur.execute(sql, args)
+
+
+async def create_tables(conn: aiomysql.Connection) -> None:
+    for variant in VARIANTS:
+        ca, appt = tables(variant)
+        await execute(conn, f"DROP TABLE IF EXISTS {appt}, {ca}")
+        await execute(conn, f"CREATE TABLE {ca} LIKE ClinicalActivity")
+        await execute(conn, f"CREATE TABLE {appt} LIKE Appointment")
+        async with conn.cursor() as cur:
+            await cur.execute(
+                "SELECT 1 FROM information_schema.STATISTICS"
+                " WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s"
+                " AND INDEX_NAME = %s",
+                (ca, SLOT_INDEX),
+            )
+            has_slot_index = bool(await cur.fetchall())
+        if variant == "legacy" and has_slot_index:
+            await execute(conn, f"ALTER TABLE {ca} DROP INDEX {SLOT_INDEX}")
+        elif variant == "point" and not has_slot_index:
+            await execute(
+                conn, f"CREATE INDEX {SLOT_INDEX} ON {ca}(STAFF_ID, Date, Time)"
+            )
+
+
+async def set_trigger(conn: aiomysql.Connection, variant: str, enabled: bool) -> None:
+    ca, appt = tables(variant)
+    name = f"trg_{appt}_before_insert"
+    await execute(conn, f"DROP TRIGGER IF EXISTS {name}")
+    if enabled:
+        body = VARIANTS[variant].format(ca=ca, appt=appt)
+        await execute(
+            conn,
+            f"CREATE TRIGGER {name} BEFORE INSERT ON {appt}"
+            f" FOR EACH ROW BEGIN {body} END",
+        )
+
+
+async def grow_history(
+    conn: aiomysql.Connection, variant: str, start: int, stop: int
+) -> None:
+    """Book slots ``start..stop-1`` with the trigger off (history, not timed)."""
+
+    ca, appt = tables(variant)
+    async with conn.cursor() as cur:
+        for chunk_start in range(start, stop, HISTORY_CHUNK):
+            chunk = range(chunk_start, min(stop, chunk_start + HISTORY_CHUNK))
+            await cur.executemany(
+                f"INSERT INTO {ca} (IID, STAFF_ID, DEP_ID, Date, Time)"
+                " VALUES (%s, %s, %s, %s, %s)",
+                [activity_row(i) for i in chunk],
+            )
+            first_caid = cur.lastrowid
+            await cur.execute(
+                f"INSERT INTO {appt} (CAID, Status, Reason)"
+                " SELECT CAID, 'Completed', 'history'"
+                f" FROM {ca} WHERE CAID >= %s",
+                (first_caid,),
+            )
+
+
+async def time_bookings(
+    conn: aiomysql.Connection, variant: str, start: int, runs: int
+) -> Dict[str, float]:
+    ca, appt = tables(variant)
+    samples: List[float] = []
+    async with conn.cursor() as cur:
+        for i in range(start, start + runs):
+            started = time_module.perf_counter()
+            await cur.execute(
+                f"INSERT INTO {ca} (IID, STAFF_ID, DEP_ID, Date, Time)"
+                " VALUES (%s, %s, %s, %s, %s)",
+                activity_row(i),
+            )
+            await cur.execute(
+                f"INSERT INTO {appt} (CAID, Status, Reason)"
+                " VALUES (%s, 'Scheduled', 'benchmark')",
+                (cur.lastrowid,),
+            )
+            samples.append((time_module.perf_counter() - started) * 1000)
+    return summarize(samples)
+
+
+async def main(sizes: List[int], runs: int) -> None:
+    conn = await connect()
+    try:
+        await create_tables(conn)
+        booked = 0
+        for size in sorted(sizes):
+            for variant in VARIANTS:
+                await set_trigger(conn, variant, enabled=False)
+                await grow_history(conn, variant, booked, size)
+                await set_trigger(conn, variant, enabled=True)
+            booked = max(booked, size)
+            print(f"=== {size} booked activities ===")
+            for variant in VARIANTS:
+                stats = await time_bookings(conn, variant, booked, runs)
+                print(format_stats(variant, stats))
+            booked += runs
+            print()
+    finally:
+        for variant in VARIANTS:
+            ca, appt = tables(variant)
+            await execute(conn, f"DROP TABLE IF EXISTS {appt}, {ca}")
+        conn.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--sizes",
+        default="1000,10000,100000",
+        help="comma-separated history sizes (booked activities)",
+    )
+    parser.add_argument("--runs", type=int, default=200)
+    args = parser.parse_args()
+    asyncio.run(main([int(size) for size in args.sizes.split(",")], args.runs))
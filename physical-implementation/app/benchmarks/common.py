@@ -0,0 +1,53 @@
+"""Shared helpers for the benchmark scripts."""
+
+import statistics
+import time
+from typing import Any, Awaitable, Callable, Dict, List
+
+import aiomysql
+
+from src.db import ROW_DECODERS, cfg
+
+
+async def connect(**overrides: Any) -> aiomysql.Connection:
+    """Open a standalone connection with the API's ``.env`` settings and decoders."""
+
+    options = dict(
+        host=cfg["host"],
+        port=cfg["port"],
+        user=cfg["user"],
+        password=cfg["password"],
+        db=cfg["database"],
+        autocommit=True,
+        conv=ROW_DECODERS,
+    )
+    options.update(overrides)
+    return await aiomysql.connect(**options)
+
+
+async def timed(fn: Callable[[], Awaitable[Any]], runs: int) -> Dict[str, float]:
+    """Await ``fn`` ``runs`` times and return latency percentiles in ms."""
+
+    samples: List[float] = []
+    for _ in range(runs):
+        started = time.perf_counter()
+        await fn()
+        samples.append((time.perf_counter() - started) * 1000)
+    return summarize(samples)
+
+
+def summarize(samples_ms: List[float]) -> Dict[str, float]:
+    ordered = sorted(samples_ms)
+    return {
+        "runs": len(ordered),
+        "p50": statistics.median(ordered),
+        "p95": ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))],
+        "max": ordered[-1],
+    }
+
+
+def format_stats(label: str, stats: Dict[str, float]) -> str:
+    return (
+        f"{label:<28} runs={stats['runs']:<5} p50={stats['p50']:.2f}ms "
+        f"p95={stats['p95']:.2f}ms max={stats['max']:.2f}ms"
+    )
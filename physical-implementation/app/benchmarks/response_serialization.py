@@ -0,0 +1,137 @@
+"""Per-row cost of building and serializing a large patients response.
+
+From ``physical-implementation/app``::
+
+    python -m benchmarks.response_serialization [--rows 100000] [--runs 3]
+
+Needs no database: ``--rows`` synthetic rows shaped like the patients query
+output (as decoded under ``iso_dates``) go through both paths. "validated" builds every record with
+``PatientRecord.model_validate`` and hands the response to FastAPI's
+``response_model`` serialization (dump, re-validate, encode). "trusted" is
+what ``GET /api/patients`` does now: one ``TypeAdapter`` validation for the
+whole page, ``model_construct`` for the envelope and one ``dump_json``
+straight to bytes. Both bodies are checked to be identical.
+"""
+
+import argparse
+import asyncio
+import random
+import time as time_module
+from datetime import date, timedelta
+from typing import Any, Callable, Dict, List, Tuple
+
+from fastapi.responses import JSONResponse
+from fastapi.routing import serialize_response
+from fastapi.utils import create_model_field
+
+from benchmarks.common import format_stats, summarize
+from src.db import RowLayout
+from src.pages.patients import (
+    PATIENT_COLUMNS,
+    PatientRecord,
+    PatientsResponse,
+    _normalize_patient_rows,
+    _patient_payloads,
+)
+from src.serialization import dump_json
+
+LAST_SYNCED_AT = "2025-01-01T00:00:00Z"
+RESPONSE_FIELD = create_model_field(
+    "Response", PatientsResponse, mode="serialization"
+)
+LAYOUT = RowLayout([(name,) for name in PATIENT_COLUMNS])
+
+
+def synthetic_rows(count: int, seed: int = 7) -> List[Tuple[Any, ...]]:
+    rng = random.Random(seed)
+    rows = []
+    for iid in range(1, count + 1):
+        insured = rng.random() < 0.7
+        visit = rng.random() < 0.4
+        rows.append(
+            {
+                "iid": iid,
+                "cin": f"ab{iid:06d}",
+                "name": f"Patient {iid}",
+                "sex": rng.choice(["M", "F"]),
+                "birthDate": (
+                    date(1950, 1, 1) + timedelta(days=rng.randrange(25000))
+                ).isoformat(),
+                "bloodGroup": rng.choice(["A+", "O-", "B+", None]),
+                "phone": f"06{iid:08d}",
+                "email": None,
+                "city": rng.choice(["Rabat", "Fes", None]),
+                "insurance": rng.choice(["CNOPS", "CNSS"]) if insured else None,
+                "policyNumber": f"P-{iid}" if insured else None,
+                "status": rng.choice(["Admitted", "Outpatient"]),
+                "nextVisitDate": "2030-01-01" if visit else None,
+                "nextVisitTime": "09:30" if visit else None,
+                "nextVisitHospital": "Hospital 1" if visit else None,
+                "nextVisitDepartment": "Cardiology" if visit else None,
+                "nextVisitReason": "Follow-up" if visit else None,
+            }
+        )
+    return [tuple(row[name] for name in PATIENT_COLUMNS) for row in rows]
+
+
+async def validated(rows: List[Tuple[Any, ...]]) -> Tuple[bytes, float]:
+    started = time_module.perf_counter()
+    patients = [
+        PatientRecord.model_validate(payload)
+        for payload in _patient_payloads(LAYOUT, rows)
+    ]
+    response = PatientsResponse(
+        patients=patients, nextCursor=None, lastSyncedAt=LAST_SYNCED_AT
+    )
+    built = time_module.perf_counter() - started
+    content = await serialize_response(field=RESPONSE_FIELD, response_content=response)
+    return JSONResponse(content).body, built
+
+
+async def trusted(rows: List[Tuple[Any, ...]]) -> Tuple[bytes, float]:
+    started = time_module.perf_counter()
+    patients = _normalize_patient_rows(LAYOUT, rows)
+    response = PatientsResponse.model_construct(
+        patients=patients, nextCursor=None, lastSyncedAt=LAST_SYNCED_AT
+    )
+    built = time_module.perf_counter() - started
+    return dump_json(response), built
+
+
+async def measure(
+    path: Callable[[List[Tuple[Any, ...]]], Any], rows: List[Tuple[Any, ...]], runs: int
+) -> Tuple[bytes, Dict[str, List[float]]]:
+    samples: Dict[str, List[float]] = {"build": [], "serialize": [], "total": []}
+    body = b""
+    for _ in range(runs):
+        started = time_module.perf_counter()
+        body, built = await path(rows)
+        total = time_module.perf_counter() - started
+        samples["build"].append(built * 1000)
+        samples["serialize"].append((total - built) * 1000)
+        samples["total"].append(total * 1000)
+    return body, samples
+
+
+async def main(row_count: int, runs: int) -> None:
+    rows = synthetic_rows(row_count)
+    print(f"rows={row_count} runs={runs}")
+    bodies = {}
+    medians = {}
+    for name, path in (("validated", validated), ("trusted", trusted)):
+        bodies[name], samples = await measure(path, rows, runs)
+        for stage, values in samples.items():
+            stats = summarize(values)
+            print(format_stats(f"{name} {stage}", stats))
+        medians[name] = summarize(samples["total"])["p50"]
+        print(f"{name} per row: {medians[name] * 1000 / row_count:.2f}us")
+    print(f"speedup: {medians['validated'] / medians['trusted']:.1f}x")
+    print(f"identical bodies: {bodies['validated'] == bodies['trusted']}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=100000)
+    parser.add_argument("--runs", type=int, default=3)
+    args = parser.parse_args()
+    asyncio.run(main(args.rows, args.runs))
@@ -0,0 +1,294 @@
+"""Dict-cursor vs tuple-cursor row pipelines: throughput, memory and GC.
+
+From ``physical-implementation/app``::
+
+    python -m benchmarks.row_pipeline [--rows 500000] [--lists appointments,staff,patients]
+
+Needs no database. For each list endpoint, ``--rows`` synthetic result rows
+(the tuples the driver decodes) go through two pipelines:
+
+- "dict" is the previous path. ``DictCursor`` turns every tuple into a dict,
+  the handler shapes a second dict or payload from it, and the response goes
+  through FastAPI's ``jsonable_encoder`` (patients: one ``TypeAdapter`` batch
+  and ``dump_json``, as before).
+- "tuple" is the current path: tuples read through ``RowLayout`` getters,
+  shaped once and encoded with ``encode_json`` (patients: ``dump_json``).
+
+Each pipeline is timed, then run again under ``tracemalloc`` for its peak
+allocation on top of the input rows. GC collections counted during the timed
+run are reported too. Both pipelines must produce the same response body.
+"""
+
+import argparse
+import gc
+import random
+import time as time_module
+import tracemalloc
+from datetime import date, time, timedelta
+from typing import Any, Callable, Dict, List, Sequence, Tuple
+
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+
+from src.db import RowLayout
+from src.pages.appointments import APPOINTMENT_COLUMNS, appointment_formatter
+from src.pages.patients import (
+    PATIENT_COLUMNS,
+    PatientsResponse,
+    _PATIENT_RECORDS,
+    _normalize_patient_rows,
+    _shape_staff_rows,
+)
+from src.serialization import dump_json, encode_json
+
+STAFF_COLUMNS = ("id", "name", "status", "department_names", "hospital_names")
+LAST_SYNCED_AT = "2025-01-01T00:00:00Z"
+
+Rows = List[Tuple[Any, ...]]
+
+
+def appointment_rows(count: int, rng: random.Random) -> Rows:
+    return [
+        (
+            caid,
+            (date(2024, 1, 1) + timedelta(days=caid % 700)).isoformat(),
+            time(8 + caid % 10, 15 * (caid % 4)),
+            f"Hospital {caid % 12}",
+            rng.choice(["Cardiology", "Oncology", "Pediatrics"]),
+            f"Patient {caid % 90000}",
+            f"Dr. Staff {caid % 800}",
+            "Follow-up",
+            rng.choice(["Scheduled", "Completed", "Cancelled", "No Show"]),
+        )
+        for caid in range(1, count + 1)
+    ]
+
+
+def staff_rows(count: int, rng: random.Random) -> Rows:
+    return [
+        (
+            staff_id,
+            rng.choice(["Dr.", "Nurse", "Technician", "Clerk"]) + f" {staff_id}",
+            "Active",
+            "Cardiology,Oncology" if staff_id % 3 else None,
+            f"Hospital {staff_id % 12}",
+        )
+        for staff_id in range(1, count + 1)
+    ]
+
+
+def patient_rows(count: int, rng: random.Random) -> Rows:
+    rows = []
+    for iid in range(1, count + 1):
+        insured = rng.random() < 0.7
+        visit = rng.random() < 0.4
+        rows.append(
+            (
+                iid,
+                f"AB{iid:06d}",
+                f"Patient {iid}",
+                rng.choice(["M", "F"]),
+                (date(1950, 1, 1) + timedelta(days=iid % 25000)).isoformat(),
+                rng.choice(["A+", "O-", "B+", None]),
+                f"06{iid:08d}",
+                None,
+                rng.choice(["Rabat", "Fes", "N/A"]),
+                rng.choice(["CNOPS", "CNSS"]) if insured else "None",
+                rng.choice(["Admitted", "Outpatient"]),
+                f"Policy {iid}" if insured else None,
+                "2030-01-01" if visit else None,
+                "09:30" if visit else None,
+                "Hospital 1" if visit else None,
+                "Cardiology" if visit else None,
+                "Follow-up" if visit else None,
+            )
+        )
+    return rows
+
+
+def as_dicts(columns: Sequence[str], rows: Rows) -> List[Dict[str, Any]]:
+    """What ``DictCursor`` hands back for ``rows``."""
+
+    return [dict(zip(columns, row)) for row in rows]
+
+
+def render(content: Any) -> bytes:
+    """FastAPI's path for a returned dict: ``jsonable_encoder`` then render."""
+
+    return JSONResponse(jsonable_encoder(content)).body
+
+
+# The dict pipelines as they were before the switch to tuple cursors.
+
+
+def dict_appointments(rows: Rows) -> bytes:
+    appointments = []
+    for row in as_dicts(APPOINTMENT_COLUMNS, rows):
+        t = row["time"]
+        appointments.append(
+            {
+                "id": f"APT-{row['id']}",
+                "date": row["date"],
+                "time": t.strftime("%H:%M") if t is not None else None,
+                "hospital": row.get("hospital"),
+                "department": row.get("department"),
+                "patient": row.get("patient"),
+                "staff": row.get("staff"),
+                "reason": row.get("reason"),
+                "status": row.get("status"),
+            }
+        )
+    return render({"appointments": appointments, "lastSyncedAt": LAST_SYNCED_AT})
+
+
+def dict_staff(rows: Rows) -> bytes:
+    staff_list = as_dicts(STAFF_COLUMNS, rows)
+    for staff in staff_list:
+        if staff["name"].startswith("Dr."):
+            staff["role"] = "Doctor"
+        elif staff["name"].startswith("Nurse"):
+            staff["role"] = "Nurse"
+        elif staff["name"].startswith("Technician"):
+            staff["role"] = "Technician"
+        else:
+            staff["role"] = "Admin"
+        staff["departments"] = (
+            staff["department_names"].split(",") if staff["department_names"] else []
+        )
+        staff["hospitals"] = (
+            staff["hospital_names"].split(",") if staff["hospital_names"] else []
+        )
+        del staff["department_names"]
+        del staff["hospital_names"]
+    return render({"staff": staff_list, "lastSyncedAt": LAST_SYNCED_AT})
+
+
+def dict_patients(rows: Rows) -> bytes:
+    payloads = []
+    for row in as_dicts(PATIENT_COLUMNS, rows):
+        insurance = row.get("insurance") or "None"
+        insurance_status = "Active" if insurance != "None" else "Self-Pay"
+        next_visit = None
+        if row.get("nextVisitDate"):
+            next_visit = {
+                "date": row.get("nextVisitDate"),
+                "time": row.get("nextVisitTime"),
+                "hospital": row.get("nextVisitHospital"),
+                "department": row.get("nextVisitDepartment"),
+                "reason": row.get("nextVisitReason"),
+            }
+        payloads.append(
+            {
+                "iid": int(row.get("iid", 0)),
+                "cin": (row.get("cin") or "").upper(),
+                "name": row.get("name"),
+                "sex": row.get("sex"),
+                "birthDate": row.get("birthDate"),
+                "bloodGroup": row.get("bloodGroup") or None,
+                "phone": row.get("phone") or None,
+                "email": row.get("email"),
+                "city": row.get("city") or "N/A",
+                "insurance": insurance,
+                "insuranceStatus": insurance_status,
+                "policyNumber": (
+                    row.get("policyNumber") if insurance_status == "Active" else None
+                ),
+                "status": row.get("status") or "Outpatient",
+                "nextVisit": next_visit,
+            }
+        )
+    patients = _PATIENT_RECORDS.validate_python(payloads)
+    return dump_json(
+        PatientsResponse.model_construct(
+            patients=patients, nextCursor=None, lastSyncedAt=LAST_SYNCED_AT
+        )
+    )
+
+
+# The tuple pipelines, through the handlers' own helpers.
+
+
+def tuple_appointments(rows: Rows) -> bytes:
+    format_row = appointment_formatter(RowLayout([(c,) for c in APPOINTMENT_COLUMNS]))
+    return encode_json(
+        {
+            "appointments": [format_row(row) for row in rows],
+            "lastSyncedAt": LAST_SYNCED_AT,
+        }
+    )
+
+
+def tuple_staff(rows: Rows) -> bytes:
+    layout = RowLayout([(c,) for c in STAFF_COLUMNS])
+    return encode_json(
+        {"staff": _shape_staff_rows(layout, rows), "lastSyncedAt": LAST_SYNCED_AT}
+    )
+
+
+def tuple_patients(rows: Rows) -> bytes:
+    patients = _normalize_patient_rows(RowLayout([(c,) for c in PATIENT_COLUMNS]), rows)
+    return dump_json(
+        PatientsResponse.model_construct(
+            patients=patients, nextCursor=None, lastSyncedAt=LAST_SYNCED_AT
+        )
+    )
+
+
+LISTS: Dict[str, Tuple[Callable[[int, random.Random], Rows], Callable, Callable]] = {
+    "appointments": (appointment_rows, dict_appointments, tuple_appointments),
+    "staff": (staff_rows, dict_staff, tuple_staff),
+    "patients": (patient_rows, dict_patients, tuple_patients),
+}
+
+
+def gc_collections() -> int:
+    return sum(generation["collections"] for generation in gc.get_stats())
+
+
+def run(pipeline: Callable[[Rows], bytes], rows: Rows) -> Tuple[bytes, float, int, int]:
+    """Return ``(body, seconds, gc collections, peak bytes)``."""
+
+    gc.collect()
+    collections = gc_collections()
+    started = time_module.perf_counter()
+    body = pipeline(rows)
+    elapsed = time_module.perf_counter() - started
+    collections = gc_collections() - collections
+    del body
+
+    gc.collect()
+    tracemalloc.start()
+    body = pipeline(rows)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return body, elapsed, collections, peak
+
+
+def main(row_count: int, lists: List[str]) -> None:
+    print(f"rows={row_count}")
+    for name in lists:
+        make_rows, dict_pipeline, tuple_pipeline = LISTS[name]
+        rows = make_rows(row_count, random.Random(7))
+        bodies = {}
+        for label, pipeline in (("dict", dict_pipeline), ("tuple", tuple_pipeline)):
+            bodies[label], elapsed, collections, peak = run(pipeline, rows)
+            print(
+                f"{name + ' ' + label:<22} {elapsed * 1000:9.1f}ms"
+                f" {row_count / elapsed:11,.0f} rows/s"
+                f" {elapsed * 1e6 / row_count:7.2f}us/row"
+                f" peak={peak / 2**20:8.1f}MiB gc={collections}"
+            )
+        print(f"{name} identical bodies: {bodies['dict'] == bodies['tuple']}")
+        del rows, bodies
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=500000)
+    parser.add_argument("--lists", default=",".join(LISTS))
+    args = parser.parse_args()
+    selected = [name.strip() for name in args.lists.split(",") if name.strip()]
+    unknown = sorted(set(selected) - set(LISTS))
+    if unknown:
+        parser.error(f"unknown lists: {', '.join(unknown)}")
+    main(args.rows, selected)
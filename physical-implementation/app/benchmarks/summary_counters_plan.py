@@ -0,0 +1,106 @@
+"""Before/after plans and timings for the core dashboard summary counters.
+
+Apply ``indexes.sql`` first, then from ``physical-implementation/app``::
+
+    python -m benchmarks.summary_counters_plan [--runs 50] [--analyze]
+
+"before" runs the original statement (padded literals, no range) with the
+counter indexes made INVISIBLE; "after" runs ``build_summary_counters_query``
+with them VISIBLE. Invisible indexes stay maintained but are ignored by the
+optimizer, so the toggle is cheap and is always reverted on exit.
+"""
+
+import argparse
+import asyncio
+from typing import Any, List, Sequence
+
+import aiomysql
+
+from benchmarks.common import connect, format_stats, timed
+from src.pages.summary_counters import build_summary_counters_query
+
+LEGACY_SUMMARY_SQL = """
+SELECT
+    (SELECT COUNT(*) FROM Appointment) AS totalAppointments,
+    (SELECT COUNT(*)
+     FROM Appointment a
+     JOIN ClinicalActivity c ON c.CAID = a.CAID
+     WHERE a.Status = ' Scheduled '
+       AND c.Date >= CURRENT_DATE()
+    ) AS upcomingAppointments,
+    (SELECT COUNT(*) FROM Staff WHERE Status = 'Active ') AS activeStaff,
+    (SELECT COUNT(DISTINCT c.IID)
+     FROM Emergency e
+     JOIN ClinicalActivity c ON c.CAID = e.CAID
+     WHERE e.Outcome = 'Admitted '
+    ) AS admittedPatients
+"""
+
+COUNTER_INDEXES = [
+    ("Appointment", "idx_Appointment_Status"),
+    ("Staff", "idx_Staff_Status"),
+    ("Emergency", "idx_Emergency_Outcome_CAID"),
+]
+
+
+async def set_visibility(conn: aiomysql.Connection, visible: bool) -> None:
+    keyword = "VISIBLE" if visible else "INVISIBLE"
+    async with conn.cursor() as cur:
+        for table, index in COUNTER_INDEXES:
+            await cur.execute(f"ALTER TABLE {table} ALTER INDEX {index} {keyword}")
+
+
+async def explain(
+    conn: aiomysql.Connection, sql: str, params: Sequence[Any], analyze: bool
+) -> str:
+    prefix = "EXPLAIN ANALYZE " if analyze else "EXPLAIN FORMAT=TREE "
+    async with conn.cursor() as cur:
+        await cur.execute(prefix + sql, params)
+        return "\n".join(row[0] for row in await cur.fetchall())
+
+
+async def run_phase(
+    conn: aiomysql.Connection,
+    label: str,
+    sql: str,
+    params: List[Any],
+    runs: int,
+    analyze: bool,
+) -> None:
+    async def query() -> None:
+        async with conn.cursor() as cur:
+            await cur.execute(sql, params)
+            await cur.fetchall()
+
+    async with conn.cursor(aiomysql.DictCursor) as cur:
+        await cur.execute(sql, params)
+        counters = await cur.fetchone()
+
+    print(f"=== {label} ===")
+    print(await explain(conn, sql, params, analyze))
+    print(f"counters: {counters}")
+    print(format_stats(label, await timed(query, runs)))
+    print()
+
+
+async def main(runs: int, analyze: bool) -> None:
+    conn = await connect()
+    try:
+        await set_visibility(conn, False)
+        await run_phase(conn, "before", LEGACY_SUMMARY_SQL, [], runs, analyze)
+        await set_visibility(conn, True)
+        sql, params = build_summary_counters_query()
+        await run_phase(conn, "after", sql, params, runs, analyze)
+    finally:
+        await set_visibility(conn, True)
+        conn.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=50)
+    parser.add_argument(
+        "--analyze", action="store_true", help="use EXPLAIN ANALYZE instead of TREE"
+    )
+    args = parser.parse_args()
+    asyncio.run(main(args.runs, args.analyze))
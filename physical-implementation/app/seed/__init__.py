@@ -0,0 +1,4 @@
+"""Synthetic MNHS data sets.
+
+Run the scripts from ``physical-implementation/app`` as ``python -m seed.<name>``.
+"""
@@ -0,0 +1,633 @@
+"""Deterministic synthetic MNHS data set, written as CSV files for bulk loading.
+
+From ``physical-implementation/app``::
+
+    python -m seed.generate --out seed-data [--scale 1] [--seed 42]
+
+``--scale 1`` is about 1M ``ClinicalActivity`` rows (the size of the storage
+study in ``Tablespaces and Storage Layout``); the counts grow linearly with it
+and each one can be overridden (``--patients``, ``--activities``, ...). The
+same seed and options always produce byte-identical files, and every table is
+drawn from its own random stream, so changing one volume does not reshuffle
+the tables generated before it.
+
+Popularity is skewed with a bounded Zipf law whose exponent is set per entity
+(``--patient-skew``, ``--staff-skew``, ``--medication-skew``; ``0`` is
+uniform): a few patients visit often, a few staff members carry most of the
+load and a few medications dominate prescriptions. Hot ids are scattered over
+the id range rather than packed at the start of it.
+
+The rows respect the schema and what the triggers and summaries expect:
+
+- no staff member has two activities at the same date and time (each staff
+  member walks a fixed permutation of the 15-minute slots of the window), so
+  the double-booking trigger never fires;
+- an activity is either an appointment or an emergency, and activities after
+  ``--as-of`` are scheduled or cancelled appointments with no prescription or
+  expense;
+- every prescribed medication is stocked at the activity's hospital, and
+  ``Expense.Total`` of a prescription equals the sum of the latest
+  ``UnitPrice`` of its lines there, as ``recompute_expenses`` would set it;
+- stock prices are positive and quantities and reorder levels non-negative;
+- CINs are unique, and staff only work in departments listed in ``Work_in``.
+
+One ``<Table>.csv`` per table is written with a header line, comma separated,
+``"`` as quote and ``\\N`` for NULL, plus ``manifest.json`` with the options,
+seed and row counts. ``seed.load`` loads a directory in dependency order.
+"""
+
+import argparse
+import csv
+import json
+import math
+import random
+import time as time_module
+from array import array
+from contextlib import ExitStack
+from dataclasses import asdict, dataclass
+from datetime import date, datetime, timedelta
+from pathlib import Path
+from typing import Any, Dict, List, Sequence, Tuple
+
+NULL = "\\N"
+
+# Tables in dependency order (parents first) with their CSV columns.
+TABLE_COLUMNS: Dict[str, Tuple[str, ...]] = {
+    "Hospital": ("HID", "Name", "City", "Region"),
+    "Department": ("DEP_ID", "HID", "Name", "Specialty"),
+    "Staff": ("STAFF_ID", "FullName", "Status"),
+    "Work_in": ("STAFF_ID", "DEP_ID"),
+    "Insurance": ("InsID", "Type"),
+    "Medication": (
+        "MID",
+        "Name",
+        "Form",
+        "Strength",
+        "ActiveIngredient",
+        "TherapeuticClass",
+        "Manufacturer",
+    ),
+    "Stock": ("HID", "MID", "StockTimestamp", "UnitPrice", "Qty", "ReorderLevel"),
+    "Patient": ("IID", "CIN", "FullName", "Birth", "Sex", "BloodGroup", "Phone", "Email"),
+    "ContactLocation": (
+        "CLID",
+        "City",
+        "Province",
+        "Street",
+        "Number",
+        "PostalCode",
+        "Phone_Location",
+    ),
+    "have": ("IID", "CLID"),
+    "ClinicalActivity": ("CAID", "IID", "STAFF_ID", "DEP_ID", "Date", "Time"),
+    "Appointment": ("CAID", "Reason", "Status"),
+    "Emergency": ("CAID", "TriageLevel", "Outcome"),
+    "Prescription": ("PID", "CAID", "DateIssued"),
+    "Includes": ("PID", "MID", "Dosage", "Duration"),
+    "Expense": ("ExpID", "InsID", "CAID", "Total"),
+}
+
+# Appointment slots: 15 minutes from 08:00 to 17:45.
+SLOT_MINUTES = 15
+SLOTS_PER_DAY = 40
+SLOT_TIMES = [
+    f"{8 + slot * SLOT_MINUTES // 60:02d}:{slot * SLOT_MINUTES % 60:02d}:00"
+    for slot in range(SLOTS_PER_DAY)
+]
+
+# (city, province, region, postal code, phone prefix)
+CITIES = [
+    ("Casablanca", "Casablanca-Anfa", "Casablanca-Settat", "20000", "0522"),
+    ("Rabat", "Rabat", "Rabat-Salé-Kénitra", "10000", "0537"),
+    ("Marrakech", "Marrakech", "Marrakech-Safi", "40000", "0524"),
+    ("Fes", "Fès", "Fès-Meknès", "30000", "0535"),
+    ("Tangier", "Tanger-Assilah", "Tanger-Tétouan-Al Hoceïma", "90000", "0539"),
+    ("Agadir", "Agadir Ida-Outanane", "Souss-Massa", "80000", "0528"),
+    ("Meknes", "Meknès", "Fès-Meknès", "50000", "0535"),
+    ("Oujda", "Oujda-Angad", "Oriental", "60000", "0536"),
+    ("Kenitra", "Kénitra", "Rabat-Salé-Kénitra", "14000", "0537"),
+    ("Tetouan", "Tétouan", "Tanger-Tétouan-Al Hoceïma", "93000", "0539"),
+    ("Safi", "Safi", "Marrakech-Safi", "46000", "0524"),
+    ("El Jadida", "El Jadida", "Casablanca-Settat", "24000", "0523"),
+    ("Benguerir", "Rehamna", "Marrakech-Safi", "43150", "0523"),
+    ("Beni Mellal", "Béni Mellal", "Béni Mellal-Khénifra", "23000", "0523"),
+    ("Laayoune", "Laâyoune", "Laâyoune-Sakia El Hamra", "70000", "0528"),
+]
+# (name, specialty)
+DEPARTMENTS = [
+    ("Emergency", "Acute Care"),
+    ("Internal Medicine", "General"),
+    ("Cardiology", "Heart Care"),
+    ("Pediatrics", "Child Care"),
+    ("Radiology", "Imaging"),
+    ("Oncology", "Cancer Care"),
+    ("Neurology", "Nervous System"),
+    ("Orthopedics", "Bone and Joint"),
+    ("Gynecology", "Women's Health"),
+    ("Dermatology", "Skin Care"),
+    ("Ophthalmology", "Eye Care"),
+    ("Psychiatry", "Mental Health"),
+]
+HOSPITAL_KINDS = ["University Hospital", "Regional Hospital", "Clinical Center", "Medical Center"]
+FIRST_NAMES = [
+    "Sara", "Youssef", "Hajar", "Ayoub", "Amina", "Mehdi", "Khaoula", "Omar",
+    "Fatima", "Mohammed", "Salma", "Hamza", "Imane", "Anas", "Zineb", "Karim",
+    "Nadia", "Rachid", "Meryem", "Yassine", "Houda", "Adam", "Ghita", "Ilyas",
+]
+LAST_NAMES = [
+    "El Amrani", "Benali", "Berrada", "El Khattabi", "Idrissi", "Touil",
+    "Messari", "Lahlou", "Alaoui", "Bennani", "Tazi", "Chraibi", "El Fassi",
+    "Ouazzani", "Benjelloun", "Kettani", "Sqalli", "Naciri", "Guerbouzi",
+    "Zerouali", "Mansouri", "Haddad", "Cherkaoui", "Filali",
+]
+STREETS = [
+    "Avenue Mohammed V", "Bd Zerktouni", "Rue Oued Ziz", "Rue de la Liberté",
+    "Avenue Hassan II", "Bd Anfa", "Rue Ibn Sina", "Avenue des FAR",
+]
+# (prefix, weight); no prefix reads as an admin in /api/staff.
+STAFF_ROLES = [("Dr. ", 40), ("Nurse ", 35), ("Technician ", 15), ("", 10)]
+# (type, share of patients); uninsured patients pay themselves (InsID NULL).
+INSURANCE_TYPES = [("CNOPS", 25), ("CNSS", 35), ("RAMED", 15), ("Private", 10), ("None", 0)]
+UNINSURED_SHARE = 15
+BLOOD_GROUPS = [("O+", 37), ("A+", 30), ("B+", 11), ("AB+", 4), ("O-", 7), ("A-", 6), ("B-", 2), ("AB-", 1)]
+# (ingredient, therapeutic class, base price in cents)
+INGREDIENTS = [
+    ("Amoxicillin", "Antibiotic", 2200),
+    ("Azithromycin", "Antibiotic", 4500),
+    ("Ciprofloxacin", "Antibiotic", 3800),
+    ("Ibuprofen", "Analgesic", 1200),
+    ("Paracetamol", "Analgesic", 800),
+    ("Tramadol", "Analgesic", 3100),
+    ("Metformin", "Antidiabetic", 1500),
+    ("Insulin Glargine", "Antidiabetic", 18000),
+    ("Amlodipine", "Antihypertensive", 2600),
+    ("Losartan", "Antihypertensive", 3400),
+    ("Atorvastatin", "Statin", 4200),
+    ("Omeprazole", "Proton Pump Inhibitor", 1900),
+    ("Salbutamol", "Bronchodilator", 2900),
+    ("Cetirizine", "Antihistamine", 1100),
+    ("Prednisolone", "Corticosteroid", 1700),
+    ("Sertraline", "Antidepressant", 5200),
+    ("Levothyroxine", "Thyroid Hormone", 1400),
+    ("Enoxaparin", "Anticoagulant", 9600),
+]
+FORMS = [("Tablet", "mg"), ("Capsule", "mg"), ("Syrup", "mg/5ml"), ("Injection", "mg/ml")]
+STRENGTHS = [5, 10, 20, 50, 100, 250, 400, 500, 1000]
+MANUFACTURERS = ["PharmaMA", "MediCare", "Sothema", "Cooper Pharma", "Laprophan", "Galenica"]
+DOSAGES = ["1 tab OD", "1 tab BID", "1 tab TID", "1 tab PRN", "10 ml Q6H", "1 g IV", "2 puffs BID"]
+DURATIONS = ["1 day", "3 days", "5 days", "7 days", "10 days", "14 days", "30 days"]
+REASONS = [
+    "Routine check-up", "Follow-up", "Follow-up imaging", "Lab results review",
+    "Vaccination", "Chronic care review", "Pre-operative assessment",
+    "Post-operative review", "Prescription renewal", "Specialist referral",
+]
+TRIAGE_LEVELS = [(1, 5), (2, 15), (3, 40), (4, 25), (5, 15)]
+OUTCOMES = [("Discharged", 70), ("Admitted", 20), ("Transferred", 8), ("Deceased", 2)]
+
+
+@dataclass(frozen=True)
+class Options:
+    seed: int
+    hospitals: int
+    departments_per_hospital: int
+    staff: int
+    patients: int
+    medications: int
+    activities: int
+    start: date
+    end: date
+    as_of: date
+    patient_skew: float
+    staff_skew: float
+    medication_skew: float
+    emergency_share: float
+    prescription_share: float
+    expense_share: float
+    formulary_share: float
+    stock_history: int
+
+
+def coprime_step(n: int) -> int:
+    """A step coprime with ``n`` near the golden section, to walk ``0..n-1``."""
+
+    step = max(1, int(n * 0.6180339887))
+    while math.gcd(step, n) != 1:
+        step += 1
+    return step
+
+
+class Skewed:
+    """Draw indexes ``0..n-1`` with a bounded Zipf popularity of exponent ``s``.
+
+    Ranks come from the inverse CDF of a bounded power law (constant memory,
+    whatever ``n``), and rank ``r`` maps to index ``r * step mod n`` so the
+    popular indexes are spread over the whole range.
+    """
+
+    __slots__ = ("rng", "n", "s", "step", "_span")
+
+    def __init__(self, rng: random.Random, n: int, s: float) -> None:
+        self.rng = rng
+        self.n = n
+        self.s = s
+        self.step = coprime_step(n)
+        self._span = n ** (1 - s) - 1 if s != 1 else 0.0
+
+    def index(self) -> int:
+        u = self.rng.random()
+        if self.s == 0:
+            rank = int(u * self.n)
+        elif self.s == 1:
+            rank = int(self.n**u) - 1
+        else:
+            rank = int((self._span * u + 1) ** (1 / (1 - self.s))) - 1
+        return (min(rank, self.n - 1) * self.step) % self.n
+
+
+def weighted(rng: random.Random, choices: Sequence[Tuple[Any, int]], k: int) -> List[Any]:
+    values = [value for value, _ in choices]
+    weights = [weight for _, weight in choices]
+    return rng.choices(values, weights, k=k)
+
+
+class TableWriter:
+    """CSV writer for one table that counts its rows."""
+
+    __slots__ = ("rows", "_writer")
+
+    def __init__(self, stack: ExitStack, out: Path, table: str) -> None:
+        handle = stack.enter_context(
+            open(out / f"{table}.csv", "w", newline="", encoding="utf-8")
+        )
+        self._writer = csv.writer(handle, lineterminator="\n")
+        self._writer.writerow(TABLE_COLUMNS[table])
+        self.rows = 0
+
+    def add(self, *values: Any) -> None:
+        self._writer.writerow(values)
+        self.rows += 1
+
+
+def stream(options: Options, name: str) -> random.Random:
+    """The random stream of one generation stage."""
+
+    return random.Random(f"{options.seed}/{name}")
+
+
+def person_name(rng: random.Random) -> str:
+    return f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}"
+
+
+def write_organisation(options: Options, tables: Dict[str, TableWriter]) -> Tuple[
+    List[int], List[Tuple[int, ...]]
+]:
+    """Hospitals, departments, staff and ``Work_in``.
+
+    Returns the hospital of every department (indexed by ``DEP_ID - 1``) and
+    the departments of every staff member (indexed by ``STAFF_ID - 1``).
+    """
+
+    rng = stream(options, "organisation")
+    department_hospital: List[int] = []
+    hospital_departments: List[List[int]] = []
+    for hid in range(1, options.hospitals + 1):
+        city, _, region, _, _ = CITIES[(hid - 1) % len(CITIES)]
+        kind = HOSPITAL_KINDS[(hid - 1) // len(CITIES) % len(HOSPITAL_KINDS)]
+        number = (hid - 1) // (len(CITIES) * len(HOSPITAL_KINDS))
+        name = f"{city} {kind}" + (f" {number + 1}" if number else "")
+        tables["Hospital"].add(hid, name, city, region)
+        departments = []
+        for department, specialty in DEPARTMENTS[: options.departments_per_hospital]:
+            department_hospital.append(hid)
+            departments.append(len(department_hospital))
+            tables["Department"].add(len(department_hospital), hid, department, specialty)
+        hospital_departments.append(departments)
+
+    staff_departments: List[Tuple[int, ...]] = []
+    roles = weighted(rng, STAFF_ROLES, options.staff)
+    for staff_id in range(1, options.staff + 1):
+        # Round robin first, so every department has staff when there are enough.
+        home = (staff_id - 1) % len(department_hospital) + 1
+        departments = [home]
+        if rng.random() < 0.2:
+            other = rng.choice(hospital_departments[department_hospital[home - 1] - 1])
+            if other != home:
+                departments.append(other)
+        staff_departments.append(tuple(departments))
+        status = "Retired" if rng.random() < 0.05 else "Active"
+        tables["Staff"].add(staff_id, roles[staff_id - 1] + person_name(rng), status)
+        for dep_id in departments:
+            tables["Work_in"].add(staff_id, dep_id)
+    return department_hospital, staff_departments
+
+
+def write_pharmacy(
+    options: Options, tables: Dict[str, TableWriter]
+) -> Tuple[List[List[int]], List[Dict[int, int]]]:
+    """Insurers, medications and the ``Stock`` log.
+
+    Returns each hospital's stocked medications (its formulary) and their
+    latest unit price in cents, both indexed by ``HID - 1``.
+    """
+
+    rng = stream(options, "pharmacy")
+    for ins_id, (kind, _) in enumerate(INSURANCE_TYPES, start=1):
+        tables["Insurance"].add(ins_id, kind)
+
+    base_price: List[int] = []
+    for mid in range(1, options.medications + 1):
+        ingredient, therapeutic_class, cents = INGREDIENTS[(mid - 1) % len(INGREDIENTS)]
+        form, unit = FORMS[rng.randrange(len(FORMS))]
+        strength = rng.choice(STRENGTHS)
+        manufacturer = rng.choice(MANUFACTURERS)
+        base_price.append(max(100, int(cents * rng.uniform(0.6, 1.8))))
+        tables["Medication"].add(
+            mid,
+            f"{ingredient} {strength}{unit.split('/')[0]} {form}",
+            form,
+            f"{strength}{unit}",
+            ingredient,
+            therapeutic_class,
+            manufacturer,
+        )
+
+    history_start = datetime.combine(options.start, datetime.min.time())
+    history_span = (options.as_of - options.start).days * 86400 + 86399
+    stocked = max(1, round(options.medications * options.formulary_share))
+    formularies: List[List[int]] = []
+    latest_prices: List[Dict[int, int]] = []
+    for hid in range(1, options.hospitals + 1):
+        formulary = sorted(rng.sample(range(1, options.medications + 1), stocked))
+        prices: Dict[int, int] = {}
+        for mid in formulary:
+            reorder_level = rng.choice((5, 10, 20, 50))
+            price = base_price[mid - 1]
+            # Distinct, increasing timestamps: one per slice of the history.
+            slice_seconds = history_span // options.stock_history
+            for entry in range(options.stock_history):
+                price = max(1, int(price * rng.uniform(0.9, 1.15)))
+                offset = entry * slice_seconds + rng.randrange(max(1, slice_seconds))
+                stamp = history_start + timedelta(seconds=offset)
+                tables["Stock"].add(
+                    hid,
+                    mid,
+                    stamp.strftime("%Y-%m-%d %H:%M:%S"),
+                    f"{price // 100}.{price % 100:02d}",
+                    rng.randrange(0, 500),
+                    reorder_level,
+                )
+            prices[mid] = price
+        formularies.append(formulary)
+        latest_prices.append(prices)
+    return formularies, latest_prices
+
+
+def write_patients(options: Options, tables: Dict[str, TableWriter]) -> array:
+    """Patients, their contact locations and ``have``.
+
+    Returns each patient's insurer (``0`` for uninsured) indexed by ``IID - 1``.
+    """
+
+    rng = stream(options, "patients")
+    insurers = [(ins_id, share) for ins_id, (_, share) in enumerate(INSURANCE_TYPES, 1)]
+    insurers.append((0, UNINSURED_SHARE))
+    patient_insurer = array("b", weighted(rng, insurers, options.patients))
+    cin_space = 26 * 26 * 1_000_000
+    cin_step = coprime_step(cin_space)
+    birth_days = (options.as_of - date(1930, 1, 1)).days
+    clid = 0
+    for iid in range(1, options.patients + 1):
+        # A permutation of the CIN space, so CINs are unique but not sequential.
+        code = (iid * cin_step) % cin_space
+        letters, digits = divmod(code, 1_000_000)
+        cin = f"{chr(65 + letters // 26)}{chr(65 + letters % 26)}{digits:06d}"
+        first, last = rng.choice(FIRST_NAMES), rng.choice(LAST_NAMES)
+        birth = date(1930, 1, 1) + timedelta(days=rng.randrange(birth_days))
+        email = (
+            f"{first}.{last}.{iid}@example.ma".lower().replace(" ", "")
+            if rng.random() < 0.4
+            else NULL
+        )
+        tables["Patient"].add(
+            iid,
+            cin,
+            f"{first} {last}",
+            birth.isoformat(),
+            rng.choice("MF"),
+            weighted(rng, BLOOD_GROUPS, 1)[0] if rng.random() < 0.9 else NULL,
+            f"06{rng.randrange(10**8):08d}" if rng.random() < 0.95 else NULL,
+            email,
+        )
+        for _ in range(2 if rng.random() < 0.15 else 1):
+            clid += 1
+            city, province, _, postal_code, phone_prefix = rng.choice(CITIES)
+            tables["ContactLocation"].add(
+                clid,
+                city,
+                province,
+                rng.choice(STREETS),
+                str(rng.randrange(1, 300)),
+                postal_code,
+                f"{phone_prefix}{rng.randrange(10**6):06d}",
+            )
+            tables["have"].add(iid, clid)
+    return patient_insurer
+
+
+def write_activities(
+    options: Options,
+    tables: Dict[str, TableWriter],
+    department_hospital: List[int],
+    staff_departments: List[Tuple[int, ...]],
+    formularies: List[List[int]],
+    latest_prices: List[Dict[int, int]],
+    patient_insurer: array,
+) -> None:
+    """Clinical activities with their appointment or emergency, prescription,
+    prescription lines and expense."""
+
+    rng = stream(options, "activities")
+    days = (options.end - options.start).days + 1
+    as_of_day = (options.as_of - options.start).days
+    day_strings = [(options.start + timedelta(days=d)).isoformat() for d in range(days)]
+    capacity = days * SLOTS_PER_DAY
+    slot_step = coprime_step(capacity)
+    slot_origin = array("q", (rng.randrange(capacity) for _ in staff_departments))
+    slots_used = array("q", bytes(8 * len(staff_departments)))
+
+    patients = Skewed(rng, options.patients, options.patient_skew)
+    staff = Skewed(rng, len(staff_departments), options.staff_skew)
+    medications = [Skewed(rng, len(f), options.medication_skew) for f in formularies]
+    random_ = rng.random
+    ca, appointment, emergency = tables["ClinicalActivity"], tables["Appointment"], tables["Emergency"]
+    prescription, includes, expense = tables["Prescription"], tables["Includes"], tables["Expense"]
+
+    pid = 0
+    exp_id = 0
+    for caid in range(1, options.activities + 1):
+        iid = patients.index() + 1
+        staff_index = staff.index()
+        while slots_used[staff_index] >= capacity:
+            staff_index = (staff_index + 1) % len(staff_departments)
+        # Each staff member walks its own permutation of the window's slots,
+        # so (STAFF_ID, Date, Time) never repeats.
+        slot = (slot_origin[staff_index] + slots_used[staff_index] * slot_step) % capacity
+        slots_used[staff_index] += 1
+        day, slot_of_day = divmod(slot, SLOTS_PER_DAY)
+        departments = staff_departments[staff_index]
+        dep_id = departments[0] if len(departments) == 1 else rng.choice(departments)
+        activity_date = day_strings[day]
+        ca.add(caid, iid, staff_index + 1, dep_id, activity_date, SLOT_TIMES[slot_of_day])
+
+        past = day <= as_of_day
+        if past and random_() < options.emergency_share:
+            triage = weighted(rng, TRIAGE_LEVELS, 1)[0]
+            emergency.add(caid, triage, weighted(rng, OUTCOMES, 1)[0])
+            billable = True
+        else:
+            roll = random_()
+            if past:
+                status = "Completed" if roll < 0.85 else "Cancelled"
+            else:
+                status = "Scheduled" if roll < 0.9 else "Cancelled"
+            appointment.add(caid, rng.choice(REASONS), status)
+            billable = status == "Completed"
+        if not billable or random_() >= options.expense_share:
+            continue
+
+        hid = department_hospital[dep_id - 1]
+        if random_() < options.prescription_share:
+            pid += 1
+            prescription.add(pid, caid, activity_date)
+            formulary = formularies[hid - 1]
+            picker = medications[hid - 1]
+            lines = {formulary[picker.index()] for _ in range(rng.randint(1, 4))}
+            prices = latest_prices[hid - 1]
+            total = 0
+            for mid in sorted(lines):
+                includes.add(pid, mid, rng.choice(DOSAGES), rng.choice(DURATIONS))
+                total += prices[mid]
+        else:
+            # Consultation fee; recompute_expenses leaves it alone.
+            total = rng.randrange(5000, 150000, 500)
+        exp_id += 1
+        ins_id = patient_insurer[iid - 1]
+        expense.add(exp_id, ins_id or NULL, caid, f"{total // 100}.{total % 100:02d}")
+
+
+def generate(options: Options, out: Path) -> Dict[str, int]:
+    """Write every table of the data set to ``out`` and return the row counts."""
+
+    out.mkdir(parents=True, exist_ok=True)
+    with ExitStack() as stack:
+        tables = {table: TableWriter(stack, out, table) for table in TABLE_COLUMNS}
+        department_hospital, staff_departments = write_organisation(options, tables)
+        formularies, latest_prices = write_pharmacy(options, tables)
+        patient_insurer = write_patients(options, tables)
+        write_activities(
+            options,
+            tables,
+            department_hospital,
+            staff_departments,
+            formularies,
+            latest_prices,
+            patient_insurer,
+        )
+    rows = {table: writer.rows for table, writer in tables.items()}
+    manifest = {
+        "options": {key: str(value) for key, value in asdict(options).items()},
+        "format": {"delimiter": ",", "quote": '"', "null": NULL, "header": True},
+        "tables": list(TABLE_COLUMNS),
+        "rows": rows,
+    }
+    (out / "manifest.json").write_text(json.dumps(manifest, indent=2) + "\n")
+    return rows
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--out", type=Path, required=True, help="output directory")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument(
+        "--scale", type=float, default=1.0, help="1.0 is about 1M activities"
+    )
+    for name in ("hospitals", "staff", "patients", "medications", "activities"):
+        parser.add_argument(f"--{name}", type=int, help="override the scaled count")
+    parser.add_argument("--departments-per-hospital", type=int, default=8)
+    parser.add_argument("--start", type=date.fromisoformat, default=date(2023, 1, 1))
+    parser.add_argument("--end", type=date.fromisoformat, default=date(2026, 6, 30))
+    parser.add_argument(
+        "--as-of",
+        type=date.fromisoformat,
+        default=date(2025, 12, 31),
+        help="activities after this date are upcoming appointments",
+    )
+    parser.add_argument("--patient-skew", type=float, default=0.5)
+    parser.add_argument("--staff-skew", type=float, default=0.6)
+    parser.add_argument("--medication-skew", type=float, default=1.0)
+    parser.add_argument("--emergency-share", type=float, default=0.2)
+    parser.add_argument("--prescription-share", type=float, default=0.45)
+    parser.add_argument("--expense-share", type=float, default=0.9)
+    parser.add_argument(
+        "--formulary-share",
+        type=float,
+        default=0.6,
+        help="share of medications each hospital stocks",
+    )
+    parser.add_argument("--stock-history", type=int, default=3)
+    args = parser.parse_args()
+
+    def scaled(name: str, base: int) -> int:
+        value = getattr(args, name)
+        return value if value is not None else max(1, round(base * args.scale))
+
+    options = Options(
+        seed=args.seed,
+        hospitals=scaled("hospitals", 20),
+        departments_per_hospital=args.departments_per_hospital,
+        staff=scaled("staff", 4000),
+        patients=scaled("patients", 250_000),
+        medications=args.medications if args.medications is not None else 1500,
+        activities=scaled("activities", 1_000_000),
+        start=args.start,
+        end=args.end,
+        as_of=args.as_of,
+        patient_skew=args.patient_skew,
+        staff_skew=args.staff_skew,
+        medication_skew=args.medication_skew,
+        emergency_share=args.emergency_share,
+        prescription_share=args.prescription_share,
+        expense_share=args.expense_share,
+        formulary_share=args.formulary_share,
+        stock_history=args.stock_history,
+    )
+    if not options.start <= options.as_of <= options.end:
+        parser.error("--start <= --as-of <= --end is required")
+    if not 1 <= options.departments_per_hospital <= len(DEPARTMENTS):
+        parser.error(f"--departments-per-hospital must be 1..{len(DEPARTMENTS)}")
+    if min(options.hospitals, options.staff, options.patients, options.medications) < 1:
+        parser.error("every count must be at least 1")
+    if options.stock_history < 1:
+        parser.error("--stock-history must be at least 1")
+    for name in ("patient_skew", "staff_skew", "medication_skew"):
+        if getattr(options, name) < 0:
+            parser.error(f"--{name.replace('_', '-')} must be >= 0")
+    for name in ("emergency_share", "prescription_share", "expense_share", "formulary_share"):
+        if not 0 <= getattr(options, name) <= 1:
+            parser.error(f"--{name.replace('_', '-')} must be between 0 and 1")
+    slots = ((options.end - options.start).days + 1) * SLOTS_PER_DAY * options.staff
+    if options.activities > slots:
+        parser.error(f"{options.activities} activities do not fit {slots} staff slots")
+
+    started = time_module.perf_counter()
+    rows = generate(options, args.out)
+    elapsed = time_module.perf_counter() - started
+    for table, count in rows.items():
+        print(f"{table:<18} {count:>12,} rows")
+    total = sum(rows.values())
+    print(f"{'total':<18} {total:>12,} rows in {elapsed:.1f}s ({total / elapsed:,.0f} rows/s)")
+    print(f"written to {args.out}")
+
+
+if __name__ == "__main__":
+    main()
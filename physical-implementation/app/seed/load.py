@@ -0,0 +1,554 @@
+"""Bulk-load a CSV data set or a mysqldump file with ``LOAD DATA LOCAL INFILE``.
+
+From ``physical-implementation/app``::
+
+    python -m seed.load seed-data [--connections 4] [--truncate]
+    python -m seed.load --dump dump.sql [--connections 4] [--truncate]
+
+The schema must exist already (tables, ``triggers.sql``, ``summaries.sql``,
+``indexes.sql``); the server needs ``local_infile=ON``. A data directory holds
+one ``<Table>.csv`` per table as ``seed.generate`` writes them (header line,
+``"`` quoting, ``\\N`` for NULL); missing tables are left alone. ``--dump``
+converts the ``INSERT`` statements of a mysqldump file to that format first.
+
+The load runs in phases, each timed:
+
+1. ``mnhspatch.sql``: the auto-increment fixups, so ids keep being assigned
+   after the explicit ids of the data set.
+2. Secondary indexes of the loaded tables are dropped, except the unique ones
+   and those a foreign key needs. Their definitions are written to
+   ``--index-backup`` first and they are rebuilt (one sorted build per table)
+   even if the load fails; the backup file is removed once they are back.
+3. Every table is loaded by one ``LOAD DATA`` on one of ``--connections``
+   sessions, as soon as the tables it references are in, so independent
+   tables load in parallel. The sessions run with ``foreign_key_checks=0``
+   and set ``@mnhs_bulk_load``, which makes the double-booking, stock and
+   summary INSERT triggers step aside.
+4. What those settings skipped is checked set-based instead: rows without
+   their parent for every foreign key of a loaded table, appointments
+   sharing a staff slot and stock rows the stock trigger would refuse.
+   Problems are listed, and the exit status is 1 when there are any or
+   when ``LOAD DATA`` skipped rows with warnings.
+5. ``StockCurrent``, ``BillingDaily`` and ``PatientSummary`` are rebuilt with
+   their ``refresh_*`` procedures when ``summaries.sql`` is installed.
+
+Rows, seconds, rows/s and warnings are printed per table and for the load.
+"""
+
+import argparse
+import asyncio
+import csv
+import re
+import tempfile
+import time as time_module
+from pathlib import Path
+from typing import IO, Any, Dict, Iterator, List, Optional, Sequence, Tuple
+
+import aiomysql
+
+from seed.generate import NULL, TABLE_COLUMNS
+from src.db import ROW_DECODERS, cfg
+
+PATCH_SCRIPT = Path(__file__).resolve().parents[1] / "mnhspatch.sql"
+
+# Tables each table references; a table loads once these are in.
+TABLE_PARENTS: Dict[str, Tuple[str, ...]] = {
+    "Hospital": (),
+    "Department": ("Hospital",),
+    "Staff": (),
+    "Work_in": ("Staff", "Department"),
+    "Insurance": (),
+    "Medication": (),
+    "Stock": ("Hospital", "Medication"),
+    "Patient": (),
+    "ContactLocation": (),
+    "have": ("Patient", "ContactLocation"),
+    "ClinicalActivity": ("Patient", "Staff", "Department"),
+    "Appointment": ("ClinicalActivity",),
+    "Emergency": ("ClinicalActivity",),
+    "Prescription": ("ClinicalActivity",),
+    "Includes": ("Prescription", "Medication"),
+    "Expense": ("ClinicalActivity", "Insurance"),
+}
+
+LOAD_SQL = (
+    "LOAD DATA LOCAL INFILE %s INTO TABLE `{table}` CHARACTER SET utf8mb4"
+    " FIELDS TERMINATED BY ',' OPTIONALLY ENCLOSED BY '\"' ESCAPED BY '\\\\'"
+    " LINES TERMINATED BY '\\n' IGNORE 1 LINES ({columns})"
+)
+SECONDARY_INDEX = re.compile(r"^\s*((?:FULLTEXT |SPATIAL )?KEY `([^`]+)` .*?),?$")
+DUMP_INSERT = re.compile(r"INSERT INTO `(\w+)` VALUES ")
+DUMP_TOKEN = re.compile(r"\(|\)|'((?:[^'\\]|\\.)*)'|([^,()';\s]+)", re.S)
+DUMP_ESCAPE = re.compile(r"\\(.)", re.S)
+SUMMARY_REFRESHES = {
+    "refresh_stock_current": "CALL refresh_stock_current()",
+    "refresh_billing_daily": "CALL refresh_billing_daily(NULL, NULL)",
+    "refresh_patient_summary": "CALL refresh_patient_summary(NULL)",
+}
+DOUBLE_BOOKINGS_SQL = (
+    "SELECT COUNT(*) FROM ("
+    " SELECT 1 FROM `ClinicalActivity` C JOIN `Appointment` A ON A.`CAID` = C.`CAID`"
+    " WHERE C.`Time` IS NOT NULL"
+    " GROUP BY C.`STAFF_ID`, C.`Date`, C.`Time` HAVING COUNT(*) > 1) D"
+)
+BAD_STOCK_SQL = (
+    "SELECT COUNT(*) FROM `Stock`"
+    " WHERE `Qty` < 0 OR `UnitPrice` <= 0 OR `ReorderLevel` < 0"
+)
+# Errors when LOCAL INFILE is disabled on the server or the client.
+ER_LOCAL_INFILE_DISABLED = {1148, 2068, 3948}
+# ER_DROP_INDEX_FK: the index backs a foreign key.
+ER_DROP_INDEX_FK = 1553
+
+
+async def connect() -> aiomysql.Connection:
+    """A loader session: autocommit, LOCAL INFILE, no FK checks, bulk-load flag."""
+
+    conn = await aiomysql.connect(
+        host=cfg["host"],
+        port=cfg["port"],
+        user=cfg["user"],
+        password=cfg["password"],
+        db=cfg["database"],
+        autocommit=True,
+        local_infile=True,
+        conv=ROW_DECODERS,
+    )
+    async with conn.cursor() as cur:
+        await cur.execute("SET SESSION foreign_key_checks = 0, @mnhs_bulk_load = 1")
+    return conn
+
+
+def sql_statements(script: str) -> List[str]:
+    """Split a ``mysql`` client script into statements, honouring ``DELIMITER``."""
+
+    delimiter = ";"
+    statements: List[str] = []
+    buffer: List[str] = []
+    for line in script.splitlines():
+        stripped = line.strip()
+        if stripped.upper().startswith("DELIMITER "):
+            delimiter = stripped.split(None, 1)[1]
+            continue
+        if not buffer and (not stripped or stripped.startswith("--")):
+            continue
+        buffer.append(line)
+        if stripped.endswith(delimiter):
+            statement = "\n".join(buffer).rstrip()[: -len(delimiter)].strip()
+            if statement:
+                statements.append(statement)
+            buffer = []
+    if "".join(buffer).strip():
+        statements.append("\n".join(buffer).strip())
+    return statements
+
+
+async def apply_auto_increment_patch(conn: aiomysql.Connection) -> None:
+    """Run ``mnhspatch.sql`` against the configured schema."""
+
+    async with conn.cursor() as cur:
+        for statement in sql_statements(PATCH_SCRIPT.read_text(encoding="utf-8")):
+            if statement.startswith("SET @target_schema"):
+                await cur.execute("SET @target_schema = %s", (cfg["database"],))
+            else:
+                await cur.execute(statement)
+
+
+def csv_columns(path: Path) -> List[str]:
+    with open(path, newline="", encoding="utf-8") as handle:
+        header = next(csv.reader(handle), [])
+    invalid = [name for name in header if not re.fullmatch(r"\w+", name)]
+    if not header or invalid:
+        raise SystemExit(f"{path}: bad header {header!r}")
+    return header
+
+
+def data_files(directory: Path) -> Dict[str, Path]:
+    """``<Table>.csv`` files of ``directory``, in dependency order."""
+
+    files = {
+        table: directory / f"{table}.csv"
+        for table in TABLE_PARENTS
+        if (directory / f"{table}.csv").is_file()
+    }
+    if not files:
+        raise SystemExit(f"no <Table>.csv files in {directory}")
+    return files
+
+
+def dump_rows(values: str) -> Iterator[List[str]]:
+    """Rows of the ``(...),(...);`` part of a mysqldump ``INSERT``.
+
+    String values keep their backslash escapes, which ``LOAD DATA`` reads
+    back to the same value; only escaped quotes are unescaped, since CSV
+    quoting takes care of those.
+    """
+
+    row: List[str] = []
+    for match in DUMP_TOKEN.finditer(values):
+        token = match.group(0)
+        if token == "(":
+            row = []
+        elif token == ")":
+            yield row
+        elif match.group(1) is not None:
+            row.append(
+                DUMP_ESCAPE.sub(
+                    lambda m: m.group(1) if m.group(1) in "'\"" else m.group(0),
+                    match.group(1),
+                )
+            )
+        else:
+            row.append(NULL if token == "NULL" else token)
+
+
+def dump_to_csv(
+    dump: Path, out: Path, columns: Dict[str, List[str]]
+) -> Dict[str, Path]:
+    """Write the rows of the MNHS tables in ``dump`` as ``<Table>.csv`` files.
+
+    mysqldump writes one ``INSERT`` per line and without a column list, so
+    the header is the table's column order in the target schema.
+    """
+
+    handles: Dict[str, IO[str]] = {}
+    writers: Dict[str, Any] = {}
+    skipped = set()
+    try:
+        with open(dump, encoding="utf-8") as lines:
+            for line in lines:
+                match = DUMP_INSERT.match(line)
+                if not match:
+                    continue
+                table = match.group(1)
+                if table not in columns:
+                    skipped.add(table)
+                    continue
+                if table not in writers:
+                    handles[table] = open(
+                        out / f"{table}.csv", "w", newline="", encoding="utf-8"
+                    )
+                    writers[table] = csv.writer(handles[table], lineterminator="\n")
+                    writers[table].writerow(columns[table])
+                writers[table].writerows(dump_rows(line[match.end():]))
+    finally:
+        for handle in handles.values():
+            handle.close()
+    if skipped:
+        print(f"not loaded from the dump: {', '.join(sorted(skipped))}")
+    return data_files(out)
+
+
+async def table_columns(conn: aiomysql.Connection, tables: Sequence[str]) -> Dict[str, List[str]]:
+    columns: Dict[str, List[str]] = {table: [] for table in tables}
+    async with conn.cursor() as cur:
+        await cur.execute(
+            "SELECT TABLE_NAME, COLUMN_NAME FROM information_schema.COLUMNS"
+            " WHERE TABLE_SCHEMA = DATABASE() ORDER BY TABLE_NAME, ORDINAL_POSITION"
+        )
+        for table, column in await cur.fetchall():
+            if table in columns:
+                columns[table].append(column)
+    return {table: names for table, names in columns.items() if names}
+
+
+async def truncate(conn: aiomysql.Connection, tables: Sequence[str]) -> None:
+    async with conn.cursor() as cur:
+        for table in reversed(tables):
+            await cur.execute(f"TRUNCATE TABLE `{table}`")
+
+
+async def drop_secondary_indexes(
+    conn: aiomysql.Connection, tables: Sequence[str], backup: Path
+) -> Dict[str, List[str]]:
+    """Drop the non-unique secondary indexes of ``tables``.
+
+    Returns the ``KEY ...`` definitions that were dropped, per table. Each
+    dropped index is also appended to ``backup`` as an ``ALTER TABLE ... ADD``
+    statement, so an interrupted load can still be repaired by hand.
+    """
+
+    dropped: Dict[str, List[str]] = {}
+    async with conn.cursor() as cur:
+        with open(backup, "a", encoding="utf-8") as restore_script:
+            for table in tables:
+                await cur.execute(f"SHOW CREATE TABLE `{table}`")
+                _, ddl = await cur.fetchone()
+                for line in ddl.splitlines():
+                    match = SECONDARY_INDEX.match(line)
+                    if not match:
+                        continue
+                    definition, name = match.groups()
+                    try:
+                        await cur.execute(f"ALTER TABLE `{table}` DROP INDEX `{name}`")
+                    except aiomysql.OperationalError as exc:
+                        if exc.args[0] != ER_DROP_INDEX_FK:
+                            raise
+                        continue
+                    restore_script.write(f"ALTER TABLE `{table}` ADD {definition};\n")
+                    restore_script.flush()
+                    dropped.setdefault(table, []).append(definition)
+    return dropped
+
+
+async def restore_indexes(
+    conns: Sequence[aiomysql.Connection], dropped: Dict[str, List[str]]
+) -> None:
+    """Re-create dropped indexes, one table per connection at a time.
+
+    Plain indexes of a table are added by a single ``ALTER TABLE``; InnoDB
+    builds FULLTEXT indexes one statement at a time.
+    """
+
+    statements = []
+    for table, definitions in dropped.items():
+        plain = [d for d in definitions if not d.startswith("FULLTEXT")]
+        table_statements = []
+        if plain:
+            adds = ", ".join(f"ADD {definition}" for definition in plain)
+            table_statements.append(f"ALTER TABLE `{table}` {adds}")
+        table_statements.extend(
+            f"ALTER TABLE `{table}` ADD {d}" for d in definitions if d.startswith("FULLTEXT")
+        )
+        statements.append(table_statements)
+    await run_on(conns, statements)
+
+
+async def run_on(
+    conns: Sequence[aiomysql.Connection], batches: Sequence[Sequence[str]]
+) -> None:
+    """Run each batch of statements in order, batches spread over ``conns``."""
+
+    pending = list(batches)
+
+    async def drain(conn: aiomysql.Connection) -> None:
+        async with conn.cursor() as cur:
+            while pending:
+                for statement in pending.pop(0):
+                    await cur.execute(statement)
+
+    await asyncio.gather(*(drain(conn) for conn in conns))
+
+
+async def load_table(
+    conn: aiomysql.Connection, table: str, path: Path
+) -> Tuple[int, float, int]:
+    """``LOAD DATA`` one file; return ``(rows, seconds, warnings)``."""
+
+    columns = ", ".join(f"`{name}`" for name in csv_columns(path))
+    started = time_module.perf_counter()
+    async with conn.cursor() as cur:
+        try:
+            await cur.execute(
+                LOAD_SQL.format(table=table, columns=columns), (str(path.resolve()),)
+            )
+        except aiomysql.MySQLError as exc:
+            if exc.args[0] in ER_LOCAL_INFILE_DISABLED:
+                raise SystemExit(
+                    f"LOAD DATA LOCAL is disabled: {exc.args[1]}"
+                    " (run SET GLOBAL local_infile = ON on the server)"
+                ) from exc
+            raise
+        rows = cur.rowcount
+        elapsed = time_module.perf_counter() - started
+        await cur.execute("SHOW COUNT(*) WARNINGS")
+        (warnings,) = await cur.fetchone()
+        if warnings:
+            await cur.execute("SHOW WARNINGS LIMIT 3")
+            for level, code, message in await cur.fetchall():
+                print(f"  {table}: {level} {code} {message}")
+    return rows, elapsed, warnings
+
+
+async def load_tables(
+    conns: Sequence[aiomysql.Connection], files: Dict[str, Path]
+) -> Dict[str, Tuple[int, float, int]]:
+    """Load every file once its parent tables are loaded, over ``conns``."""
+
+    idle: "asyncio.Queue[aiomysql.Connection]" = asyncio.Queue()
+    for conn in conns:
+        idle.put_nowait(conn)
+    loaded = {table: asyncio.Event() for table in files}
+    results: Dict[str, Tuple[int, float, int]] = {}
+
+    async def load(table: str) -> None:
+        for parent in TABLE_PARENTS[table]:
+            if parent in loaded:
+                await loaded[parent].wait()
+        conn = await idle.get()
+        try:
+            results[table] = rows, elapsed, warnings = await load_table(
+                conn, table, files[table]
+            )
+        finally:
+            idle.put_nowait(conn)
+        loaded[table].set()
+        print(
+            f"{table:<18} {rows:>12,} rows {elapsed:8.1f}s"
+            f" {rows / max(elapsed, 1e-9):>12,.0f} rows/s"
+            + (f" warnings={warnings}" if warnings else "")
+        )
+
+    async with asyncio.TaskGroup() as group:
+        for table in files:
+            group.create_task(load(table))
+    return results
+
+
+async def integrity_problems(
+    conn: aiomysql.Connection, tables: Sequence[str]
+) -> List[str]:
+    """What the disabled FK checks and skipped triggers would have rejected."""
+
+    problems = []
+    async with conn.cursor() as cur:
+        await cur.execute(
+            "SELECT K.CONSTRAINT_NAME, K.TABLE_NAME, K.COLUMN_NAME,"
+            " K.REFERENCED_TABLE_NAME, K.REFERENCED_COLUMN_NAME"
+            " FROM information_schema.KEY_COLUMN_USAGE K"
+            " WHERE K.TABLE_SCHEMA = DATABASE() AND K.REFERENCED_TABLE_NAME IS NOT NULL"
+            " ORDER BY K.TABLE_NAME, K.CONSTRAINT_NAME, K.ORDINAL_POSITION"
+        )
+        foreign_keys: Dict[Tuple[str, str, str], List[Tuple[str, str]]] = {}
+        for name, table, column, parent, parent_column in await cur.fetchall():
+            foreign_keys.setdefault((name, table, parent), []).append(
+                (column, parent_column)
+            )
+        for (name, table, parent), pairs in foreign_keys.items():
+            if table not in tables and parent not in tables:
+                continue
+            joined = " AND ".join(f"P.`{p}` = C.`{c}`" for c, p in pairs)
+            present = " AND ".join(f"C.`{c}` IS NOT NULL" for c, _ in pairs)
+            await cur.execute(
+                f"SELECT COUNT(*) FROM `{table}` C WHERE {present}"
+                f" AND NOT EXISTS (SELECT 1 FROM `{parent}` P WHERE {joined})"
+            )
+            (orphans,) = await cur.fetchone()
+            if orphans:
+                problems.append(f"{orphans} {table} rows without {parent} ({name})")
+        if {"ClinicalActivity", "Appointment"} & set(tables):
+            await cur.execute(DOUBLE_BOOKINGS_SQL)
+            (slots,) = await cur.fetchone()
+            if slots:
+                problems.append(f"{slots} staff slots hold more than one appointment")
+        if "Stock" in tables:
+            await cur.execute(BAD_STOCK_SQL)
+            (bad,) = await cur.fetchone()
+            if bad:
+                problems.append(f"{bad} Stock rows with a negative or zero value")
+    return problems
+
+
+async def refresh_summaries(conns: Sequence[aiomysql.Connection]) -> List[str]:
+    """Rebuild the summary tables that are installed; return what ran."""
+
+    async with conns[0].cursor() as cur:
+        await cur.execute(
+            "SELECT ROUTINE_NAME FROM information_schema.ROUTINES"
+            " WHERE ROUTINE_SCHEMA = DATABASE() AND ROUTINE_NAME IN (%s, %s, %s)",
+            tuple(SUMMARY_REFRESHES),
+        )
+        installed = {name for (name,) in await cur.fetchall()}
+    calls = [sql for name, sql in SUMMARY_REFRESHES.items() if name in installed]
+    await run_on(conns, [[call] for call in calls])
+    return calls
+
+
+async def main(args: argparse.Namespace) -> int:
+    conns = [await connect() for _ in range(args.connections)]
+    dropped: Dict[str, List[str]] = {}
+    status = 0
+    phase_started = started = time_module.perf_counter()
+
+    def phase(label: str) -> None:
+        nonlocal phase_started
+        now = time_module.perf_counter()
+        print(f"-- {label}: {now - phase_started:.1f}s")
+        phase_started = now
+
+    scratch: Optional[tempfile.TemporaryDirectory] = None
+    try:
+        if args.dump:
+            scratch = tempfile.TemporaryDirectory(prefix="mnhs-dump-")
+            columns = await table_columns(conns[0], list(TABLE_PARENTS))
+            files = await asyncio.to_thread(
+                dump_to_csv, args.dump, Path(scratch.name), columns
+            )
+            phase("dump converted to CSV")
+        else:
+            files = data_files(args.directory)
+        tables = list(files)
+
+        if not args.skip_patch:
+            await apply_auto_increment_patch(conns[0])
+            phase("auto-increment patch")
+        if args.truncate:
+            await truncate(conns[0], tables)
+            phase("truncate")
+
+        if not args.keep_indexes:
+            args.index_backup.unlink(missing_ok=True)
+            dropped = await drop_secondary_indexes(conns[0], tables, args.index_backup)
+            count = sum(len(definitions) for definitions in dropped.values())
+            phase(f"dropped {count} secondary indexes")
+        try:
+            load_started = time_module.perf_counter()
+            results = await load_tables(conns, files)
+            load_elapsed = time_module.perf_counter() - load_started
+        finally:
+            if dropped:
+                await restore_indexes(conns, dropped)
+                phase("secondary indexes rebuilt")
+        if not args.keep_indexes:
+            args.index_backup.unlink(missing_ok=True)
+
+        rows = sum(result[0] for result in results.values())
+        warnings = sum(result[2] for result in results.values())
+        print(
+            f"loaded {rows:,} rows from {len(results)} tables in {load_elapsed:.1f}s"
+            f" ({rows / max(load_elapsed, 1e-9):,.0f} rows/s)"
+            + (f", {warnings} warnings" if warnings else "")
+        )
+        await run_on(conns, [[f"ANALYZE TABLE `{table}`"] for table in tables])
+        phase("tables analyzed")
+
+        problems = await integrity_problems(conns[0], tables)
+        for problem in problems:
+            print(f"integrity: {problem}")
+        status = 1 if problems or warnings else 0
+        phase("integrity checks")
+
+        for call in await refresh_summaries(conns):
+            print(f"ran {call}")
+        phase("summaries rebuilt")
+    finally:
+        for conn in conns:
+            conn.close()
+        if scratch is not None:
+            scratch.cleanup()
+    print(f"total {time_module.perf_counter() - started:.1f}s")
+    return status
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument("directory", nargs="?", type=Path, help="<Table>.csv directory")
+    source.add_argument("--dump", type=Path, help="mysqldump file to load instead")
+    parser.add_argument("--connections", type=int, default=4)
+    parser.add_argument(
+        "--truncate", action="store_true", help="empty the loaded tables first"
+    )
+    parser.add_argument(
+        "--keep-indexes", action="store_true", help="load with every index in place"
+    )
+    parser.add_argument(
+        "--skip-patch", action="store_true", help="do not run mnhspatch.sql"
+    )
+    parser.add_argument(
+        "--index-backup", type=Path, default=Path("seed-load-indexes.sql")
+    )
+    args = parser.parse_args()
+    if args.connections < 1:
+        parser.error("--connections must be at least 1")
+    raise SystemExit(asyncio.run(main(args)))
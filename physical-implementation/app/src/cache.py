@@ -0,0 +1,166 @@
+"""In-process response cache for the read-mostly dashboard endpoints.
+
+Entries are grouped by namespace (one per endpoint) and keyed by the
+normalized query parameters. Each entry lives for a fixed TTL, the least
+recently used entry is evicted once ``max_entries`` is reached, and write
+endpoints drop whole namespaces through :meth:`ResponseCache.invalidate`.
+"""
+
+import asyncio
+import os
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Hashable, Tuple, TypeVar
+
+from pydantic import BaseModel
+
+T = TypeVar("T")
+
+CacheKey = Tuple[str, Hashable]
+
+
+def params_key(params: BaseModel) -> Tuple[Tuple[str, Any], ...]:
+    """Turn a validated query model into a hashable cache key."""
+
+    return tuple(sorted(params.model_dump().items()))
+
+
+class ResponseCache:
+    """TTL + LRU cache with namespace invalidation and hit/miss counters."""
+
+    def __init__(
+        self,
+        ttl_seconds: float,
+        max_entries: int,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._clock = clock
+        self._entries: "OrderedDict[CacheKey, Tuple[float, Any]]" = OrderedDict()
+        self._inflight: Dict[Tuple[CacheKey, int], "asyncio.Future[Any]"] = {}
+        self._generations: Dict[str, int] = {}
+        self._settle_until: Dict[str, float] = {}
+        self._counters: Dict[str, Dict[str, int]] = {}
+
+    @property
+    def enabled(self) -> bool:
+        return self.ttl_seconds > 0 and self.max_entries > 0
+
+    async def get_or_load(
+        self, namespace: str, key: Hashable, loader: Callable[[], Awaitable[T]]
+    ) -> T:
+        """Return the cached value or run ``loader`` once for concurrent callers.
+
+        A load that started before an invalidation of ``namespace`` is handed to
+        its waiters but never stored, so writes are visible on the next read.
+        """
+
+        if not self.enabled:
+            return await loader()
+
+        cache_key: CacheKey = (namespace, key)
+        entry = self._entries.get(cache_key)
+        if entry is not None:
+            expires_at, value = entry
+            if expires_at > self._clock():
+                self._entries.move_to_end(cache_key)
+                self._count(namespace, "hits")
+                return value
+            del self._entries[cache_key]
+            self._count(namespace, "expirations")
+
+        self._count(namespace, "misses")
+        generation = self._generations.get(namespace, 0)
+        inflight_key = (cache_key, generation)
+        pending = self._inflight.get(inflight_key)
+        while pending is not None:
+            try:
+                return await asyncio.shield(pending)
+            except asyncio.CancelledError:
+                if not pending.cancelled():
+                    raise
+                # The leading request was cancelled, not this one: the first
+                # waiter to get here runs the load, the others follow it.
+                pending = self._inflight.get(inflight_key)
+
+        future: "asyncio.Future[Any]" = asyncio.get_running_loop().create_future()
+        self._inflight[inflight_key] = future
+        try:
+            value = await loader()
+        except asyncio.CancelledError:
+            # Waiters take the load over instead of inheriting the cancellation.
+            future.cancel()
+            raise
+        except BaseException as exc:
+            future.set_exception(exc)
+            # Mark retrieved so an unawaited failure does not log a warning.
+            future.exception()
+            raise
+        else:
+            future.set_result(value)
+            if (
+                self._generations.get(namespace, 0) == generation
+                and self._settle_until.get(namespace, 0.0) <= self._clock()
+            ):
+                self._store(cache_key, value)
+            return value
+        finally:
+            self._inflight.pop(inflight_key, None)
+
+    def invalidate(self, *namespaces: str, settle_seconds: float = 0.0) -> None:
+        """Drop every entry of ``namespaces`` and fence off in-flight loads.
+
+        For ``settle_seconds`` afterwards loads are served but not stored, so a
+        read replica still catching up cannot re-cache pre-write data.
+        """
+
+        settle_until = self._clock() + settle_seconds
+        for namespace in namespaces:
+            self._generations[namespace] = self._generations.get(namespace, 0) + 1
+            if settle_seconds > 0:
+                self._settle_until[namespace] = max(
+                    settle_until, self._settle_until.get(namespace, 0.0)
+                )
+            stale = [key for key in self._entries if key[0] == namespace]
+            for key in stale:
+                del self._entries[key]
+            self._count(namespace, "invalidations")
+
+    def stats(self) -> Dict[str, Any]:
+        """Return configuration, size and per-namespace counters."""
+
+        totals: Dict[str, int] = {}
+        for counters in self._counters.values():
+            for name, value in counters.items():
+                totals[name] = totals.get(name, 0) + value
+        lookups = totals.get("hits", 0) + totals.get("misses", 0)
+        return {
+            "enabled": self.enabled,
+            "ttlSeconds": self.ttl_seconds,
+            "maxEntries": self.max_entries,
+            "size": len(self._entries),
+            "hitRatio": totals.get("hits", 0) / lookups if lookups else 0.0,
+            "totals": totals,
+            "namespaces": {name: dict(c) for name, c in self._counters.items()},
+        }
+
+    def _store(self, cache_key: CacheKey, value: Any) -> None:
+        self._entries[cache_key] = (self._clock() + self.ttl_seconds, value)
+        self._entries.move_to_end(cache_key)
+        while len(self._entries) > self.max_entries:
+            evicted, _ = self._entries.popitem(last=False)
+            self._count(evicted[0], "evictions")
+
+    def _count(self, namespace: str, counter: str) -> None:
+        counters = self._counters.setdefault(namespace, {})
+        counters[counter] = counters.get(counter, 0) + 1
+
+
+def create_response_cache() -> ResponseCache:
+    """Build the cache from ``RESPONSE_CACHE_TTL`` / ``RESPONSE_CACHE_MAX_ENTRIES``."""
+
+    return ResponseCache(
+        ttl_seconds=float(os.getenv("RESPONSE_CACHE_TTL", 30)),
+        max_entries=int(os.getenv("RESPONSE_CACHE_MAX_ENTRIES", 256)),
+    )
@@ -1,34 +1,634 @@
 import asyncio
 import os
-from typing import Dict
+import random
+from bisect import bisect_left
+from collections import deque
+from contextlib import contextmanager
+from datetime import time, timedelta
+from itertools import count
+from operator import itemgetter
+from typing import (
+    Any,
+    AsyncIterator,
+    Awaitable,
+    Callable,
+    Dict,
+    Iterator,
+    List,
+    Optional,
+    Sequence,
+    Tuple,
+    TypeVar,
+    Union,
+)
 
 import aiomysql
+from aiomysql.connection import connect
 from dotenv import load_dotenv
+from pymysql.constants import FIELD_TYPE
+from pymysql.converters import convert_timedelta, decoders as pymysql_decoders
 
 load_dotenv()
 
+
+def _env_flag(name: str, default: str = "0") -> bool:
+    return os.getenv(name, default).lower() in {"1", "true", "yes"}
+
+
 cfg = dict(
     host=os.getenv("MYSQL_HOST"),
     port=int(os.getenv("MYSQL_PORT", 3306)),
     database=os.getenv("MYSQL_DB"),
     user=os.getenv("MYSQL_USER"),
     password=os.getenv("MYSQL_PASSWORD"),
+    pool_min=int(os.getenv("MYSQL_POOL_MIN", 1)),
+    pool_max=int(os.getenv("MYSQL_POOL_MAX", 5)),
+    # Seconds a request may wait for a free connection; 0 waits forever.
+    pool_acquire_timeout=float(os.getenv("MYSQL_POOL_ACQUIRE_TIMEOUT", 10)),
+    # Idle connections older than this many seconds are reopened; -1 never.
+    pool_recycle=int(os.getenv("MYSQL_POOL_RECYCLE", -1)),
+    # Ping every connection on checkout and replace it if the ping fails.
+    pool_pre_ping=_env_flag("MYSQL_POOL_PRE_PING"),
+    # Upper bound of connections a single request may fan out over.
+    fanout_connections=int(os.getenv("MYSQL_FANOUT_CONNECTIONS", 3)),
+    # Open every fanned-out connection with a consistent read snapshot.
+    fanout_snapshot=_env_flag("MYSQL_FANOUT_SNAPSHOT"),
+    # Comma-separated "host[:port]" list of read replicas; empty disables routing.
+    replica_hosts=[
+        entry.strip()
+        for entry in os.getenv("MYSQL_REPLICA_HOSTS", "").split(",")
+        if entry.strip()
+    ],
+    # Replicas further behind than this (seconds) are skipped for reads.
+    replica_max_lag=float(os.getenv("MYSQL_REPLICA_MAX_LAG", 5)),
+    # Seconds between SHOW REPLICA STATUS probes.
+    replica_check_interval=float(os.getenv("MYSQL_REPLICA_CHECK_INTERVAL", 2)),
+    # Rows fetched per round trip when streaming with an unbuffered cursor.
+    stream_chunk_rows=int(os.getenv("MYSQL_STREAM_CHUNK_ROWS", 500)),
+    # Attempts for a transaction that hits a deadlock or lock-wait timeout.
+    lock_retry_attempts=int(os.getenv("MYSQL_LOCK_RETRY_ATTEMPTS", 4)),
+    # Backoff before retry n is uniform in [0, base * 2**(n-1)] seconds.
+    lock_retry_base_delay=float(os.getenv("MYSQL_LOCK_RETRY_BASE_DELAY", 0.05)),
 )
 
+# ER_LOCK_DEADLOCK and ER_LOCK_WAIT_TIMEOUT: the transaction can be replayed.
+TRANSIENT_LOCK_ERRORS = frozenset({1213, 1205})
+
+Job = Callable[[aiomysql.Connection], Awaitable[Any]]
+T = TypeVar("T")
+
+
+def decode_time(value: str) -> Union[time, timedelta]:
+    """MySQL TIME as ``datetime.time``.
+
+    TIME is really a signed duration of up to 838 hours; values that are not
+    a time of day keep the driver's ``timedelta``.
+    """
+
+    try:
+        return time.fromisoformat(value)
+    except ValueError:
+        return convert_timedelta(value)
+
+
+# Text-protocol converters by column type, handed to every pool as ``conv``.
+ROW_DECODERS: Dict[int, Callable[[str], Any]] = {
+    **pymysql_decoders,
+    FIELD_TYPE.TIME: decode_time,
+}
+# Read pools serve dashboards and lists only, where float is what the
+# response models hold anyway; write pools keep Decimal for exact amounts.
+READ_ROW_DECODERS: Dict[int, Callable[[str], Any]] = {
+    **ROW_DECODERS,
+    FIELD_TYPE.DECIMAL: float,
+    FIELD_TYPE.NEWDECIMAL: float,
+}
+
+
+@contextmanager
+def iso_dates(conn: aiomysql.Connection) -> Iterator[aiomysql.Connection]:
+    """Within the block, DATE columns read on ``conn`` stay ``YYYY-MM-DD`` strings.
+
+    MySQL already sends dates in ISO form, so handlers that put them straight
+    into a response skip the ``date`` round trip.
+    """
+
+    decoders = conn.decoders
+    conn.decoders = {**decoders, FIELD_TYPE.DATE: str}
+    try:
+        yield conn
+    finally:
+        conn.decoders = decoders
+
+
+class PoolTimeoutError(Exception):
+    """Raised when no pooled connection frees up within the acquire timeout."""
+
+    def __init__(self, timeout: float) -> None:
+        super().__init__(f"No database connection available within {timeout:g}s")
+        self.timeout = timeout
+
+
+class PoolMetrics:
+    """Counters and an acquire-wait histogram for one pool."""
+
+    # Upper bounds (ms) of the wait histogram buckets; the last bucket is +Inf.
+    BUCKETS_MS = (1, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000)
+
+    def __init__(self) -> None:
+        self.waiting = 0
+        self.acquired = 0
+        self.timeouts = 0
+        self.ping_failures = 0
+        self.wait_ms_total = 0.0
+        self._bucket_counts = [0] * (len(self.BUCKETS_MS) + 1)
+
+    def observe_wait(self, wait_ms: float) -> None:
+        self.wait_ms_total += wait_ms
+        self._bucket_counts[bisect_left(self.BUCKETS_MS, wait_ms)] += 1
 
-async def create_pool() -> aiomysql.Pool:
-    return await aiomysql.create_pool(
-        host=cfg["host"],
-        port=cfg["port"],
+    def histogram(self) -> List[Dict[str, Any]]:
+        """Cumulative bucket counts, Prometheus style."""
+
+        cumulative = 0
+        buckets = []
+        for bound, count in zip((*self.BUCKETS_MS, "+Inf"), self._bucket_counts):
+            cumulative += count
+            buckets.append({"le": bound, "count": cumulative})
+        return buckets
+
+
+class InstrumentedPool(aiomysql.Pool):
+    """``aiomysql.Pool`` with an acquire timeout, pre-ping and metrics.
+
+    Both ``async with pool.acquire()`` and ``await pool.acquire()`` go through
+    ``_acquire``, so request connections and :func:`fan_out` borrows are
+    measured alike.
+    """
+
+    def __init__(
+        self,
+        *,
+        acquire_timeout: float = 0,
+        pre_ping: bool = False,
+        **kwargs: Any,
+    ) -> None:
+        super().__init__(**kwargs)
+        self.acquire_timeout = acquire_timeout
+        self.pre_ping = pre_ping
+        self.metrics = PoolMetrics()
+
+    async def warm_up(self) -> None:
+        """Open the ``minsize`` connections concurrently before serving."""
+
+        async with self._cond:
+            missing = self.minsize - self.size
+            if missing <= 0:
+                return
+            opened = await asyncio.gather(
+                *(
+                    connect(echo=self._echo, loop=self._loop, **self._conn_kwargs)
+                    for _ in range(missing)
+                ),
+                return_exceptions=True,
+            )
+            failures = [c for c in opened if isinstance(c, BaseException)]
+            for conn in opened:
+                if isinstance(conn, BaseException):
+                    continue
+                if failures:
+                    conn.close()
+                else:
+                    self._free.append(conn)
+            if failures:
+                raise failures[0]
+            self._cond.notify_all()
+
+    async def _acquire(self) -> aiomysql.Connection:
+        conn = await self._timed_acquire()
+        if self.pre_ping:
+            try:
+                await conn.ping(reconnect=False)
+            except BaseException as exc:
+                # The connection is already out of the pool; a cancelled ping
+                # must hand its slot back too, or the pool shrinks for good.
+                conn.close()
+                self.release(conn)
+                if not isinstance(exc, Exception):
+                    raise
+                self.metrics.ping_failures += 1
+                conn = await self._timed_acquire()
+        return conn
+
+    async def _timed_acquire(self) -> aiomysql.Connection:
+        started = self._loop.time()
+        self.metrics.waiting += 1
+        task = asyncio.ensure_future(super()._acquire())
+        try:
+            done, _ = await asyncio.wait(
+                {task}, timeout=self.acquire_timeout or None
+            )
+        except asyncio.CancelledError:
+            self._abandon(task)
+            raise
+        finally:
+            self.metrics.waiting -= 1
+            self.metrics.observe_wait((self._loop.time() - started) * 1000)
+        if not done:
+            self._abandon(task)
+            self.metrics.timeouts += 1
+            raise PoolTimeoutError(self.acquire_timeout)
+        self.metrics.acquired += 1
+        return task.result()
+
+    def _abandon(self, task: "asyncio.Future[aiomysql.Connection]") -> None:
+        # A connection handed out while we were giving up goes straight back.
+        def give_back(done: "asyncio.Future[aiomysql.Connection]") -> None:
+            if not done.cancelled() and done.exception() is None:
+                self.release(done.result())
+
+        task.cancel()
+        task.add_done_callback(give_back)
+
+    def stats(self) -> Dict[str, Any]:
+        metrics = self.metrics
+        return {
+            "minSize": self.minsize,
+            "maxSize": self.maxsize,
+            "size": self.size,
+            "inUse": len(self._used),
+            "idle": self.freesize,
+            "connecting": self._acquiring,
+            "waiting": metrics.waiting,
+            "acquired": metrics.acquired,
+            "timeouts": metrics.timeouts,
+            "pingFailures": metrics.ping_failures,
+            "acquireTimeoutSeconds": self.acquire_timeout,
+            "waitMsTotal": round(metrics.wait_ms_total, 3),
+            "waitHistogramMs": metrics.histogram(),
+        }
+
+
+async def create_pool(
+    host: Optional[str] = None,
+    port: Optional[int] = None,
+    *,
+    autocommit: bool = False,
+) -> InstrumentedPool:
+    """Build a pool from ``cfg``; call ``warm_up()`` before serving traffic.
+
+    ``host``/``port`` default to the primary and are overridden for replicas.
+    Write pools keep ``autocommit=False`` so each request commits once; read
+    pools use autocommit so plain SELECTs need no COMMIT round trip. Every
+    pool decodes TIME as ``datetime.time``; read pools also decode DECIMAL
+    as ``float`` (``READ_ROW_DECODERS``).
+    """
+
+    return InstrumentedPool(
+        minsize=cfg["pool_min"],
+        maxsize=cfg["pool_max"],
+        echo=False,
+        pool_recycle=cfg["pool_recycle"],
+        loop=asyncio.get_running_loop(),
+        acquire_timeout=cfg["pool_acquire_timeout"],
+        pre_ping=cfg["pool_pre_ping"],
+        host=host or cfg["host"],
+        port=port or cfg["port"],
         user=cfg["user"],
         password=cfg["password"],
         db=cfg["database"],
-        minsize=1,
-        maxsize=5,
-        autocommit=False,  # we will control transactions manually
+        autocommit=autocommit,
+        conv=READ_ROW_DECODERS if autocommit else ROW_DECODERS,
+    )
+
+
+class ReplicaPool:
+    """A replica's pool plus the replication lag last reported by the server."""
+
+    def __init__(self, name: str, pool: InstrumentedPool) -> None:
+        self.name = name
+        self.pool = pool
+        self.lag_seconds: Optional[float] = None
+        self.error: Optional[str] = "not checked yet"
+
+    def usable(self, max_lag: float) -> bool:
+        return self.lag_seconds is not None and self.lag_seconds <= max_lag
+
+    async def check_lag(self) -> None:
+        """Refresh ``lag_seconds`` from ``SHOW REPLICA STATUS``.
+
+        A stopped SQL/IO thread reports a NULL lag and a server that is not a
+        replica returns no row; both mark the replica unusable.
+        """
+
+        try:
+            async with self.pool.acquire() as conn:
+                async with conn.cursor(aiomysql.DictCursor) as cur:
+                    await cur.execute("SHOW REPLICA STATUS")
+                    row = await cur.fetchone()
+        except Exception as exc:
+            self.lag_seconds, self.error = None, str(exc)
+            return
+        if row is None:
+            self.lag_seconds, self.error = None, "server is not a replica"
+        elif row.get("Seconds_Behind_Source") is None:
+            self.lag_seconds, self.error = None, "replication is not running"
+        else:
+            self.lag_seconds, self.error = float(row["Seconds_Behind_Source"]), None
+
+
+class DatabaseRouter:
+    """Primary pools for writes and reads plus lag-checked replica pools.
+
+    ``primary`` runs transactions; ``primary_read`` is an autocommit pool on the
+    same server used when no replica qualifies.
+    """
+
+    def __init__(
+        self,
+        primary: InstrumentedPool,
+        primary_read: InstrumentedPool,
+        replicas: Sequence[ReplicaPool] = (),
+        *,
+        max_lag: float = 5,
+        check_interval: float = 2,
+    ) -> None:
+        self.primary = primary
+        self.primary_read = primary_read
+        self.replicas = list(replicas)
+        self.max_lag = max_lag
+        self.check_interval = check_interval
+        self._turn = count()
+        self._monitor: Optional[asyncio.Task] = None
+
+    def read_pool(self) -> InstrumentedPool:
+        """Round-robin over replicas within ``max_lag``, else the primary."""
+
+        usable = [r for r in self.replicas if r.usable(self.max_lag)]
+        if not usable:
+            return self.primary_read
+        return usable[next(self._turn) % len(usable)].pool
+
+    async def start(self) -> None:
+        """Warm every pool, probe replica lag once and keep probing."""
+
+        await self.primary.warm_up()
+        await self.primary_read.warm_up()
+        for replica in self.replicas:
+            try:
+                await replica.pool.warm_up()
+            except Exception as exc:  # reads fall back to the primary
+                replica.error = str(exc)
+        await self._check_replicas()
+        if self.replicas:
+            self._monitor = asyncio.create_task(self._monitor_replicas())
+
+    async def close(self) -> None:
+        if self._monitor is not None:
+            self._monitor.cancel()
+            await asyncio.gather(self._monitor, return_exceptions=True)
+        pools = [self.primary, self.primary_read, *(replica.pool for replica in self.replicas)]
+        for pool in pools:
+            pool.close()
+        await asyncio.gather(*(pool.wait_closed() for pool in pools))
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "primary": self.primary.stats(),
+            "primaryRead": self.primary_read.stats(),
+            "replicas": [
+                {
+                    "name": replica.name,
+                    "lagSeconds": replica.lag_seconds,
+                    "usable": replica.usable(self.max_lag),
+                    "error": replica.error,
+                    **replica.pool.stats(),
+                }
+                for replica in self.replicas
+            ],
+            "maxLagSeconds": self.max_lag,
+        }
+
+    async def _check_replicas(self) -> None:
+        await asyncio.gather(*(replica.check_lag() for replica in self.replicas))
+
+    async def _monitor_replicas(self) -> None:
+        while True:
+            await asyncio.sleep(self.check_interval)
+            await self._check_replicas()
+
+
+async def create_router() -> DatabaseRouter:
+    """Build the primary and ``MYSQL_REPLICA_HOSTS`` pools; call ``start()`` next."""
+
+    replicas = []
+    for entry in cfg["replica_hosts"]:
+        host, _, port = entry.partition(":")
+        pool = await create_pool(
+            host=host, port=int(port) if port else None, autocommit=True
+        )
+        replicas.append(ReplicaPool(entry, pool))
+    return DatabaseRouter(
+        await create_pool(),
+        await create_pool(autocommit=True),
+        replicas,
+        max_lag=cfg["replica_max_lag"],
+        check_interval=cfg["replica_check_interval"],
     )
 
 
+async def fan_out(
+    conn: aiomysql.Connection,
+    pool: Optional[aiomysql.Pool],
+    jobs: Sequence[Job],
+    *,
+    max_connections: int = 1,
+    consistent_snapshot: bool = False,
+) -> List[Any]:
+    """Run independent read jobs over ``conn`` plus extra pooled connections.
+
+    ``conn`` always takes part, so the request makes progress even when the
+    pool is exhausted; up to ``max_connections - 1`` additional connections are
+    borrowed from ``pool`` and any borrow still waiting once the queue is
+    drained is cancelled. Results come back in the order of ``jobs``.
+
+    With ``consistent_snapshot`` every participating connection starts a
+    ``WITH CONSISTENT SNAPSHOT, READ ONLY`` transaction before its first job.
+    InnoDB snapshots are per session, so sections see the database as of their
+    worker's start; use ``max_connections=1`` for a single shared snapshot.
+    """
+
+    results: List[Any] = [None] * len(jobs)
+    pending = deque(enumerate(jobs))
+
+    async def drain(worker: aiomysql.Connection) -> None:
+        if consistent_snapshot:
+            async with worker.cursor() as cur:
+                await cur.execute(
+                    "START TRANSACTION WITH CONSISTENT SNAPSHOT, READ ONLY"
+                )
+        try:
+            while pending:
+                index, job = pending.popleft()
+                results[index] = await job(worker)
+        except Exception:
+            pending.clear()
+            raise
+
+    borrowed: set = set()
+
+    async def borrow(slot: int) -> None:
+        try:
+            extra = await pool.acquire()
+        except Exception:
+            return  # the request connection picks up the remaining jobs
+        borrowed.add(slot)
+        try:
+            if pending:
+                await drain(extra)
+        finally:
+            try:
+                # Pool.release() closes connections left inside a transaction.
+                if extra.get_transaction_status():
+                    await extra.rollback()
+            finally:
+                pool.release(extra)
+
+    extra_count = min(max_connections, len(jobs)) - 1 if pool is not None else 0
+    helpers = [asyncio.create_task(borrow(slot)) for slot in range(extra_count)]
+    try:
+        await drain(conn)
+        if consistent_snapshot:
+            await conn.commit()
+    finally:
+        for slot, task in enumerate(helpers):
+            if slot not in borrowed:
+                task.cancel()
+        outcomes = await asyncio.gather(*helpers, return_exceptions=True)
+    for outcome in outcomes:
+        if isinstance(outcome, Exception):
+            raise outcome
+    return results
+
+
+async def stream_rows(
+    conn: aiomysql.Connection,
+    sql: str,
+    params: Sequence[Any] = (),
+    *,
+    chunk_size: Optional[int] = None,
+) -> AsyncIterator[List[Dict[str, Any]]]:
+    """Yield result rows in chunks from an unbuffered ``SSDictCursor``.
+
+    Only one chunk is held in memory at a time. The connection is busy until
+    the generator is exhausted or closed, so nothing else may run on ``conn``
+    while iterating.
+    """
+
+    size = chunk_size or cfg["stream_chunk_rows"]
+    async with conn.cursor(aiomysql.SSDictCursor) as cur:
+        await cur.execute(sql, params)
+        while True:
+            rows = await cur.fetchmany(size)
+            if not rows:
+                break
+            yield rows
+
+
+class RowLayout:
+    """Column positions of one result set, resolved once per query.
+
+    Rows stay the plain tuples the default cursor returns; handlers read them
+    through :meth:`getter` instead of paying for a dict per row.
+    """
+
+    __slots__ = ("positions",)
+
+    def __init__(self, description: Sequence[Sequence[Any]]) -> None:
+        self.positions = {column[0]: index for index, column in enumerate(description)}
+
+    def getter(self, *names: str) -> Callable[[Sequence[Any]], Tuple[Any, ...]]:
+        """Return a callable picking ``names`` out of a row, as a tuple."""
+
+        indexes = [self.positions[name] for name in names]
+        if len(indexes) == 1:
+            (index,) = indexes
+            return lambda row: (row[index],)
+        return itemgetter(*indexes)
+
+
+async def fetch_tuples(
+    conn: aiomysql.Connection, sql: str, params: Sequence[Any] = ()
+) -> Tuple[RowLayout, List[Tuple[Any, ...]]]:
+    """Run ``sql`` on a tuple cursor; return the column layout and all rows."""
+
+    async with conn.cursor() as cur:
+        await cur.execute(sql, params)
+        rows = await cur.fetchall()
+        return RowLayout(cur.description), rows
+
+
+async def stream_tuples(
+    conn: aiomysql.Connection,
+    sql: str,
+    params: Sequence[Any] = (),
+    *,
+    chunk_size: Optional[int] = None,
+) -> AsyncIterator[Tuple[RowLayout, List[Tuple[Any, ...]]]]:
+    """Tuple-row counterpart of :func:`stream_rows` (``SSCursor``).
+
+    Every chunk comes with the same :class:`RowLayout`.
+    """
+
+    size = chunk_size or cfg["stream_chunk_rows"]
+    async with conn.cursor(aiomysql.SSCursor) as cur:
+        await cur.execute(sql, params)
+        layout = RowLayout(cur.description)
+        while True:
+            rows = await cur.fetchmany(size)
+            if not rows:
+                break
+            yield layout, rows
+
+
+def is_transient_lock_error(exc: BaseException) -> bool:
+    return (
+        isinstance(exc, aiomysql.OperationalError)
+        and bool(exc.args)
+        and exc.args[0] in TRANSIENT_LOCK_ERRORS
+    )
+
+
+async def retry_on_lock_errors(
+    conn: aiomysql.Connection,
+    operation: Callable[[], Awaitable[T]],
+    *,
+    attempts: Optional[int] = None,
+    base_delay: Optional[float] = None,
+) -> T:
+    """Run ``operation`` in ``conn``'s transaction, replaying it on lock errors.
+
+    After a deadlock (1213) or lock-wait timeout (1205) the transaction is
+    rolled back and ``operation`` runs again after a full-jitter backoff, so
+    contending writers spread out instead of colliding again in lockstep.
+    ``operation`` must redo all of its writes; the last error is re-raised
+    once ``attempts`` are used up.
+    """
+
+    attempts = attempts or cfg["lock_retry_attempts"]
+    base_delay = cfg["lock_retry_base_delay"] if base_delay is None else base_delay
+    attempt = 1
+    while True:
+        try:
+            return await operation()
+        except aiomysql.OperationalError as exc:
+            if not is_transient_lock_error(exc) or attempt >= attempts:
+                raise
+        await conn.rollback()
+        await asyncio.sleep(random.uniform(0, base_delay * 2 ** (attempt - 1)))
+        attempt += 1
+
+
 AUTO_INCREMENT_TARGETS: Dict[str, str] = {
     "Hospital": "HID",
     "Department": "DEP_ID",
@@ -1,106 +1,317 @@
+import base64
+import json
 import aiomysql
 import aiomysql.cursors
-from typing import Optional, Dict, Literal
-from datetime import datetime, date, time
+from typing import (
+    Any,
+    AsyncIterator,
+    Callable,
+    Optional,
+    Dict,
+    List,
+    Literal,
+    Mapping,
+    Sequence,
+    Tuple,
+)
+from datetime import datetime, date, time, timedelta
+
+from ..db import (
+    RowLayout,
+    fetch_tuples,
+    is_transient_lock_error,
+    iso_dates,
+    stream_tuples,
+)
+from ..reference_data import ReferenceResolver
 
 ALLOWED_STATUSES = {"Scheduled", "Completed", "Cancelled", "No Show"}
 
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 500
+# Upper bound for count="estimate"; counting stops once this many rows matched.
+COUNT_ESTIMATE_CAP = 10000
+
+# Rows per multi-row INSERT in schedule_appointments_bulk; small enough that
+# executemany never splits a chunk into several statements.
+BULK_INSERT_CHUNK = 200
+MAX_BULK_APPOINTMENTS = 1000
+BULK_INSERT_CA_SQL = (
+    "INSERT INTO ClinicalActivity (Time, Date, IID, DEP_ID, STAFF_ID)"
+    " VALUES (%s, %s, %s, %s, %s)"
+)
+BULK_INSERT_APPOINTMENT_SQL = (
+    "INSERT INTO Appointment (CAID, Status, Reason) VALUES (%s, %s, %s)"
+)
+# SIGNAL SQLSTATE '45000' from trg_no_double_booking_before_insert.
+ER_SIGNAL_EXCEPTION = 1644
+
+# Locking read of a staff slot through idx_ClinicalActivity_STAFF_ID_Date_Time.
+# Under REPEATABLE READ an empty slot still gets a gap lock, so a concurrent
+# booking of the same slot blocks (or deadlocks and is retried) instead of
+# inserting a second appointment.
+SLOT_LOCK_SQL = (
+    "SELECT ca.CAID FROM ClinicalActivity ca"
+    " JOIN Appointment ap ON ap.CAID = ca.CAID"
+    " WHERE ca.STAFF_ID = %s AND ca.Date = %s AND ca.Time = %s"
+    " FOR UPDATE OF ca"
+)
+
+
+class SlotConflictError(ValueError):
+    """The staff member already has an appointment in the requested slot."""
+
+
+APPOINTMENTS_SELECT = """
+    SELECT
+        ap.CAID AS id,
+        ca.Date AS date,
+        ca.Time AS time,
+        h.Name AS hospital,
+        d.Name AS department,
+        p.FullName AS patient,
+        s.FullName AS staff,
+        ap.Reason AS reason,
+        ap.Status AS status
+    FROM Appointment ap
+    JOIN ClinicalActivity ca ON ap.CAID = ca.CAID
+    JOIN Patient p ON ca.IID = p.IID
+    JOIN Staff s ON ca.STAFF_ID = s.STAFF_ID
+    JOIN Department d ON ca.DEP_ID = d.DEP_ID
+    JOIN Hospital h ON d.HID = h.HID
+"""
+
+# Newest first. Time is nullable and MySQL sorts NULL lowest, so NULL-time
+# rows come last within a day; the cursor predicate below mirrors that.
+APPOINTMENTS_ORDER = " ORDER BY ca.Date DESC, ca.Time DESC, ca.CAID DESC"
+
+
+# Columns of APPOINTMENTS_SELECT in the order the formatter unpacks them.
+APPOINTMENT_COLUMNS = (
+    "id",
+    "date",
+    "time",
+    "hospital",
+    "department",
+    "patient",
+    "staff",
+    "reason",
+    "status",
+)
+
+
+def encode_cursor(d: Any, t: Any, caid: int) -> str:
+    """Build the opaque cursor pointing just past the row ``(d, t, caid)``."""
+
+    if isinstance(t, time):
+        seconds = t.hour * 3600 + t.minute * 60 + t.second
+    elif isinstance(t, timedelta):
+        seconds = int(t.total_seconds())
+    else:
+        seconds = None
+    payload = [d.isoformat() if hasattr(d, "isoformat") else str(d), seconds, caid]
+    raw = json.dumps(payload, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[date, Optional[timedelta], int]:
+    """Inverse of :func:`encode_cursor`; raises ``ValueError`` on bad input."""
+
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        date_str, seconds, caid = json.loads(raw)
+        cursor_date = datetime.strptime(date_str, "%Y-%m-%d").date()
+        cursor_time = None if seconds is None else timedelta(seconds=int(seconds))
+        return cursor_date, cursor_time, int(caid)
+    except Exception:
+        raise ValueError("Invalid cursor")
+
+
+def _build_appointments_filters(
+    date_range: Optional[str],
+    status: Optional[str],
+    hospital: Optional[str],
+) -> Tuple[str, List]:
+    """Return the ``WHERE`` clause and params shared by page and count queries."""
+
+    # validate status filter if provided
+    if status and status not in ALLOWED_STATUSES:
+        raise ValueError(f"Invalid status filter: {status}")
+
+    where = " WHERE 1=1"
+    params: List = []
+
+    # date_range format: "YYYY-MM-DD..YYYY-MM-DD"
+    if date_range:
+        try:
+            start_str, end_str = date_range.split("..")
+            # validate date formats
+            _ = datetime.strptime(start_str, "%Y-%m-%d").date()
+            _ = datetime.strptime(end_str, "%Y-%m-%d").date()
+        except Exception:
+            raise ValueError("date_range must be 'YYYY-MM-DD..YYYY-MM-DD'")
+        where += " AND ca.Date BETWEEN %s AND %s"
+        params.extend([start_str, end_str])
+
+    if status:
+        where += " AND ap.Status = %s"
+        params.append(status)
+
+    if hospital:
+        where += " AND h.Name = %s"
+        params.append(hospital)
+
+    return where, params
+
+
+def _cursor_predicate(cursor: str) -> Tuple[str, List]:
+    """Keyset predicate selecting rows strictly after ``cursor`` in page order."""
+
+    cursor_date, cursor_time, caid = decode_cursor(cursor)
+    if cursor_time is None:
+        return (
+            " AND (ca.Date < %s OR (ca.Date = %s AND ca.Time IS NULL AND ca.CAID < %s))",
+            [cursor_date, cursor_date, caid],
+        )
+    return (
+        " AND (ca.Date < %s OR (ca.Date = %s AND (ca.Time < %s OR ca.Time IS NULL"
+        " OR (ca.Time = %s AND ca.CAID < %s))))",
+        [cursor_date, cursor_date, cursor_time, cursor_time, caid],
+    )
+
+
+def appointment_formatter(layout: RowLayout) -> Callable[[Sequence[Any]], Dict]:
+    """Return the function shaping one tuple row into the API representation.
+
+    Column positions are resolved once here. Expects the pool decoders:
+    ``date`` read under :func:`iso_dates` (an ISO string) and ``time`` as
+    ``datetime.time``.
+    """
+
+    columns = layout.getter(*APPOINTMENT_COLUMNS)
+
+    def format_row(row: Sequence[Any]) -> Dict:
+        caid, d, t, hospital, department, patient, staff, reason, status = columns(row)
+        return {
+            "id": f"APT-{caid}",
+            "date": d,
+            "time": t.strftime("%H:%M") if t is not None else None,
+            "hospital": hospital,
+            "department": department,
+            "patient": patient,
+            "staff": staff,
+            "reason": reason,
+            "status": status,
+        }
+
+    return format_row
+
+
+async def _estimate_appointments_total(
+    cur: aiomysql.Cursor, where: str, params: List
+) -> Tuple[int, bool]:
+    """Count matches up to ``COUNT_ESTIMATE_CAP``; the flag is True when capped."""
+
+    await cur.execute(
+        "SELECT COUNT(*) AS total FROM ("
+        "SELECT 1 FROM Appointment ap"
+        " JOIN ClinicalActivity ca ON ap.CAID = ca.CAID"
+        " JOIN Department d ON ca.DEP_ID = d.DEP_ID"
+        " JOIN Hospital h ON d.HID = h.HID"
+        f"{where} LIMIT %s) AS capped",
+        [*params, COUNT_ESTIMATE_CAP + 1],
+    )
+    total = (await cur.fetchone())["total"]
+    if total > COUNT_ESTIMATE_CAP:
+        return COUNT_ESTIMATE_CAP, True
+    return total, False
+
 
 async def get_all_appointments(
     conn: aiomysql.Connection,
     date_range: Optional[str] = None,
     status: Optional[str] = None,
     hospital: Optional[str] = None,
+    limit: int = DEFAULT_PAGE_SIZE,
+    cursor: Optional[str] = None,
+    count: Optional[Literal["estimate"]] = None,
 ) -> Dict:
     """
-    Return {"appointments": [...], "lastSyncedAt": "...Z"}
+    Return one page: {"appointments": [...], "nextCursor": ..., "lastSyncedAt": "...Z"}
+
+    Pages are ordered newest first over (Date, Time, CAID). Pass the returned
+    ``nextCursor`` back as ``cursor`` to continue; it is ``None`` on the last
+    page. With ``count="estimate"`` the response also carries ``totalEstimate``
+    and ``totalCapped``.
     """
-    # validate status filter if provided
-    if status and status not in ALLOWED_STATUSES:
-        raise ValueError(f"Invalid status filter: {status}")
+    if not 1 <= limit <= MAX_PAGE_SIZE:
+        raise ValueError(f"limit must be between 1 and {MAX_PAGE_SIZE}")
 
-    async with conn.cursor(aiomysql.cursors.DictCursor) as cur:
-        query = """
-            SELECT 
-                ap.CAID AS id,
-                ca.Date AS date,
-                ca.Time AS time,
-                h.Name AS hospital,
-                d.Name AS department,
-                p.FullName AS patient,
-                s.FullName AS staff,
-                ap.Reason AS reason,
-                ap.Status AS status
-            FROM Appointment ap
-            JOIN ClinicalActivity ca ON ap.CAID = ca.CAID
-            JOIN Patient p ON ca.IID = p.IID
-            JOIN Staff s ON ca.STAFF_ID = s.STAFF_ID
-            JOIN Department d ON ca.DEP_ID = d.DEP_ID
-            JOIN Hospital h ON d.HID = h.HID
-            WHERE 1=1
-        """
-
-        params = []
-
-        # date_range format: "YYYY-MM-DD..YYYY-MM-DD"
-        if date_range:
-            try:
-                start_str, end_str = date_range.split("..")
-                # validate date formats
-                _ = datetime.strptime(start_str, "%Y-%m-%d").date()
-                _ = datetime.strptime(end_str, "%Y-%m-%d").date()
-            except Exception:
-                raise ValueError("date_range must be 'YYYY-MM-DD..YYYY-MM-DD'")
-            query += " AND ca.Date BETWEEN %s AND %s"
-            params.extend([start_str, end_str])
-
-        if status:
-            query += " AND ap.Status = %s"
-            params.append(status)
-
-        if hospital:
-            query += " AND h.Name = %s"
-            params.append(hospital)
-
-        await cur.execute(query, params)
-        rows = await cur.fetchall()
-
-        appointments = []
-        for row in rows:
-            # row['date'] and row['time'] may be datetime/date/time objects or strings depending on driver
-            d = row.get("date")
-            t = row.get("time")
-            date_str = (
-                d.strftime("%Y-%m-%d")
-                if hasattr(d, "strftime")
-                else (d if d is not None else None)
-            )
-            time_str = (
-                t.strftime("%H:%M")
-                if hasattr(t, "strftime")
-                else (t if t is not None else None)
-            )
+    where, params = _build_appointments_filters(date_range, status, hospital)
+    page_where, page_params = where, list(params)
+    if cursor:
+        predicate, predicate_params = _cursor_predicate(cursor)
+        page_where += predicate
+        page_params.extend(predicate_params)
 
-            appointments.append(
-                {
-                    "id": f"APT-{row['id']}",
-                    "date": date_str,
-                    "time": time_str,
-                    "hospital": row.get("hospital"),
-                    "department": row.get("department"),
-                    "patient": row.get("patient"),
-                    "staff": row.get("staff"),
-                    "reason": row.get("reason"),
-                    "status": row.get("status"),
-                }
-            )
+    with iso_dates(conn):
+        layout, rows = await fetch_tuples(
+            conn,
+            APPOINTMENTS_SELECT + page_where + APPOINTMENTS_ORDER + " LIMIT %s",
+            [*page_params, limit + 1],
+        )
+
+    result: Dict = {}
+    if count == "estimate":
+        async with conn.cursor(aiomysql.cursors.DictCursor) as cur:
+            total, capped = await _estimate_appointments_total(cur, where, params)
+        result["totalEstimate"] = total
+        result["totalCapped"] = capped
+
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+    format_row = appointment_formatter(layout)
 
     return {
-        "appointments": appointments,
+        "appointments": [format_row(row) for row in rows],
+        "nextCursor": (
+            encode_cursor(*layout.getter("date", "time", "id")(rows[-1]))
+            if has_more
+            else None
+        ),
+        **result,
         "lastSyncedAt": datetime.utcnow().isoformat() + "Z",
     }
 
 
+async def stream_appointments(
+    conn: aiomysql.Connection,
+    date_range: Optional[str] = None,
+    status: Optional[str] = None,
+    hospital: Optional[str] = None,
+    cursor: Optional[str] = None,
+) -> AsyncIterator[List[Dict]]:
+    """Yield every matching appointment in page order, one chunk at a time.
+
+    Used for NDJSON exports: no page size applies, ``cursor`` only sets the
+    starting point.
+    """
+    where, params = _build_appointments_filters(date_range, status, hospital)
+    if cursor:
+        predicate, predicate_params = _cursor_predicate(cursor)
+        where += predicate
+        params.extend(predicate_params)
+
+    format_row = None
+    with iso_dates(conn):
+        async for layout, rows in stream_tuples(
+            conn, APPOINTMENTS_SELECT + where + APPOINTMENTS_ORDER, params
+        ):
+            if format_row is None:
+                format_row = appointment_formatter(layout)
+            yield [format_row(row) for row in rows]
+
+
 async def schedule_appointment(
     conn: aiomysql.Connection,
     date_: date,
@@ -112,61 +323,38 @@ async def schedule_appointment(
     reason: str,
     status: Literal["Scheduled", "Completed", "Cancelled", "No Show"] = "Scheduled",
     appointment_id: Optional[str] = None,
+    resolver: Optional[ReferenceResolver] = None,
 ) -> Dict:
     """
     Insert ClinicalActivity + Appointment and return canonical appointment dict.
-    Rolls back on error.
+    Names are resolved through ``resolver`` (uncached when omitted). The staff
+    slot is locked with ``SLOT_LOCK_SQL`` before inserting; a taken slot raises
+    :class:`SlotConflictError`. Deadlocks surface as ``OperationalError`` for
+    the caller to retry (see ``src.db.retry_on_lock_errors``).
+    Rolls back on error; the caller's connection dependency commits.
     """
     if status not in ALLOWED_STATUSES:
         raise ValueError("Invalid status value")
 
-    try:
-        async with conn.cursor() as cur:
-            # Resolve patient IID
-            if str(patient_name).isdigit():
-                await cur.execute(
-                    "SELECT IID FROM Patient WHERE IID=%s", (patient_name,)
-                )
-            else:
-                await cur.execute(
-                    "SELECT IID FROM Patient WHERE FullName=%s", (patient_name,)
-                )
-
-            patient_row = await cur.fetchone()
-            if not patient_row:
-                raise ValueError(f"Patient '{patient_name}' not found")
-            iid = patient_row[0]
-
-            # Resolve staff id
-            if str(staff_name).isdigit():
-                await cur.execute(
-                    "SELECT STAFF_ID FROM Staff WHERE STAFF_ID=%s", (staff_name,)
-                )
-            else:
-                await cur.execute(
-                    "SELECT STAFF_ID FROM Staff WHERE FullName=%s", (staff_name,)
-                )
+    if resolver is None:
+        resolver = ReferenceResolver(max_entries=0, preload=False)
 
-            staff_row = await cur.fetchone()
-            if not staff_row:
-                raise ValueError(f"Staff '{staff_name}' not found")
-            staff_id = staff_row[0]
+    try:
+        iid, staff_id, dep_id = await resolver.resolve_booking(
+            conn,
+            hospital=hospital_name,
+            department=department_name,
+            patient=patient_name,
+            staff=staff_name,
+        )
 
-            # Resolve department
-            await cur.execute(
-                """
-                SELECT d.DEP_ID FROM Department d
-                JOIN Hospital h ON d.HID = h.HID
-                WHERE d.Name=%s AND h.Name=%s
-                """,
-                (department_name, hospital_name),
-            )
-            dep_row = await cur.fetchone()
-            if not dep_row:
-                raise ValueError(
-                    f"Department '{department_name}' in Hospital '{hospital_name}' not found"
+        async with conn.cursor() as cur:
+            await cur.execute(SLOT_LOCK_SQL, (staff_id, date_, time_))
+            if await cur.fetchone():
+                raise SlotConflictError(
+                    f"Staff '{staff_name}' is already booked on "
+                    f"{date_:%Y-%m-%d} at {time_:%H:%M}"
                 )
-            dep_id = dep_row[0]
 
             # Insert ClinicalActivity (match your table column order: Time, Date, IID, DEP_ID, STAFF_ID)
             await cur.execute(
@@ -187,27 +375,256 @@ async def schedule_appointment(
                 (caid, status, reason),
             )
 
-            await conn.commit()
-
+    except aiomysql.OperationalError as exc:
+        await _rollback_quietly(conn)
+        if exc.args and exc.args[0] == ER_SIGNAL_EXCEPTION:
+            raise SlotConflictError(str(exc.args[-1])) from exc
+        raise
     except Exception:
         # ensure DB is not left in partial state
-        try:
-            await conn.rollback()
-        except Exception:
-            pass
+        await _rollback_quietly(conn)
         raise  # re-raise so caller (endpoint) can turn into HTTP response
 
     return {
-        "appointment": {
-            "id": f"APT-{caid}",
-            "date": date_.strftime("%Y-%m-%d"),
-            "time": time_.strftime("%H:%M"),
-            "hospital": hospital_name,
-            "department": department_name,
-            "patient": patient_name,
-            "staff": staff_name,
-            "reason": reason,
-            "status": status,
-        },
+        "appointment": _created_appointment(
+            caid,
+            {
+                "date": date_,
+                "time": time_,
+                "hospital": hospital_name,
+                "department": department_name,
+                "patient": patient_name,
+                "staff": staff_name,
+                "reason": reason,
+                "status": status,
+            },
+        ),
         "message": "Appointment created",
     }
+
+
+async def _rollback_quietly(conn: aiomysql.Connection) -> None:
+    try:
+        await conn.rollback()
+    except Exception:
+        pass
+
+
+def _created_appointment(caid: int, item: Mapping[str, Any]) -> Dict:
+    return {
+        "id": f"APT-{caid}",
+        "date": item["date"].strftime("%Y-%m-%d"),
+        "time": item["time"].strftime("%H:%M"),
+        "hospital": item["hospital"],
+        "department": item["department"],
+        "patient": item["patient"],
+        "staff": item["staff"],
+        "reason": item["reason"],
+        "status": item["status"],
+    }
+
+
+async def schedule_appointments_bulk(
+    conn: aiomysql.Connection,
+    items: Sequence[Mapping[str, Any]],
+    *,
+    resolver: Optional[ReferenceResolver] = None,
+) -> Dict:
+    """
+    Book many appointments in the caller's transaction; report each row.
+
+    ``items`` carry the :func:`schedule_appointment` fields by name (``date``,
+    ``time``, ``hospital``, ``department``, ``patient``, ``staff``,
+    ``reason``, ``status``). Names are resolved in one statement and
+    slots already taken (in the table or earlier in the batch) are reported as
+    conflicts before anything is written. The remaining rows are inserted
+    ``BULK_INSERT_CHUNK`` at a time with multi-row ``executemany``, so
+    ``trg_no_double_booking_before_insert`` still checks every row. A chunk
+    that fails (a slot booked concurrently) is rolled back to its savepoint
+    and retried row by row, so one clash does not sink its neighbours.
+    """
+    if resolver is None:
+        resolver = ReferenceResolver(max_entries=0, preload=False)
+
+    results: List[Optional[Dict]] = [None] * len(items)
+    resolved = await resolver.resolve_many(
+        conn,
+        departments=[(item["hospital"], item["department"]) for item in items],
+        patients=[item["patient"] for item in items],
+        staff=[item["staff"] for item in items],
+    )
+
+    rows: List[Tuple[int, Tuple]] = []
+    for index, item in enumerate(items):
+        iid = resolved.patients[item["patient"]]
+        staff_id = resolved.staff[item["staff"]]
+        dep_id = resolved.departments[(item["hospital"], item["department"])]
+        if item["status"] not in ALLOWED_STATUSES:
+            results[index] = _bulk_result(index, "error", "Invalid status value")
+        elif iid is None:
+            message = f"Patient '{item['patient']}' not found"
+            results[index] = _bulk_result(index, "error", message)
+        elif staff_id is None:
+            message = f"Staff '{item['staff']}' not found"
+            results[index] = _bulk_result(index, "error", message)
+        elif dep_id is None:
+            message = (
+                f"Department '{item['department']}' in Hospital "
+                f"'{item['hospital']}' not found"
+            )
+            results[index] = _bulk_result(index, "error", message)
+        else:
+            rows.append((index, (item["time"], item["date"], iid, dep_id, staff_id)))
+
+    taken = await _booked_slots(conn, [row for _, row in rows])
+    accepted: List[Tuple[int, Tuple]] = []
+    for index, row in rows:
+        slot = _slot_key(row)
+        if slot in taken:
+            results[index] = _bulk_result(index, "conflict", "Slot already booked")
+        else:
+            taken.add(slot)
+            accepted.append((index, row))
+
+    for start in range(0, len(accepted), BULK_INSERT_CHUNK):
+        chunk = accepted[start : start + BULK_INSERT_CHUNK]
+        for index, caid in await _insert_bulk_chunk(conn, items, chunk):
+            if isinstance(caid, int):
+                results[index] = _bulk_result(
+                    index,
+                    "created",
+                    "Appointment created",
+                    appointment=_created_appointment(caid, items[index]),
+                )
+            else:
+                results[index] = caid
+
+    counts = {"created": 0, "conflict": 0, "error": 0}
+    for result in results:
+        counts[result["status"]] += 1
+    return {
+        "results": results,
+        "created": counts["created"],
+        "conflicts": counts["conflict"],
+        "errors": counts["error"],
+    }
+
+
+def _bulk_result(
+    index: int, status: str, message: str, appointment: Optional[Dict] = None
+) -> Dict:
+    return {
+        "index": index,
+        "status": status,
+        "message": message,
+        "appointment": appointment,
+    }
+
+
+def _slot_key(row: Tuple) -> Tuple:
+    # (STAFF_ID, Date, Time) of an insert row (Time, Date, IID, DEP_ID, STAFF_ID).
+    return (row[4], row[1], row[0])
+
+
+async def _booked_slots(conn: aiomysql.Connection, rows: List[Tuple]) -> set:
+    """Lock the ``(STAFF_ID, Date, Time)`` slots of ``rows``; return the booked ones."""
+
+    if not rows:
+        return set()
+    slots = list(dict.fromkeys(_slot_key(row) for row in rows))
+    placeholders = ", ".join(["(%s, %s, %s)"] * len(slots))
+    args = [value for slot in slots for value in slot]
+    async with conn.cursor() as cur:
+        await cur.execute(
+            "SELECT ca.STAFF_ID, ca.Date, ca.Time"
+            " FROM ClinicalActivity ca"
+            " JOIN Appointment ap ON ap.CAID = ca.CAID"
+            f" WHERE (ca.STAFF_ID, ca.Date, ca.Time) IN ({placeholders})"
+            " FOR UPDATE OF ca",
+            args,
+        )
+        return {tuple(row) for row in await cur.fetchall()}
+
+
+async def _inserted_caids(
+    cur: aiomysql.Cursor, rows: List[Tuple], first_caid: int
+) -> List[Optional[int]]:
+    """Read back the CAIDs of the activities just inserted for ``rows``.
+
+    The auto-increment values of a multi-row insert are not guaranteed to be
+    consecutive (``auto_increment_increment`` > 1, interleaved lock mode), so
+    they are looked up by slot. The slots are locked by :func:`_booked_slots`
+    and unique within a chunk; activities there below ``first_caid`` (the
+    insert's first id) or already carrying an appointment are not ours.
+    ``None`` marks a row whose activity was not found.
+    """
+    slots = [_slot_key(row) for row in rows]
+    placeholders = ", ".join(["(%s, %s, %s)"] * len(slots))
+    await cur.execute(
+        "SELECT ca.STAFF_ID, ca.Date, ca.Time, ca.CAID"
+        " FROM ClinicalActivity ca"
+        " LEFT JOIN Appointment ap ON ap.CAID = ca.CAID"
+        f" WHERE (ca.STAFF_ID, ca.Date, ca.Time) IN ({placeholders})"
+        " AND ca.CAID >= %s AND ap.CAID IS NULL",
+        [value for slot in slots for value in slot] + [first_caid],
+    )
+    found = {tuple(row[:3]): row[3] for row in await cur.fetchall()}
+    return [found.get(slot) for slot in slots]
+
+
+async def _insert_bulk_chunk(
+    conn: aiomysql.Connection,
+    items: Sequence[Mapping[str, Any]],
+    chunk: List[Tuple[int, Tuple]],
+) -> List[Tuple[int, Any]]:
+    """Insert ``chunk``; return ``(index, caid)`` or ``(index, error result)``."""
+
+    async with conn.cursor() as cur:
+        await cur.execute("SAVEPOINT bulk_chunk")
+        try:
+            rows = [row for _, row in chunk]
+            await cur.executemany(BULK_INSERT_CA_SQL, rows)
+            if cur.rowcount == len(chunk):
+                caids = await _inserted_caids(cur, rows, cur.lastrowid)
+            else:
+                caids = [None]
+            if None not in caids:
+                await cur.executemany(
+                    BULK_INSERT_APPOINTMENT_SQL,
+                    [
+                        (caid, items[index]["status"], items[index]["reason"])
+                        for caid, (index, _) in zip(caids, chunk)
+                    ],
+                )
+        except aiomysql.MySQLError as exc:
+            # A deadlock rolls back the whole transaction (savepoint included);
+            # lock errors go to retry_on_lock_errors, which replays the request.
+            if is_transient_lock_error(exc):
+                raise
+        else:
+            if None not in caids:
+                await cur.execute("RELEASE SAVEPOINT bulk_chunk")
+                return [(index, caid) for caid, (index, _) in zip(caids, chunk)]
+        await cur.execute("ROLLBACK TO SAVEPOINT bulk_chunk")
+
+        outcomes: List[Tuple[int, Any]] = []
+        for index, row in chunk:
+            await cur.execute("SAVEPOINT bulk_row")
+            try:
+                await cur.execute(BULK_INSERT_CA_SQL, row)
+                caid = cur.lastrowid
+                await cur.execute(
+                    BULK_INSERT_APPOINTMENT_SQL,
+                    (caid, items[index]["status"], items[index]["reason"]),
+                )
+            except aiomysql.MySQLError as exc:
+                if is_transient_lock_error(exc):
+                    raise
+                await cur.execute("ROLLBACK TO SAVEPOINT bulk_row")
+                status = "conflict" if exc.args[0] == ER_SIGNAL_EXCEPTION else "error"
+                result = _bulk_result(index, status, str(exc.args[-1]))
+                outcomes.append((index, result))
+            else:
+                await cur.execute("RELEASE SAVEPOINT bulk_row")
+                outcomes.append((index, caid))
+        return outcomes
@@ -170,6 +170,12 @@
 # ### 4.4 Deferred: `POST /api/billing/insurance-payment`
 # The former reimbursement endpoint required an `OutstandingClaims` table that does not exist. Until a normalized payments table is added to the schema, this endpoint stays unimplemented. The UI surfaces a roadmap note instead of a form.
 
+# ### 4.5 `POST /api/billing/expenses/recompute`
+# - **Purpose:** Reprice expenses in bulk after prescription lines were corrected outside the API.
+# - **Body:** `{ "caids": [8123, 8124] }` (1 to 1000 CAIDs).
+# - **Rules:** Every listed activity with prescription lines gets `Total` rewritten from `StockCurrent` in one set-based `recompute_expenses` call; activities without lines keep their captured total. A missing unit price rejects the whole batch with `422 BILLING_MissingUnitPrice`.
+# - **Response:** `{ "expenses": [BillingExpenseRecord...], "message": "Expenses recomputed" }`, one record per listed CAID that has an expense.
+
 # ## 5. Error Handling & Frontend Integration
 # - All endpoints return JSON errors: `{ "message": "human readable", "code": "BILLING_xxx" }` with HTTP status codes (400 validation, 404 missing CAID, 409 trigger violation, 500 unexpected).
 # - Database trigger failures bubble up via `SIGNAL` and should propagate unchanged.
@@ -177,16 +183,27 @@
 # - When `/api/billing` fails, the Billing view falls back to the inline mock snapshot and displays the error banner; once a real payload arrives it shows the "Connected via BillingConnector" indicator and uses `metadata.lastSyncedAt` for recency messaging.
 
 
+import json
+from contextlib import asynccontextmanager
 from dataclasses import dataclass
 from datetime import date, datetime, timedelta
-from typing import Annotated, Any, Dict, List, Literal, Optional, Sequence, Tuple, Union
+from functools import partial
+from typing import Annotated, Any, AsyncIterator, Dict, Iterable, List, Literal, Optional, Sequence, Tuple, Union
 from datetime import timezone
 import aiomysql
 from pydantic import BaseModel, ConfigDict, Field, PrivateAttr, field_validator
 
+from ..db import fan_out
+
 
 UNSET = object()
 
+# Upper bound on CAIDs per POST /api/billing/expenses/recompute.
+MAX_RECOMPUTE_CAIDS = 1000
+
+# MySQL SIGNAL SQLSTATE '45000' (pymysql raises it as OperationalError).
+ER_SIGNAL_EXCEPTION = 1644
+
 
 # Reusable constrained scalar aliases keep monetary and identifier fields consistent.
 PositiveId = Annotated[int, Field(gt=0)]
@@ -423,6 +440,15 @@ class CreateExpenseResponse(BaseModel):
     message: str = Field(default="Expense captured")
 
 
+class RecomputeExpensesRequest(BaseModel):
+    caids: List[PositiveId] = Field(min_length=1, max_length=MAX_RECOMPUTE_CAIDS)
+
+
+class RecomputeExpensesResponse(BaseModel):
+    expenses: List[BillingExpenseRecord]
+    message: str = Field(default="Expenses recomputed")
+
+
 class BillingErrorResponse(BaseModel):
     message: str
     code: str
@@ -434,6 +460,26 @@ class BillingQueryContext:
     params: Tuple[Any, ...]
     filters: BillingFilters
     query: BillingQueryParams
+    # Same filters expressed against the BillingDaily summary (alias ``bd``).
+    summary_where_sql: str
+    summary_params: Tuple[Any, ...]
+
+
+@dataclass(frozen=True)
+class BillingCell:
+    """One (hospital, department, insurer) group of the filtered expenses."""
+
+    hid: int
+    hospital_name: str
+    region: str
+    dep_id: int
+    department: str
+    specialty: str
+    ins_id: Optional[int]
+    insurance_type: str
+    total: float
+    activities: int
+    insured_total: float
 
 
 class BillingAPIError(Exception):
@@ -450,17 +496,38 @@ class BillingAPIError(Exception):
 
 
 async def get_billing_dashboard(
-    conn: aiomysql.Connection, query: BillingQueryParams
+    conn: aiomysql.Connection,
+    query: BillingQueryParams,
+    *,
+    pool: Optional[aiomysql.Pool] = None,
+    max_connections: int = 1,
+    consistent_snapshot: bool = False,
 ) -> BillingResponse:
-    """Aggregate billing dashboard data using the MNHS schema."""
+    """Aggregate billing dashboard data using the MNHS schema.
+
+    KPIs, insurance split, hospital rollup and department summary are all
+    derived from one grouped scan. When ``pool`` is given, that scan and the
+    two detail queries are fanned out over ``conn`` and up to
+    ``max_connections - 1`` extra pooled connections, so latency tracks the
+    slowest section instead of their sum.
+    """
 
     context = _build_query_context(query)
-    kpis = await _fetch_kpis(conn, context)
-    insurance_split = await _fetch_insurance_split(conn, context)
-    hospital_rollup = await _fetch_hospital_rollup(conn, context)
-    department_summary = await _fetch_department_summary(conn, context)
-    recent_expenses = await _fetch_recent_expenses(conn, context)
-    medication_utilization = await _fetch_medication_utilization(conn, context)
+    cells, recent_expenses, medication_utilization = await fan_out(
+        conn,
+        pool,
+        [
+            partial(_fetch_billing_cells, ctx=context),
+            partial(_fetch_recent_expenses, ctx=context),
+            partial(_fetch_medication_utilization, ctx=context),
+        ],
+        max_connections=max_connections,
+        consistent_snapshot=consistent_snapshot,
+    )
+    kpis = _derive_kpis(cells, context)
+    insurance_split = _derive_insurance_split(cells)
+    hospital_rollup = _derive_hospital_rollup(cells)
+    department_summary = _derive_department_summary(cells)
     metadata = BillingMetadata(
         filters=context.filters,
         lastSyncedAt=datetime.now(timezone.utc),
@@ -504,24 +571,97 @@ async def create_billing_expense(
     )
 
 
+async def recompute_expenses(
+    conn: aiomysql.Connection, caids: Iterable[int]
+) -> List[BillingExpenseRecord]:
+    """Reprice the expenses of ``caids`` from their prescription lines.
+
+    One ``recompute_expenses`` procedure call covers the whole batch, so each
+    activity is recomputed once however many of its lines changed. Returns
+    the resulting expense of every listed CAID that has one.
+    """
+
+    unique_caids = list(dict.fromkeys(int(caid) for caid in caids))
+    if not unique_caids:
+        return []
+    async with conn.cursor() as cur:
+        try:
+            await cur.execute("CALL recompute_expenses(%s)", (json.dumps(unique_caids),))
+        except aiomysql.OperationalError as exc:
+            if exc.args and exc.args[0] == ER_SIGNAL_EXCEPTION:
+                raise BillingAPIError(
+                    422, "BILLING_MissingUnitPrice", str(exc.args[1])
+                ) from exc
+            raise
+
+    placeholders = ", ".join(["%s"] * len(unique_caids))
+    rows = await _fetchall(
+        conn,
+        f"""
+        SELECT ExpID AS expId, CAID AS caid, InsID AS insId, Total AS total
+        FROM Expense
+        WHERE CAID IN ({placeholders})
+        ORDER BY CAID
+        """,
+        unique_caids,
+    )
+    return [BillingExpenseRecord(**row) for row in rows]
+
+
+@asynccontextmanager
+async def deferred_expense_recompute(conn: aiomysql.Connection) -> AsyncIterator[None]:
+    """Batch the expense recomputation of ``Includes`` updates made inside.
+
+    ``trg_iclude_after_update`` only collects the affected CAIDs while the
+    block runs; they are repriced together by :func:`recompute_expenses` on a
+    clean exit. On error nothing is recomputed and the caller rolls back.
+    """
+
+    async with conn.cursor() as cur:
+        await cur.execute(
+            "SET @mnhs_defer_expense_recompute = 1,"
+            " @mnhs_pending_expense_caids = JSON_ARRAY()"
+        )
+    try:
+        yield
+        async with conn.cursor() as cur:
+            await cur.execute("SELECT @mnhs_pending_expense_caids")
+            (pending,) = await cur.fetchone()
+        caids = [caid for caid in json.loads(pending or "[]") if caid is not None]
+        await recompute_expenses(conn, caids)
+    finally:
+        async with conn.cursor() as cur:
+            await cur.execute(
+                "SET @mnhs_defer_expense_recompute = NULL,"
+                " @mnhs_pending_expense_caids = NULL"
+            )
+
+
 def _build_query_context(query: BillingQueryParams) -> BillingQueryContext:
     days_delta = max(query.days_back - 1, 0)
     start_date = datetime.utcnow().date() - timedelta(days=days_delta)
     conditions: List[str] = ["ca.Date >= %s"]
+    summary_conditions: List[str] = ["bd.ActivityDate >= %s"]
     params: List[Any] = [start_date]
     if query.hospital_id is not None:
         conditions.append("h.HID = %s")
+        summary_conditions.append("bd.HID = %s")
         params.append(query.hospital_id)
     if query.department_id is not None:
         conditions.append("d.DEP_ID = %s")
+        summary_conditions.append("bd.DEP_ID = %s")
         params.append(query.department_id)
+    summary_params = list(params)
     insurance_filter = query.insurance_filter_value()
     if insurance_filter is not UNSET:
         if insurance_filter is None:
             conditions.append("e.InsID IS NULL")
+            summary_conditions.append("bd.InsID = 0")
         else:
             conditions.append("e.InsID = %s")
+            summary_conditions.append("bd.InsID = %s")
             params.append(insurance_filter)
+            summary_params.append(insurance_filter)
     where_sql = " AND ".join(conditions)
     filters = query.to_metadata_filters()
     return BillingQueryContext(
@@ -529,32 +669,72 @@ def _build_query_context(query: BillingQueryParams) -> BillingQueryContext:
         params=tuple(params),
         filters=filters,
         query=query,
+        summary_where_sql=" AND ".join(summary_conditions),
+        summary_params=tuple(summary_params),
     )
 
 
-async def _fetch_kpis(
+async def _fetch_billing_cells(
     conn: aiomysql.Connection, ctx: BillingQueryContext
-) -> List[BillingKPI]:
-    row = await _fetchone(
+) -> List[BillingCell]:
+    """Run the single grouped scan every aggregate widget is derived from.
+
+    Reads the ``BillingDaily`` summary (see ``summaries/summaries.sql``), so the
+    cost scales with days x departments x insurers rather than expense rows.
+    """
+
+    rows = await _fetchall(
         conn,
         f"""
         SELECT
-            COALESCE(SUM(e.Total), 0) AS total_billed,
-            COALESCE(SUM(CASE WHEN e.InsID IS NOT NULL THEN e.Total END), 0) AS insured_billed,
-            COUNT(DISTINCT e.ExpID) AS expense_count,
-            COUNT(DISTINCT h.HID) AS hospital_count
-        FROM Expense e
-        JOIN ClinicalActivity ca ON ca.CAID = e.CAID
-        JOIN Department d ON d.DEP_ID = ca.DEP_ID
-        JOIN Hospital h ON h.HID = d.HID
-        WHERE {ctx.where_sql}
+            h.HID AS hid,
+            h.Name AS hospitalName,
+            h.Region AS region,
+            d.DEP_ID AS depId,
+            d.Name AS department,
+            d.Specialty AS specialty,
+            NULLIF(bd.InsID, 0) AS insId,
+            i.Type AS insuranceType,
+            COALESCE(SUM(bd.Total), 0) AS total,
+            COALESCE(SUM(bd.ExpenseCount), 0) AS activities,
+            COALESCE(SUM(bd.InsuredTotal), 0) AS insuredTotal
+        FROM BillingDaily bd
+        JOIN Department d ON d.DEP_ID = bd.DEP_ID
+        JOIN Hospital h ON h.HID = bd.HID
+        LEFT JOIN Insurance i ON i.InsID = bd.InsID
+        WHERE {ctx.summary_where_sql}
+        GROUP BY h.HID, h.Name, h.Region, d.DEP_ID, d.Name, d.Specialty, bd.InsID, i.Type
         """,
-        ctx.params,
+        ctx.summary_params,
     )
-    total_billed = float(row["total_billed"]) if row else 0.0
-    insured_billed = float(row["insured_billed"]) if row else 0.0
-    expense_count = int(row["expense_count"]) if row else 0
-    hospital_count = int(row["hospital_count"]) if row else 0
+    return [
+        BillingCell(
+            hid=row["hid"],
+            hospital_name=row["hospitalName"],
+            region=row["region"],
+            dep_id=row["depId"],
+            department=row["department"],
+            specialty=row["specialty"],
+            ins_id=row["insId"],
+            insurance_type=row["insuranceType"] or "Self-Pay",
+            # float() so the rollups add up the same on a pool that decodes
+            # DECIMAL as Decimal (the write pool) as on the read pools.
+            total=float(row["total"]),
+            activities=int(row["activities"]),
+            insured_total=float(row["insuredTotal"]),
+        )
+        for row in rows
+        if row["activities"]
+    ]
+
+
+def _derive_kpis(
+    cells: Sequence[BillingCell], ctx: BillingQueryContext
+) -> List[BillingKPI]:
+    total_billed = sum(cell.total for cell in cells)
+    insured_billed = sum(cell.insured_total for cell in cells)
+    expense_count = sum(cell.activities for cell in cells)
+    hospital_count = len({cell.hid for cell in cells})
     avg_expense = total_billed / expense_count if expense_count else 0.0
     coverage_ratio = insured_billed / total_billed if total_billed else 0.0
     duration_label = f"{ctx.query.days_back}d"
@@ -590,128 +770,87 @@ async def _fetch_kpis(
     ]
 
 
-async def _fetch_insurance_split(
-    conn: aiomysql.Connection, ctx: BillingQueryContext
+def _derive_insurance_split(
+    cells: Sequence[BillingCell],
 ) -> List[BillingInsuranceSplitRow]:
-    rows = await _fetchall(
-        conn,
-        f"""
-        SELECT
-            e.InsID AS insId,
-            COALESCE(i.Type, 'Self-Pay') AS type,
-            COALESCE(SUM(e.Total), 0) AS amount,
-            COUNT(*) AS activities
-        FROM Expense e
-        JOIN ClinicalActivity ca ON ca.CAID = e.CAID
-        JOIN Department d ON d.DEP_ID = ca.DEP_ID
-        JOIN Hospital h ON h.HID = d.HID
-        LEFT JOIN Insurance i ON i.InsID = e.InsID
-        WHERE {ctx.where_sql}
-        GROUP BY e.InsID, i.Type
-        ORDER BY amount DESC
-        """,
-        ctx.params,
-    )
-    total_amount = sum(float(row["amount"]) for row in rows) if rows else 0.0
+    buckets: Dict[Optional[int], List[Any]] = {}
+    for cell in cells:
+        bucket = buckets.setdefault(cell.ins_id, [cell.insurance_type, 0.0, 0])
+        bucket[1] += cell.total
+        bucket[2] += cell.activities
+    total_amount = sum(bucket[1] for bucket in buckets.values())
     result: List[BillingInsuranceSplitRow] = []
-    for row in rows:
-        amount = float(row["amount"])
+    for ins_id, (ins_type, amount, activities) in buckets.items():
         share = (amount / total_amount * 100.0) if total_amount else 0.0
         result.append(
             BillingInsuranceSplitRow(
-                insId=row["insId"],
-                type=row["type"] or "Self-Pay",
+                insId=ins_id,
+                type=ins_type,
                 amount=amount,
-                activities=int(row["activities"]),
+                activities=activities,
                 share=share,
             )
         )
+    result.sort(key=lambda row: row.amount, reverse=True)
     return result
 
 
-async def _fetch_hospital_rollup(
-    conn: aiomysql.Connection, ctx: BillingQueryContext
+def _derive_hospital_rollup(
+    cells: Sequence[BillingCell],
 ) -> List[BillingHospitalRollupRow]:
-    rows = await _fetchall(
-        conn,
-        f"""
-        SELECT
-            h.HID AS hid,
-            h.Name AS name,
-            h.Region AS region,
-            COALESCE(SUM(e.Total), 0) AS total,
-            COUNT(*) AS activities,
-            COALESCE(SUM(CASE WHEN e.InsID IS NOT NULL THEN e.Total END), 0) AS insured_total
-        FROM Expense e
-        JOIN ClinicalActivity ca ON ca.CAID = e.CAID
-        JOIN Department d ON d.DEP_ID = ca.DEP_ID
-        JOIN Hospital h ON h.HID = d.HID
-        WHERE {ctx.where_sql}
-        GROUP BY h.HID, h.Name, h.Region
-        ORDER BY total DESC
-        """,
-        ctx.params,
-    )
+    buckets: Dict[int, List[Any]] = {}
+    for cell in cells:
+        bucket = buckets.setdefault(
+            cell.hid, [cell.hospital_name, cell.region, 0.0, 0, 0.0]
+        )
+        bucket[2] += cell.total
+        bucket[3] += cell.activities
+        bucket[4] += cell.insured_total
     result: List[BillingHospitalRollupRow] = []
-    for row in rows:
-        total = float(row["total"])
-        activities = int(row["activities"])
+    for hid, (name, region, total, activities, insured_total) in buckets.items():
         avg_expense = total / activities if activities else 0.0
-        insured_total = float(row["insured_total"])
         insured_share = insured_total / total * 100 if total else 0.0
         result.append(
             BillingHospitalRollupRow(
-                hid=row["hid"],
-                name=row["name"],
-                region=row["region"],
+                hid=hid,
+                name=name,
+                region=region,
                 total=total,
                 activities=activities,
                 insuredShare=insured_share,
                 avgExpense=avg_expense,
             )
         )
+    result.sort(key=lambda row: row.total, reverse=True)
     return result
 
 
-async def _fetch_department_summary(
-    conn: aiomysql.Connection, ctx: BillingQueryContext
+def _derive_department_summary(
+    cells: Sequence[BillingCell],
 ) -> List[BillingDepartmentSummaryRow]:
-    rows = await _fetchall(
-        conn,
-        f"""
-        SELECT
-            d.DEP_ID AS depId,
-            d.Name AS department,
-            d.Specialty AS specialty,
-            h.Name AS hospital,
-            COALESCE(SUM(e.Total), 0) AS total,
-            COUNT(*) AS activities
-        FROM Expense e
-        JOIN ClinicalActivity ca ON ca.CAID = e.CAID
-        JOIN Department d ON d.DEP_ID = ca.DEP_ID
-        JOIN Hospital h ON h.HID = d.HID
-        WHERE {ctx.where_sql}
-        GROUP BY d.DEP_ID, d.Name, d.Specialty, h.Name
-        ORDER BY total DESC
-        """,
-        ctx.params,
-    )
+    buckets: Dict[int, List[Any]] = {}
+    for cell in cells:
+        bucket = buckets.setdefault(
+            cell.dep_id,
+            [cell.hospital_name, cell.department, cell.specialty, 0.0, 0],
+        )
+        bucket[3] += cell.total
+        bucket[4] += cell.activities
     result: List[BillingDepartmentSummaryRow] = []
-    for row in rows:
-        total = float(row["total"])
-        activities = int(row["activities"])
+    for dep_id, (hospital, department, specialty, total, activities) in buckets.items():
         avg_expense = total / activities if activities else 0.0
         result.append(
             BillingDepartmentSummaryRow(
-                depId=row["depId"],
-                hospital=row["hospital"],
-                department=row["department"],
-                specialty=row["specialty"],
+                depId=dep_id,
+                hospital=hospital,
+                department=department,
+                specialty=specialty,
                 total=total,
                 activities=activities,
                 avgExpense=avg_expense,
             )
         )
+    result.sort(key=lambda row: row.total, reverse=True)
     return result
 
 
@@ -779,7 +918,7 @@ async def _fetch_recent_expenses(
                     staffId=row["staffId"], fullName=row["staffName"]
                 ),
                 insurance=insurance,
-                total=float(row["total"]),
+                total=row["total"],
                 prescription=prescription,
             )
         )
@@ -942,10 +1081,15 @@ __all__ = [
     "create_billing_expense",
     "CreateExpenseRequest",
     "CreateExpenseResponse",
+    "deferred_expense_recompute",
     "get_billing_dashboard",
     "IconKey",
     "InsuranceScope",
     "KPIKey",
     "KPIUnit",
+    "MAX_RECOMPUTE_CAIDS",
+    "recompute_expenses",
+    "RecomputeExpensesRequest",
+    "RecomputeExpensesResponse",
     "TrendDirection",
 ]
@@ -1,17 +1,25 @@
-from datetime import date, time, timedelta
+from datetime import date, time
 import aiomysql
 from pydantic import BaseModel, Field, ConfigDict, field_validator
-from typing import List, Literal, Optional
+from typing import Any, List, Literal, Optional, Tuple
+
+from .summary_counters import fetch_summary_counters
 
 ## Models
 
 
 AppointmentStatus = Literal["Scheduled", "Completed", "Cancelled"]
 
+DEFAULT_RECENT_APPOINTMENTS = 20
+MAX_RECENT_APPOINTMENTS = 200
+
 
 class QueryCoreDashboardStats(BaseModel):
     model_config = ConfigDict(populate_by_name=True)
     date_range: Optional[str] = Field(default=None, alias="range")
+    limit: int = Field(
+        default=DEFAULT_RECENT_APPOINTMENTS, ge=1, le=MAX_RECENT_APPOINTMENTS
+    )
 
     @field_validator("date_range")
     @classmethod
@@ -40,6 +48,14 @@ class QueryCoreDashboardStats(BaseModel):
 
         return f"{start_date.isoformat()}/{end_date.isoformat()}"
 
+    def bounds(self) -> Optional[Tuple[date, date]]:
+        """Return the inclusive (start, end) dates of ``range`` if one was given."""
+
+        if self.date_range is None:
+            return None
+        start_str, end_str = self.date_range.split("/", 1)
+        return date.fromisoformat(start_str), date.fromisoformat(end_str)
+
 
 class CoreDashboardAppointment(BaseModel):
     model_config = ConfigDict(populate_by_name=True)
@@ -97,34 +113,45 @@ class CoreDashboardResponse(BaseModel):
 
 
 # /api/core-dashboard
-def timedelta_to_time(td: timedelta) -> time:
-    # MySQL TIME is a duration from 00:00:00, so:
-    total_seconds = int(td.total_seconds())
-    hours = (total_seconds // 3600) % 24
-    minutes = (total_seconds % 3600) // 60
-    seconds = total_seconds % 60
-    return time(hour=hours, minute=minutes, second=seconds)
+def _date_filter(
+    column: str, bounds: Optional[Tuple[date, date]], keyword: str = "WHERE"
+) -> Tuple[str, List[Any]]:
+    """Return an index-friendly ``column BETWEEN`` clause for ``bounds``."""
+
+    if bounds is None:
+        return "", []
+    return f"{keyword} {column} BETWEEN %s AND %s", [bounds[0], bounds[1]]
 
 
 async def core_dashboard_appointments(
     conn: aiomysql.Connection,
+    bounds: Optional[Tuple[date, date]] = None,
+    limit: int = DEFAULT_RECENT_APPOINTMENTS,
 ) -> List[CoreDashboardAppointment]:
-    """Retrieve core dashboard appointments.
+    """Retrieve the most recent core dashboard appointments.
 
     Args:
         conn (aiomysql.Connection): The database connection.
+        bounds: Optional inclusive date range applied to ``ClinicalActivity.Date``.
+        limit: Maximum number of appointments returned (newest first).
     Returns:
         List of CoreDashboardAppointment.
     """
+    # Driven by idx_ClinicalActivity_Date_Time: a backward range scan that
+    # stops after ``limit`` appointments.
+    date_sql, params = _date_filter("C.`Date`", bounds)
     async with conn.cursor(aiomysql.DictCursor) as cur:
         await cur.execute(
-            """
-            SELECT C.`CAID` as id, P.`FullName` as patientName, A.`Status` as status,H.`Name` as hospital,C.`Date` as date,C.`Time` as time,D.`Name` as department FROM `Appointment` A
-JOIn `ClinicalActivity` C ON C.`CAID` = A.`CAID`
+            f"""
+            SELECT C.`CAID` as id, P.`FullName` as patientName, A.`Status` as status,H.`Name` as hospital,C.`Date` as date,C.`Time` as time,D.`Name` as department FROM `ClinicalActivity` C
+JOIN `Appointment` A ON A.`CAID` = C.`CAID`
 JOIN `Patient` P ON P.`IID` = C.`IID`
 JOIn `Department` D ON D.`DEP_ID` = C.`DEP_ID`
 JOIN `Hospital` H ON H.`HID` = D.`HID`
-            ORDER BY C.`Date` DESC, C.`Time` DESC"""
+            {date_sql}
+            ORDER BY C.`Date` DESC, C.`Time` DESC, C.`CAID` DESC
+            LIMIT %s""",
+            [*params, limit],
         )
         result = await cur.fetchall()
         return [
@@ -134,7 +161,7 @@ JOIN `Hospital` H ON H.`HID` = D.`HID`
                 status=row["status"],
                 hospital=row["hospital"],
                 date=row["date"],
-                time=timedelta_to_time(row["time"]),
+                time=row["time"],
                 department=row["department"],
             )
             for row in result
@@ -211,27 +238,14 @@ async def core_dashboard_medications(
     async with conn.cursor(aiomysql.DictCursor) as cur:
         await cur.execute(
             """
-            WITH latest_stock AS (
+            WITH agg_stock AS (
+    /* StockCurrent holds one latest row per (HID, MID) */
     SELECT
-        s.HID,
-        s.MID,
-        s.Qty,
-        s.ReorderLevel,
-        ROW_NUMBER() OVER (
-            PARTITION BY s.HID, s.MID
-            ORDER BY s.StockTimestamp DESC
-        ) AS rn
-    FROM Stock AS s
-),
-agg_stock AS (
-    
-    SELECT
-        ls.MID,
-        SUM(ls.Qty)          AS total_qty,
-        SUM(ls.ReorderLevel) AS total_reorder
-    FROM latest_stock AS ls
-    WHERE ls.rn = 1
-    GROUP BY ls.MID
+        sc.MID,
+        SUM(sc.Qty)          AS total_qty,
+        SUM(sc.ReorderLevel) AS total_reorder
+    FROM StockCurrent AS sc
+    GROUP BY sc.MID
 )
 SELECT
     m.MID                AS id,
@@ -263,52 +277,19 @@ WHERE a.total_qty < a.total_reorder
 
 async def core_dashboard_summary_stats(
     conn: aiomysql.Connection,
+    bounds: Optional[Tuple[date, date]] = None,
 ) -> CoreDashboardSummaryStats:
     """Retrieve core dashboard summary statistics.
 
     Args:
         conn (aiomysql.Connection): The database connection.
+        bounds: Optional inclusive date range; appointment and admission
+            counts only consider activities dated inside it.
     Returns:
         CoreDashboardSummaryStats.
     """
-    async with conn.cursor(aiomysql.DictCursor) as cur:
-        await cur.execute(
-            """
-            SELECT
-    /* total_appointments */
-    (SELECT COUNT(*)
-     FROM Appointment
-    ) AS totalAppointments,
-
-    /* upcoming_appointments: scheduled and in the future (by Date) */
-    (SELECT COUNT(*)
-     FROM Appointment a
-     JOIN ClinicalActivity c ON c.CAID = a.CAID
-     WHERE a.Status = ' Scheduled '
-       AND c.Date >= CURRENT_DATE()
-    ) AS upcomingAppointments,
-
-    /* active_staff */
-    (SELECT COUNT(*)
-     FROM Staff
-     WHERE Status = 'Active '
-    ) AS activeStaff,
-
-    /* admitted_patients: distinct patients with an ER Outcome = 'Admitted ' */
-    (SELECT COUNT(DISTINCT c.IID)
-     FROM Emergency e
-     JOIN ClinicalActivity c ON c.CAID = e.CAID
-     WHERE e.Outcome = 'Admitted '
-    ) AS admittedPatients;
-            """
-        )
-        row = await cur.fetchone()
-        return CoreDashboardSummaryStats(
-            totalAppointments=row["totalAppointments"],
-            upcomingAppointments=row["upcomingAppointments"],
-            activeStaff=row["activeStaff"],
-            admittedPatients=row["admittedPatients"],
-        )
+    counters = await fetch_summary_counters(conn, bounds)
+    return CoreDashboardSummaryStats(**counters)
 
 
 async def get_core_dashboard_stats_mnhs(
@@ -319,15 +300,17 @@ async def get_core_dashboard_stats_mnhs(
 
     Args:
         conn (aiomysql.Connection): The database connection.
+        query: Validated ``range`` / ``limit`` parameters.
     Returns:
         CoreDashboardResponse containing low stock medications and staff appointment shares.
     """
 
-    appointments = await core_dashboard_appointments(conn)
+    bounds = query.bounds()
+    appointments = await core_dashboard_appointments(conn, bounds, query.limit)
     staff = await core_dashboard_staff(conn)
     staff_leaderboard = list(sorted(staff, key=lambda s: s.workload, reverse=True))
     low_stock_medications = await core_dashboard_medications(conn)
-    summary = await core_dashboard_summary_stats(conn)
+    summary = await core_dashboard_summary_stats(conn, bounds)
     return CoreDashboardResponse(
         appointments=appointments,
         staff=staff,
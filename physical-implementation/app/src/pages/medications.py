@@ -188,18 +188,13 @@ async def create_medication(
                 "",
             ),
         )
-        await cur.execute(
-            """
-            INSERT INTO Stock (HID, MID, StockTimestamp, UnitPrice, Qty, ReorderLevel)
-            VALUES (%s, %s, NOW(), %s, %s, %s)
-            """,
-            (
-                hid,
-                payload.id,
-                0,
-                payload.qty,
-                payload.reorder_level,
-            ),
+        await _append_stock(
+            cur,
+            hid,
+            payload.id,
+            unit_price=0,
+            qty=payload.qty,
+            reorder_level=payload.reorder_level,
         )
 
     return MedicationRecord(**payload.model_dump())
@@ -226,18 +221,13 @@ async def insert_stock_entry(
     reorder_level = _to_float(latest.get("ReorderLevel"))
 
     async with conn.cursor() as cur:
-        await cur.execute(
-            """
-            INSERT INTO Stock (HID, MID, StockTimestamp, UnitPrice, Qty, ReorderLevel)
-            VALUES (%s, %s, NOW(), %s, %s, %s)
-            """,
-            (
-                hid,
-                payload.medication_id,
-                payload.unitPrice,
-                new_qty,
-                reorder_level,
-            ),
+        await _append_stock(
+            cur,
+            hid,
+            payload.medication_id,
+            unit_price=payload.unitPrice,
+            qty=new_qty,
+            reorder_level=reorder_level,
         )
 
     return StockEntryRecord(
@@ -254,8 +244,8 @@ def _build_low_stock_rows(
 ) -> List[MedicationLowStockRow]:
     result: List[MedicationLowStockRow] = []
     for row in rows:
-        qty = _to_float(row.get("Qty"))
-        reorder = _to_float(row.get("ReorderLevel"))
+        qty = row["Qty"] or 0
+        reorder = row["ReorderLevel"] or 0
         if reorder <= 0:
             continue
         threshold = reorder / 2 if critical_only else reorder
@@ -281,7 +271,7 @@ def _compute_price_series(
         hospital = row.get("hospital_name")
         if not hospital:
             continue
-        price = _to_float(row.get("UnitPrice"))
+        price = float(row["UnitPrice"] or 0)
         buckets.setdefault(hospital, []).append(price)
 
     series: List[MedicationPriceSeriesRow] = []
@@ -300,9 +290,10 @@ def _compute_aggregates(rows: Sequence[Dict[str, Any]]) -> MedicationAggregates:
     projected_spend = 0.0
 
     for row in rows:
-        qty = _to_float(row.get("Qty"))
-        reorder = _to_float(row.get("ReorderLevel"))
-        unit_price = _to_float(row.get("UnitPrice"))
+        qty = row["Qty"] or 0
+        reorder = row["ReorderLevel"] or 0
+        # float() also covers Decimal prices from the write pool.
+        unit_price = float(row["UnitPrice"] or 0)
         if reorder > 0:
             if qty <= reorder / 2:
                 critical_alerts += 1
@@ -325,32 +316,21 @@ async def _fetch_latest_stock_snapshot(
 ) -> List[Dict[str, Any]]:
     conditions, args = _build_common_conditions(params)
     sql = """
-        WITH RankedStock AS (
-            SELECT
-                s.HID,
-                s.MID,
-                s.UnitPrice,
-                s.Qty,
-                s.ReorderLevel,
-                s.StockTimestamp,
-                ROW_NUMBER() OVER (PARTITION BY s.HID, s.MID ORDER BY s.StockTimestamp DESC) AS rn
-            FROM Stock s
-        )
         SELECT
-            rs.HID,
-            rs.MID,
-            rs.UnitPrice,
-            rs.Qty,
-            rs.ReorderLevel,
-            rs.StockTimestamp,
+            sc.HID,
+            sc.MID,
+            sc.UnitPrice,
+            sc.Qty,
+            sc.ReorderLevel,
+            sc.StockTimestamp,
             h.Name AS hospital_name,
             m.Name AS medication_name,
             m.TherapeuticClass AS therapeutic_class,
             NULLIF(m.Form, '') AS unit
-        FROM RankedStock rs
-        JOIN Hospital h ON h.HID = rs.HID
-        JOIN Medication m ON m.MID = rs.MID
-        WHERE rs.rn = 1
+        FROM StockCurrent sc
+        JOIN Hospital h ON h.HID = sc.HID
+        JOIN Medication m ON m.MID = sc.MID
+        WHERE 1=1
     """
     if conditions:
         sql += " AND " + " AND ".join(conditions)
@@ -385,9 +365,9 @@ async def _fetch_pricing_summary(
             MedicationPricingSummaryRow(
                 hospital=row["hospital"],
                 medication=row["medication"],
-                avg=_to_float(row.get("avg_price")),
-                min=_to_float(row.get("min_price")),
-                max=_to_float(row.get("max_price")),
+                avg=row["avg_price"] or 0.0,
+                min=row["min_price"] or 0.0,
+                max=row["max_price"] or 0.0,
                 updatedAt=row.get("updated_at") or datetime.utcnow(),
             )
         )
@@ -423,8 +403,8 @@ async def _fetch_replenishment_trend(
         trend.append(
             MedicationReplenishmentPoint(
                 month=row["label"],
-                qty=_to_float(row.get("total_qty")),
-                cost=_to_float(row.get("total_cost")),
+                qty=row["total_qty"] or 0.0,
+                cost=row["total_cost"] or 0.0,
             )
         )
     return trend
@@ -433,19 +413,40 @@ async def _fetch_replenishment_trend(
 async def _fetch_latest_stock_row(
     conn: aiomysql.Connection, hid: int, mid: MedicationId
 ) -> Optional[Dict[str, Any]]:
+    # Locks the (HID, MID) row so concurrent receipts add up instead of both
+    # starting from the same quantity.
     return await _fetchone(
         conn,
         """
         SELECT Qty, ReorderLevel
-        FROM Stock
+        FROM StockCurrent
         WHERE HID = %s AND MID = %s
-        ORDER BY StockTimestamp DESC
-        LIMIT 1
+        FOR UPDATE
         """,
         (hid, mid),
     )
 
 
+async def _append_stock(
+    cur: aiomysql.Cursor,
+    hid: int,
+    mid: MedicationId,
+    *,
+    unit_price: float,
+    qty: float,
+    reorder_level: float,
+) -> None:
+    """Insert a Stock log row; trg_stock_after_insert_current updates StockCurrent."""
+
+    await cur.execute(
+        """
+        INSERT INTO Stock (HID, MID, StockTimestamp, UnitPrice, Qty, ReorderLevel)
+        VALUES (%s, %s, NOW(), %s, %s, %s)
+        """,
+        (hid, mid, unit_price, qty, reorder_level),
+    )
+
+
 async def _fetchall(
     conn: aiomysql.Connection,
     sql: str,
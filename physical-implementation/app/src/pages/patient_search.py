@@ -0,0 +1,131 @@
+"""Ranked patient search resolved on ``Patient`` before any enrichment.
+
+A search term is matched in tiers, each served by an index:
+
+0. exact CIN - the ``CIN`` unique key (the column collation is
+   case-insensitive, so no ``UPPER()`` is needed);
+1. CIN prefix - a range scan of the same key;
+2. name prefix - a range scan of ``idx_Patient_FullName``;
+3. name substring - ``MATCH ... AGAINST`` on the ngram FULLTEXT index
+   ``ftx_Patient_FullName``, ranked by relevance.
+
+Filters are applied on ``PatientSummary``; only the IIDs returned here are
+loaded by the patients endpoint.
+"""
+
+from __future__ import annotations
+
+from typing import Any, List, Optional, Tuple
+
+import aiomysql
+
+# Matches beyond this many candidates are not returned.
+MAX_SEARCH_RESULTS = 500
+
+# Shortest term the ngram parser can match (server ngram_token_size).
+NGRAM_TOKEN_SIZE = 2
+
+
+def patient_filters(
+    *,
+    sex: Optional[str] = None,
+    blood_group: Optional[str] = None,
+    status: Optional[str] = None,
+) -> Tuple[List[str], List[Any]]:
+    """Conditions on ``PatientSummary p`` for the list filters."""
+
+    conditions: List[str] = []
+    args: List[Any] = []
+    if sex:
+        conditions.append("p.Sex = %s")
+        args.append(sex)
+    if blood_group:
+        conditions.append("p.BloodGroup = %s")
+        args.append(blood_group)
+    if status:
+        conditions.append("p.Status = %s")
+        args.append(status)
+    return conditions, args
+
+
+def _escape_like(term: str) -> str:
+    return term.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+
+def _phrase(term: str) -> str:
+    """Quote ``term`` as one boolean-mode phrase, i.e. a substring match."""
+
+    return '"' + term.replace('"', " ").strip() + '"'
+
+
+def build_patient_search_query(
+    term: str,
+    *,
+    sex: Optional[str] = None,
+    blood_group: Optional[str] = None,
+    status: Optional[str] = None,
+    limit: int = MAX_SEARCH_RESULTS,
+) -> Tuple[str, List[Any]]:
+    """Return the ranked ``(iid, tier, score)`` search statement and its args."""
+
+    prefix = _escape_like(term) + "%"
+    tiers: List[str] = [
+        "SELECT IID, 0 AS tier, 0 AS score FROM Patient WHERE CIN = %s",
+        "SELECT IID, 1 AS tier, 0 AS score FROM Patient WHERE CIN LIKE %s",
+        "SELECT IID, 2 AS tier, 0 AS score FROM Patient WHERE FullName LIKE %s",
+    ]
+    args: List[Any] = [term, prefix, prefix]
+    if len(term.replace('"', "").strip()) >= NGRAM_TOKEN_SIZE:
+        tiers.append(
+            "SELECT IID, 3 AS tier,"
+            " MATCH(FullName) AGAINST (%s IN BOOLEAN MODE) AS score"
+            " FROM Patient WHERE MATCH(FullName) AGAINST (%s IN BOOLEAN MODE)"
+        )
+        args.extend([_phrase(term), _phrase(term)])
+
+    filters, filter_args = patient_filters(
+        sex=sex, blood_group=blood_group, status=status
+    )
+    args.extend(filter_args)
+
+    sql = (
+        "SELECT m.IID AS iid, MIN(m.tier) AS tier, MAX(m.score) AS score"
+        " FROM (" + " UNION ALL ".join(tiers) + ") AS m"
+        " JOIN PatientSummary p ON p.IID = m.IID"
+    )
+    if filters:
+        sql += " WHERE " + " AND ".join(filters)
+    sql += (
+        " GROUP BY m.IID, p.FullName"
+        " ORDER BY tier ASC, score DESC, p.FullName ASC, m.IID ASC"
+        " LIMIT %s"
+    )
+    args.append(limit)
+    return sql, args
+
+
+async def search_patient_ids(
+    conn: aiomysql.Connection,
+    term: str,
+    *,
+    sex: Optional[str] = None,
+    blood_group: Optional[str] = None,
+    status: Optional[str] = None,
+    limit: int = MAX_SEARCH_RESULTS,
+) -> List[int]:
+    """Return matching IIDs, best match first."""
+
+    sql, args = build_patient_search_query(
+        term, sex=sex, blood_group=blood_group, status=status, limit=limit
+    )
+    async with conn.cursor() as cur:
+        await cur.execute(sql, args)
+        return [row[0] for row in await cur.fetchall()]
+
+
+__all__ = [
+    "MAX_SEARCH_RESULTS",
+    "build_patient_search_query",
+    "patient_filters",
+    "search_patient_ids",
+]
@@ -2,17 +2,35 @@
 
 from __future__ import annotations
 
-from datetime import date, datetime, time
-from typing import Annotated, Any, Dict, List, Optional, Sequence, Literal
+import base64
+import json
+from datetime import date
+from typing import (
+    Annotated,
+    Any,
+    AsyncIterator,
+    Dict,
+    List,
+    Optional,
+    Sequence,
+    Literal,
+    Tuple,
+)
 
 import aiomysql
-from pydantic import BaseModel, ConfigDict, Field, field_validator
+from pydantic import BaseModel, ConfigDict, Field, TypeAdapter, field_validator
+
+from ..db import RowLayout, fetch_tuples, iso_dates, stream_tuples
+from .patient_search import patient_filters, search_patient_ids
 
 
 BloodGroup = Literal["A+", "A-", "B+", "B-", "O+", "O-", "AB+", "AB-"]
 PatientSex = Literal["M", "F"]
 PatientStatus = Literal["Admitted", "Outpatient"]
 
+DEFAULT_PATIENTS_PAGE_SIZE = 50
+MAX_PATIENTS_PAGE_SIZE = 200
+
 
 class PatientsAPIError(Exception):
     """Exception carrying HTTP metadata for the patients endpoints."""
@@ -52,10 +70,14 @@ class PatientRecord(BaseModel):
     nextVisit: Optional[PatientNextVisit] = None
 
 
+_PATIENT_RECORDS = TypeAdapter(List[PatientRecord])
+
+
 class PatientsResponse(BaseModel):
     model_config = ConfigDict(extra="forbid")
 
     patients: List[PatientRecord]
+    nextCursor: Optional[str] = None
     lastSyncedAt: str
 
 
@@ -66,6 +88,11 @@ class PatientsQueryParams(BaseModel):
     sex: Optional[PatientSex] = None
     status: Optional[PatientStatus] = None
     bloodGroup: Optional[BloodGroup] = None
+    page: Optional[int] = Field(default=None, ge=1)
+    limit: int = Field(
+        default=DEFAULT_PATIENTS_PAGE_SIZE, ge=1, le=MAX_PATIENTS_PAGE_SIZE
+    )
+    cursor: Optional[str] = None
 
     @field_validator("search")
     @classmethod
@@ -121,13 +148,77 @@ class PatientCreateResponse(BaseModel):
     message: str = Field(default="Patient created")
 
 
-async def get_all_patients(
+async def get_patients_page(
+    conn: aiomysql.Connection, params: PatientsQueryParams
+) -> Tuple[List[PatientRecord], Optional[str]]:
+    """Return one page of patients and the cursor for the next one.
+
+    Pages walk ``PatientSummary`` by ``(name, iid)`` keyset or ``page``
+    offset; search pages slice the ranked matches. ``cursor`` takes
+    precedence over ``page``.
+    """
+
+    offset = (params.page - 1) * params.limit if params.page else 0
+    after: Optional[Tuple[str, int]] = None
+    if params.cursor:
+        after, cursor_offset = _decode_patients_cursor(params.cursor)
+        offset = cursor_offset or 0
+
+    if params.search:
+        if after is not None:
+            raise PatientsAPIError(400, "Invalid cursor")
+        ranked = await search_patient_ids(
+            conn,
+            params.search,
+            sex=params.sex,
+            blood_group=params.bloodGroup,
+            status=params.status,
+        )
+        page_ids = ranked[offset : offset + params.limit]
+        if not page_ids:
+            return [], None
+        patients = await _fetch_patients(conn, iids=page_ids)
+        rank = {iid: position for position, iid in enumerate(page_ids)}
+        patients.sort(key=lambda patient: rank[patient.iid])
+        has_more = len(ranked) > offset + params.limit
+        next_cursor = (
+            _encode_patients_cursor(["o", offset + params.limit]) if has_more else None
+        )
+        return patients, next_cursor
+
+    if params.cursor and after is None:
+        raise PatientsAPIError(400, "Invalid cursor")
+    sql, args = _build_patients_query(
+        params, after=after, offset=offset, limit=params.limit + 1
+    )
+    with iso_dates(conn):
+        layout, rows = await fetch_tuples(conn, sql, args)
+    has_more = len(rows) > params.limit
+    rows = rows[: params.limit]
+    next_cursor = (
+        _encode_patients_cursor(["k", *layout.getter("name", "iid")(rows[-1])])
+        if has_more
+        else None
+    )
+    return _normalize_patient_rows(layout, rows), next_cursor
+
+
+async def stream_patients(
     conn: aiomysql.Connection, params: Optional[PatientsQueryParams] = None
-) -> List[PatientRecord]:
-    """Fetch normalized patient rows with optional filters."""
+) -> AsyncIterator[List[PatientRecord]]:
+    """Yield normalized patients in chunks from an unbuffered cursor."""
+
+    if params and params.search:
+        # Search results are capped and ranked, so they fit in one chunk.
+        patients = await _fetch_patients(conn, params=params)
+        if patients:
+            yield patients
+        return
 
-    rows = await _fetch_patients(conn, params=params)
-    return rows
+    sql, args = _build_patients_query(params)
+    with iso_dates(conn):
+        async for layout, rows in stream_tuples(conn, sql, args):
+            yield _normalize_patient_rows(layout, rows)
 
 
 async def create_patient(
@@ -138,7 +229,7 @@ async def create_patient(
     cin = payload.cin.upper()
     async with conn.cursor(aiomysql.DictCursor) as cur:
         await cur.execute(
-            "SELECT 1 FROM Patient WHERE IID = %s OR UPPER(CIN) = %s",
+            "SELECT 1 FROM Patient WHERE IID = %s OR CIN = %s",
             (payload.iid, cin),
         )
         if await cur.fetchone():
@@ -174,15 +265,7 @@ async def create_patient(
                 (payload.iid, clid),
             )
 
-    await conn.commit()
-
-    patients = await _fetch_patients(
-        conn,
-        params=None,
-        extra_conditions=["iid = %s"],
-        extra_args=[payload.iid],
-        limit=1,
-    )
+    patients = await _fetch_patients(conn, iids=[payload.iid], limit=1)
     if not patients:
         raise PatientsAPIError(500, "Unable to load the created patient")
 
@@ -190,49 +273,62 @@ async def create_patient(
     return patient.model_copy(update={"email": payload.email})
 
 
+STAFF_LIST_SQL = """
+    SELECT 
+        s.STAFF_ID as id,
+        s.FullName as name,
+        s.Status as status,
+        GROUP_CONCAT(DISTINCT d.Name) as department_names,
+        GROUP_CONCAT(DISTINCT h.Name) as hospital_names
+    FROM Staff s
+    LEFT JOIN Work_in w ON w.STAFF_ID = s.STAFF_ID
+    LEFT JOIN Department d ON d.DEP_ID = w.DEP_ID
+    LEFT JOIN Hospital h ON h.HID = d.HID
+    GROUP BY s.STAFF_ID, s.FullName, s.Status
+"""
+
+
 async def get_all_staff(conn: aiomysql.Connection) -> List[Dict[str, Any]]:
     """Get all staff with departments and hospitals."""
-    async with conn.cursor(aiomysql.DictCursor) as cur:
-        await cur.execute(
-            """
-            SELECT 
-                s.STAFF_ID as id,
-                s.FullName as name,
-                s.Status as status,
-                GROUP_CONCAT(DISTINCT d.Name) as department_names,
-                GROUP_CONCAT(DISTINCT h.Name) as hospital_names
-            FROM Staff s
-            LEFT JOIN Work_in w ON w.STAFF_ID = s.STAFF_ID
-            LEFT JOIN Department d ON d.DEP_ID = w.DEP_ID
-            LEFT JOIN Hospital h ON h.HID = d.HID
-            GROUP BY s.STAFF_ID, s.FullName, s.Status
-        """
+
+    layout, rows = await fetch_tuples(conn, STAFF_LIST_SQL)
+    return _shape_staff_rows(layout, rows)
+
+
+async def stream_staff(conn: aiomysql.Connection) -> AsyncIterator[List[Dict[str, Any]]]:
+    """Yield staff rows in chunks from an unbuffered cursor."""
+
+    async for layout, rows in stream_tuples(conn, STAFF_LIST_SQL):
+        yield _shape_staff_rows(layout, rows)
+
+
+def _shape_staff_rows(
+    layout: RowLayout, rows: Sequence[Sequence[Any]]
+) -> List[Dict[str, Any]]:
+    columns = layout.getter("id", "name", "status", "department_names", "hospital_names")
+    return [
+        {
+            "id": staff_id,
+            "name": name,
+            "status": status,
+            "role": _staff_role(name),
+            "departments": department_names.split(",") if department_names else [],
+            "hospitals": hospital_names.split(",") if hospital_names else [],
+        }
+        for staff_id, name, status, department_names, hospital_names in map(
+            columns, rows
         )
-        staff_list = await cur.fetchall()
-
-        for staff in staff_list:
-            if staff["name"].startswith("Dr."):
-                staff["role"] = "Doctor"
-            elif staff["name"].startswith("Nurse"):
-                staff["role"] = "Nurse"
-            elif staff["name"].startswith("Technician"):
-                staff["role"] = "Technician"
-            else:
-                staff["role"] = "Admin"
-
-            staff["departments"] = (
-                staff["department_names"].split(",")
-                if staff["department_names"]
-                else []
-            )
-            staff["hospitals"] = (
-                staff["hospital_names"].split(",") if staff["hospital_names"] else []
-            )
+    ]
 
-            del staff["department_names"]
-            del staff["hospital_names"]
 
-        return staff_list
+def _staff_role(name: str) -> str:
+    if name.startswith("Dr."):
+        return "Doctor"
+    if name.startswith("Nurse"):
+        return "Nurse"
+    if name.startswith("Technician"):
+        return "Technician"
+    return "Admin"
 
 
 async def create_staff(
@@ -251,8 +347,6 @@ async def create_staff(
             ),
         )
 
-    await conn.commit()
-
     return {
         "id": staff_data["id"],
         "name": staff_data["name"],
@@ -263,133 +357,121 @@ async def create_staff(
     }
 
 
-PATIENTS_BASE_CTE = """
-WITH NextAppointments AS (
-    SELECT
-        CA.IID,
-        CA.DEP_ID,
-        CA.Date AS ActivityDate,
-        CA.Time AS ActivityTime,
-        A.Reason,
-        ROW_NUMBER() OVER (
-            PARTITION BY CA.IID
-            ORDER BY CA.Date, COALESCE(CA.Time, '00:00:00'), CA.CAID
-        ) AS rn
-    FROM ClinicalActivity CA
-    JOIN Appointment A ON A.CAID = CA.CAID
-    WHERE CA.Date >= CURRENT_DATE
-),
-PrimaryLocations AS (
-    SELECT IID, City
-    FROM (
-        SELECT
-            h.IID,
-            cl.City,
-            ROW_NUMBER() OVER (PARTITION BY h.IID ORDER BY h.CLID ASC) AS rn
-        FROM have h
-        JOIN ContactLocation cl ON cl.CLID = h.CLID
-    ) ranked
-    WHERE rn = 1
-),
-LatestInsurance AS (
-    SELECT IID, InsID, Type
-    FROM (
-        SELECT
-            CA.IID,
-            E.InsID,
-            I.Type,
-            ROW_NUMBER() OVER (
-                PARTITION BY CA.IID
-                ORDER BY CA.Date DESC, COALESCE(CA.Time, '00:00:00') DESC, CA.CAID DESC
-            ) AS rn
-        FROM ClinicalActivity CA
-        JOIN Expense E ON E.CAID = CA.CAID
-        LEFT JOIN Insurance I ON I.InsID = E.InsID
-    ) ranked
-    WHERE rn = 1
-),
-LatestStatus AS (
-    SELECT IID, Outcome
-    FROM (
-        SELECT
-            CA.IID,
-            EM.Outcome,
-            ROW_NUMBER() OVER (
-                PARTITION BY CA.IID
-                ORDER BY CA.Date DESC, COALESCE(CA.Time, '00:00:00') DESC, CA.CAID DESC
-            ) AS rn
-        FROM ClinicalActivity CA
-        LEFT JOIN Emergency EM ON EM.CAID = CA.CAID
-    ) ranked
-    WHERE rn = 1
-),
-PatientRows AS (
-    SELECT
-        P.IID AS iid,
-        UPPER(P.CIN) AS cin,
-        P.FullName AS name,
-        P.Sex AS sex,
-        P.Birth AS birthDate,
-        NULLIF(P.BloodGroup, '') AS bloodGroup,
-        NULLIF(P.Phone, '') AS phone,
-        NULL AS email,
-        COALESCE(Loc.City, 'N/A') AS city,
-        COALESCE(Ins.Type, 'None') AS insurance,
-        CASE WHEN Stat.Outcome = 'Admitted' THEN 'Admitted' ELSE 'Outpatient' END AS status,
-        CASE WHEN Ins.InsID IS NOT NULL THEN CONCAT('Policy ', LPAD(Ins.InsID, 4, '0'), '-', LPAD(P.IID, 4, '0')) ELSE NULL END AS policyNumber,
-        NA.ActivityDate AS nextVisitDate,
-        NA.ActivityTime AS nextVisitTime,
-        H.Name AS nextVisitHospital,
-        D.Name AS nextVisitDepartment,
-        NA.Reason AS nextVisitReason
-    FROM Patient P
-    LEFT JOIN PrimaryLocations Loc ON Loc.IID = P.IID
-    LEFT JOIN LatestInsurance Ins ON Ins.IID = P.IID
-    LEFT JOIN LatestStatus Stat ON Stat.IID = P.IID
-    LEFT JOIN NextAppointments NA ON NA.IID = P.IID AND NA.rn = 1
-    LEFT JOIN Department D ON D.DEP_ID = NA.DEP_ID
-    LEFT JOIN Hospital H ON H.HID = D.HID
+# One narrow row per patient, maintained by the PatientSummary triggers in
+# summaries/summaries.sql; reference names are primary key lookups.
+# Columns of PATIENTS_SUMMARY_SELECT in the order _patient_payloads unpacks them.
+PATIENT_COLUMNS = (
+    "iid",
+    "cin",
+    "name",
+    "sex",
+    "birthDate",
+    "bloodGroup",
+    "phone",
+    "email",
+    "city",
+    "insurance",
+    "status",
+    "policyNumber",
+    "nextVisitDate",
+    "nextVisitTime",
+    "nextVisitHospital",
+    "nextVisitDepartment",
+    "nextVisitReason",
 )
+
+PATIENTS_SUMMARY_SELECT = """
+SELECT
+    p.IID AS iid,
+    UPPER(p.CIN) AS cin,
+    p.FullName AS name,
+    p.Sex AS sex,
+    p.Birth AS birthDate,
+    NULLIF(p.BloodGroup, '') AS bloodGroup,
+    NULLIF(p.Phone, '') AS phone,
+    NULL AS email,
+    COALESCE(p.City, 'N/A') AS city,
+    COALESCE(I.Type, 'None') AS insurance,
+    p.Status AS status,
+    CASE WHEN p.InsID IS NOT NULL THEN CONCAT('Policy ', LPAD(p.InsID, 4, '0'), '-', LPAD(p.IID, 4, '0')) ELSE NULL END AS policyNumber,
+    p.NextVisitDate AS nextVisitDate,
+    TIME_FORMAT(p.NextVisitTime, '%%H:%%i') AS nextVisitTime,
+    H.Name AS nextVisitHospital,
+    D.Name AS nextVisitDepartment,
+    p.NextVisitReason AS nextVisitReason
+FROM PatientSummary p
+LEFT JOIN Insurance I ON I.InsID = p.InsID
+LEFT JOIN Department D ON D.DEP_ID = p.NextVisitDEP_ID
+LEFT JOIN Hospital H ON H.HID = D.HID
 """
 
 
+def _encode_patients_cursor(payload: List[Any]) -> str:
+    raw = json.dumps(payload, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def _decode_patients_cursor(
+    cursor: str,
+) -> Tuple[Optional[Tuple[str, int]], Optional[int]]:
+    """Return ``((name, iid), None)`` for keyset or ``(None, offset)`` for search."""
+
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        kind, *values = json.loads(raw)
+        if kind == "k":
+            name, iid = values
+            return (str(name), int(iid)), None
+        if kind == "o":
+            (offset,) = values
+            if int(offset) >= 0:
+                return None, int(offset)
+    except (ValueError, TypeError):
+        pass
+    raise PatientsAPIError(400, "Invalid cursor")
+
+
 def _build_patients_query(
     params: Optional[PatientsQueryParams],
     *,
-    extra_conditions: Optional[List[str]] = None,
-    extra_args: Optional[List[Any]] = None,
+    iids: Optional[Sequence[int]] = None,
+    after: Optional[Tuple[str, int]] = None,
+    offset: int = 0,
     limit: Optional[int] = None,
 ) -> tuple[str, List[Any]]:
-    filters: List[str] = []
-    args: List[Any] = []
+    """Build the ``PatientSummary`` read, restricted to ``iids`` when given.
+
+    Rows come in ``(name, iid)`` order along ``idx_PatientSummary_FullName_IID``
+    (or its ``Status``-prefixed twin); ``after`` continues past a keyset
+    position. ``params.search`` is not applied here; it is resolved to IIDs
+    first by :func:`search_patient_ids`.
+    """
 
     if params:
-        if params.search:
-            pattern = f"%{params.search.lower()}%"
-            filters.append("(LOWER(cin) LIKE %s OR LOWER(name) LIKE %s)")
-            args.extend([pattern, pattern])
-        if params.sex:
-            filters.append("sex = %s")
-            args.append(params.sex)
-        if params.bloodGroup:
-            filters.append("bloodGroup = %s")
-            args.append(params.bloodGroup)
-        if params.status:
-            filters.append("status = %s")
-            args.append(params.status)
-
-    if extra_conditions:
-        filters.extend(extra_conditions)
-        if extra_args:
-            args.extend(extra_args)
-
-    sql = PATIENTS_BASE_CTE + "\nSELECT * FROM PatientRows"
-    if filters:
-        sql += "\nWHERE " + " AND ".join(filters)
-    sql += "\nORDER BY name ASC"
+        conditions, args = patient_filters(
+            sex=params.sex, blood_group=params.bloodGroup, status=params.status
+        )
+    else:
+        conditions, args = [], []
+
+    if iids is not None:
+        placeholders = ", ".join(["%s"] * len(iids))
+        conditions.append(f"p.IID IN ({placeholders})")
+        args.extend(iids)
+    if after is not None:
+        conditions.append("(p.FullName > %s OR (p.FullName = %s AND p.IID > %s))")
+        args.extend([after[0], after[0], after[1]])
+
+    sql = PATIENTS_SUMMARY_SELECT.rstrip()
+    if conditions:
+        sql += "\nWHERE " + " AND ".join(conditions)
+    sql += "\nORDER BY p.FullName ASC, p.IID ASC"
     if limit is not None:
         sql += "\nLIMIT %s"
         args.append(limit)
+        if after is None and offset:
+            sql += " OFFSET %s"
+            args.append(offset)
 
     return sql, args
 
@@ -398,84 +480,97 @@ async def _fetch_patients(
     conn: aiomysql.Connection,
     *,
     params: Optional[PatientsQueryParams] = None,
-    extra_conditions: Optional[List[str]] = None,
-    extra_args: Optional[List[Any]] = None,
+    iids: Optional[Sequence[int]] = None,
     limit: Optional[int] = None,
 ) -> List[PatientRecord]:
-    sql, args = _build_patients_query(
-        params,
-        extra_conditions=extra_conditions,
-        extra_args=extra_args,
-        limit=limit,
-    )
-    rows = await _fetchall(conn, sql, tuple(args))
-    return [_normalize_patient_row(row) for row in rows]
+    if params and params.search and iids is None:
+        iids = await search_patient_ids(
+            conn,
+            params.search,
+            sex=params.sex,
+            blood_group=params.bloodGroup,
+            status=params.status,
+        )
+        rank = {iid: position for position, iid in enumerate(iids)}
+    else:
+        rank = None
+    if iids is not None and not iids:
+        return []
+
+    sql, args = _build_patients_query(params, iids=iids, limit=limit)
+    with iso_dates(conn):
+        layout, rows = await fetch_tuples(conn, sql, args)
+    patients = _normalize_patient_rows(layout, rows)
+    if rank is not None:
+        # Keep the search ranking rather than the alphabetical order.
+        patients.sort(key=lambda patient: rank[patient.iid])
+    return patients
+
+
+def _normalize_patient_rows(
+    layout: RowLayout, rows: Sequence[Sequence[Any]]
+) -> List[PatientRecord]:
+    # One validation call for the whole batch instead of one per row.
+    return _PATIENT_RECORDS.validate_python(_patient_payloads(layout, rows))
 
 
-async def _fetchall(
-    conn: aiomysql.Connection,
-    sql: str,
-    params: Sequence[Any],
+def _patient_payloads(
+    layout: RowLayout, rows: Sequence[Sequence[Any]]
 ) -> List[Dict[str, Any]]:
-    async with conn.cursor(aiomysql.DictCursor) as cur:
-        await cur.execute(sql, params)
-        return await cur.fetchall()
-
-
-def _normalize_patient_row(row: Dict[str, Any]) -> PatientRecord:
-    insurance = row.get("insurance") or "None"
-    insurance_status = "Active" if insurance != "None" else "Self-Pay"
-    policy_number = row.get("policyNumber") if insurance_status == "Active" else None
-    patient_payload: Dict[str, Any] = {
-        "iid": int(row.get("iid", 0)),
-        "cin": (row.get("cin") or "").upper(),
-        "name": row.get("name"),
-        "sex": row.get("sex"),
-        "birthDate": _iso_date(row.get("birthDate")),
-        "bloodGroup": row.get("bloodGroup") or None,
-        "phone": row.get("phone") or None,
-        "email": row.get("email"),
-        "city": row.get("city") or "N/A",
-        "insurance": insurance,
-        "insuranceStatus": insurance_status,
-        "policyNumber": policy_number,
-        "status": row.get("status") or "Outpatient",
-        "nextVisit": _build_next_visit(row),
-    }
-    return PatientRecord.model_validate(patient_payload)
-
-
-def _build_next_visit(row: Dict[str, Any]) -> Optional[PatientNextVisit]:
-    date_value = _iso_date(row.get("nextVisitDate"))
-    if not date_value:
-        return None
-    time_value = _iso_time(row.get("nextVisitTime"))
-    visit_payload = {
-        "date": date_value,
-        "time": time_value,
-        "hospital": row.get("nextVisitHospital"),
-        "department": row.get("nextVisitDepartment"),
-        "reason": row.get("nextVisitReason"),
-    }
-    return PatientNextVisit.model_validate(visit_payload)
-
-
-def _iso_date(value: Optional[Any]) -> Optional[str]:
-    if isinstance(value, datetime):
-        return value.date().isoformat()
-    if isinstance(value, date):
-        return value.isoformat()
-    return value if isinstance(value, str) else None
-
-
-def _iso_time(value: Optional[Any]) -> Optional[str]:
-    if isinstance(value, datetime):
-        value = value.time()
-    if isinstance(value, time):
-        return value.replace(microsecond=0).strftime("%H:%M")
-    if isinstance(value, str):
-        return value
-    return None
+    # Dates arrive as ISO strings (iso_dates) and the visit time is formatted
+    # by PATIENTS_SUMMARY_SELECT, so values are only defaulted here.
+    columns = layout.getter(*PATIENT_COLUMNS)
+    payloads: List[Dict[str, Any]] = []
+    for (
+        iid,
+        cin,
+        name,
+        sex,
+        birth_date,
+        blood_group,
+        phone,
+        email,
+        city,
+        insurance,
+        status,
+        policy_number,
+        visit_date,
+        visit_time,
+        visit_hospital,
+        visit_department,
+        visit_reason,
+    ) in map(columns, rows):
+        insurance = insurance or "None"
+        insured = insurance != "None"
+        payloads.append(
+            {
+                "iid": iid,
+                "cin": (cin or "").upper(),
+                "name": name,
+                "sex": sex,
+                "birthDate": birth_date,
+                "bloodGroup": blood_group or None,
+                "phone": phone or None,
+                "email": email,
+                "city": city or "N/A",
+                "insurance": insurance,
+                "insuranceStatus": "Active" if insured else "Self-Pay",
+                "policyNumber": policy_number if insured else None,
+                "status": status or "Outpatient",
+                "nextVisit": (
+                    {
+                        "date": visit_date,
+                        "time": visit_time,
+                        "hospital": visit_hospital,
+                        "department": visit_department,
+                        "reason": visit_reason,
+                    }
+                    if visit_date
+                    else None
+                ),
+            }
+        )
+    return payloads
 
 
 __all__ = [
@@ -487,6 +582,8 @@ __all__ = [
     "PatientsResponse",
     "create_patient",
     "create_staff",
-    "get_all_patients",
+    "get_patients_page",
     "get_all_staff",
+    "stream_patients",
+    "stream_staff",
 ]
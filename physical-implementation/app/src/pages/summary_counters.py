@@ -0,0 +1,99 @@
+"""Core dashboard summary counters.
+
+Each counter is an independent, uncorrelated subquery whose predicate matches
+an index prefix, so MySQL resolves it as an index range count:
+
+* ``totalAppointments`` - ``COUNT(*)`` over ``idx_Appointment_Status`` (the
+  narrowest index on Appointment) or, with a date range, a range scan of
+  ``idx_ClinicalActivity_Date_Time`` joined to Appointment by primary key.
+* ``upcomingAppointments`` - ``idx_ClinicalActivity_Date_Time`` range from
+  today, filtered on ``Appointment.Status`` through the primary key.
+* ``activeStaff`` - ``idx_Staff_Status`` ref count, covered.
+* ``admittedPatients`` - ``idx_Emergency_Outcome_CAID`` ref scan (covered),
+  joined to ClinicalActivity by primary key for ``IID`` and ``Date``.
+
+The enum values are bound as parameters; the previous literals carried stray
+padding (``' Scheduled '``) and never matched under the NO PAD collation.
+"""
+
+from datetime import date
+from typing import Any, Dict, List, Optional, Tuple
+
+import aiomysql
+
+SCHEDULED_STATUS = "Scheduled"
+ACTIVE_STAFF_STATUS = "Active"
+ADMITTED_OUTCOME = "Admitted"
+
+Bounds = Optional[Tuple[date, date]]
+
+
+def build_summary_counters_query(bounds: Bounds = None) -> Tuple[str, List[Any]]:
+    """Return the counters statement and its parameters for ``bounds``."""
+
+    params: List[Any] = []
+
+    if bounds is None:
+        total_sql = "SELECT COUNT(*) FROM Appointment"
+    else:
+        total_sql = (
+            "SELECT COUNT(*) FROM ClinicalActivity c"
+            " JOIN Appointment a ON a.CAID = c.CAID"
+            " WHERE c.Date BETWEEN %s AND %s"
+        )
+        params.extend(bounds)
+
+    upcoming_sql = (
+        "SELECT COUNT(*) FROM ClinicalActivity c"
+        " JOIN Appointment a ON a.CAID = c.CAID"
+        " WHERE a.Status = %s"
+    )
+    params.append(SCHEDULED_STATUS)
+    if bounds is None:
+        upcoming_sql += " AND c.Date >= CURRENT_DATE()"
+    else:
+        upcoming_sql += " AND c.Date BETWEEN GREATEST(CURRENT_DATE(), %s) AND %s"
+        params.extend(bounds)
+
+    staff_sql = "SELECT COUNT(*) FROM Staff WHERE Status = %s"
+    params.append(ACTIVE_STAFF_STATUS)
+
+    admitted_sql = (
+        "SELECT COUNT(DISTINCT c.IID) FROM Emergency e"
+        " JOIN ClinicalActivity c ON c.CAID = e.CAID"
+        " WHERE e.Outcome = %s"
+    )
+    params.append(ADMITTED_OUTCOME)
+    if bounds is not None:
+        admitted_sql += " AND c.Date BETWEEN %s AND %s"
+        params.extend(bounds)
+
+    sql = (
+        "SELECT"
+        f" ({total_sql}) AS totalAppointments,"
+        f" ({upcoming_sql}) AS upcomingAppointments,"
+        f" ({staff_sql}) AS activeStaff,"
+        f" ({admitted_sql}) AS admittedPatients"
+    )
+    return sql, params
+
+
+async def fetch_summary_counters(
+    conn: aiomysql.Connection, bounds: Bounds = None
+) -> Dict[str, int]:
+    """Run the counters in one round trip and return them by response alias."""
+
+    sql, params = build_summary_counters_query(bounds)
+    async with conn.cursor(aiomysql.DictCursor) as cur:
+        await cur.execute(sql, params)
+        row = await cur.fetchone()
+    return {key: int(value or 0) for key, value in row.items()}
+
+
+__all__ = [
+    "ACTIVE_STAFF_STATUS",
+    "ADMITTED_OUTCOME",
+    "SCHEDULED_STATUS",
+    "build_summary_counters_query",
+    "fetch_summary_counters",
+]
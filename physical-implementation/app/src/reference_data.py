@@ -0,0 +1,240 @@
+"""Name to ID resolution for the reference data used when booking.
+
+Appointment requests name the hospital, department, patient and staff member.
+:class:`ReferenceResolver` keeps the resolved IDs in process. Hospital and
+department pairs are loaded in full on first use; patients and staff are
+cached per name in an LRU. Only successful lookups are stored, so a name
+that did not resolve is looked up again next time. Whatever is not cached is
+resolved in one round trip through the ``FullName`` indexes, for one booking
+or a whole batch.
+"""
+
+import os
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+import aiomysql
+
+# (kind, normalized name); kind is "patient", "staff", "patient-id" or "staff-id".
+PersonKey = Tuple[str, str]
+
+_PERSON_LOOKUPS = {
+    "patient": "SELECT IID FROM Patient WHERE FullName = %s ORDER BY IID LIMIT 1",
+    "patient-id": "SELECT IID FROM Patient WHERE IID = %s",
+    "staff": "SELECT STAFF_ID FROM Staff WHERE FullName = %s ORDER BY STAFF_ID LIMIT 1",
+    "staff-id": "SELECT STAFF_ID FROM Staff WHERE STAFF_ID = %s",
+}
+
+_DEPARTMENT_LOOKUP = (
+    "SELECT d.DEP_ID FROM Department d JOIN Hospital h ON d.HID = h.HID"
+    " WHERE d.Name = %s AND h.Name = %s"
+    " ORDER BY d.DEP_ID LIMIT 1"
+)
+
+
+def _normalize(name: str) -> str:
+    # The columns use a case-insensitive collation; anything it folds that
+    # casefold() does not simply misses the cache and is resolved in MySQL.
+    return str(name).casefold()
+
+
+def _person_key(kind: str, value: str) -> PersonKey:
+    value = str(value)
+    if value.isdigit():
+        return (f"{kind}-id", value)
+    return (kind, _normalize(value))
+
+
+@dataclass
+class ResolvedReferences:
+    """IDs by the exact names passed to :meth:`ReferenceResolver.resolve_many`."""
+
+    departments: Dict[Tuple[str, str], Optional[int]] = field(default_factory=dict)
+    patients: Dict[str, Optional[int]] = field(default_factory=dict)
+    staff: Dict[str, Optional[int]] = field(default_factory=dict)
+
+
+class ReferenceResolver:
+    """In-process cache of hospital/department/patient/staff IDs."""
+
+    def __init__(self, max_entries: int = 4096, *, preload: bool = True) -> None:
+        self.max_entries = max_entries
+        self.preload = preload
+        self._departments: Optional[Dict[Tuple[str, str], int]] = None
+        self._people: "OrderedDict[PersonKey, int]" = OrderedDict()
+        self._counters: Dict[str, int] = {"hits": 0, "misses": 0, "invalidations": 0}
+
+    async def resolve_booking(
+        self,
+        conn: aiomysql.Connection,
+        *,
+        hospital: str,
+        department: str,
+        patient: str,
+        staff: str,
+    ) -> Tuple[int, int, int]:
+        """Return ``(iid, staff_id, dep_id)``; raises ``ValueError`` naming a miss."""
+
+        resolved = await self.resolve_many(
+            conn,
+            departments=[(hospital, department)],
+            patients=[patient],
+            staff=[staff],
+        )
+        iid = resolved.patients[patient]
+        staff_id = resolved.staff[staff]
+        dep_id = resolved.departments[(hospital, department)]
+        if iid is None:
+            raise ValueError(f"Patient '{patient}' not found")
+        if staff_id is None:
+            raise ValueError(f"Staff '{staff}' not found")
+        if dep_id is None:
+            raise ValueError(
+                f"Department '{department}' in Hospital '{hospital}' not found"
+            )
+        return iid, staff_id, dep_id
+
+    async def resolve_many(
+        self,
+        conn: aiomysql.Connection,
+        *,
+        departments: Iterable[Tuple[str, str]] = (),
+        patients: Iterable[str] = (),
+        staff: Iterable[str] = (),
+    ) -> "ResolvedReferences":
+        """Resolve every distinct name; misses map to ``None``.
+
+        Uncached names are looked up together in one statement, a ``UNION
+        ALL`` of indexed point lookups, so a batch costs one round trip however
+        many names it carries.
+        """
+
+        if self._departments is None and self.preload:
+            await self._load_departments(conn)
+
+        resolved = ResolvedReferences()
+        pending: List[Tuple[Callable[[Optional[int]], None], str, List[Any]]] = []
+
+        for hospital, department in dict.fromkeys(departments):
+            pair = (hospital, department)
+            dep_key = (_normalize(hospital), _normalize(department))
+            cached = self._departments.get(dep_key) if self._departments else None
+            resolved.departments[pair] = cached
+            if cached is None:
+                pending.append(
+                    (
+                        self._department_setter(resolved, pair, dep_key),
+                        _DEPARTMENT_LOOKUP,
+                        [department, hospital],
+                    )
+                )
+
+        for kind, names, target in (
+            ("patient", patients, resolved.patients),
+            ("staff", staff, resolved.staff),
+        ):
+            for name in dict.fromkeys(names):
+                key = _person_key(kind, name)
+                cached = self._cached_person(key)
+                target[name] = cached
+                if cached is None:
+                    pending.append(
+                        (
+                            self._person_setter(target, name, key),
+                            _PERSON_LOOKUPS[key[0]],
+                            [name],
+                        )
+                    )
+
+        if not pending:
+            self._counters["hits"] += 1
+            return resolved
+
+        self._counters["misses"] += 1
+        sql = " UNION ALL ".join(
+            f"SELECT {position} AS position, ({lookup}) AS id"
+            for position, (_, lookup, _) in enumerate(pending)
+        )
+        args = [arg for _, _, lookup_args in pending for arg in lookup_args]
+        async with conn.cursor() as cur:
+            await cur.execute(sql, args)
+            rows = await cur.fetchall()
+        for position, value in rows:
+            setter = pending[int(position)][0]
+            setter(None if value is None else int(value))
+        return resolved
+
+    def invalidate(self) -> None:
+        """Forget every cached ID; the department map reloads on next use."""
+
+        self._departments = None
+        self._people.clear()
+        self._counters["invalidations"] += 1
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "maxEntries": self.max_entries,
+            "departments": len(self._departments or ()),
+            "people": len(self._people),
+            **self._counters,
+        }
+
+    async def _load_departments(self, conn: aiomysql.Connection) -> None:
+        async with conn.cursor() as cur:
+            await cur.execute(
+                "SELECT h.Name, d.Name, d.DEP_ID"
+                " FROM Department d JOIN Hospital h ON d.HID = h.HID"
+                " ORDER BY d.DEP_ID DESC"
+            )
+            rows = await cur.fetchall()
+        # Descending so the lowest DEP_ID wins for duplicate names.
+        self._departments = {
+            (_normalize(hospital), _normalize(department)): int(dep_id)
+            for hospital, department, dep_id in rows
+        }
+
+    def _department_setter(
+        self,
+        resolved: "ResolvedReferences",
+        pair: Tuple[str, str],
+        dep_key: Tuple[str, str],
+    ) -> Callable[[Optional[int]], None]:
+        def store(dep_id: Optional[int]) -> None:
+            resolved.departments[pair] = dep_id
+            if dep_id is not None and self._departments is not None:
+                self._departments[dep_key] = dep_id
+
+        return store
+
+    def _person_setter(
+        self, target: Dict[str, Optional[int]], name: str, key: PersonKey
+    ) -> Callable[[Optional[int]], None]:
+        def store(value: Optional[int]) -> None:
+            target[name] = value
+            if value is not None:
+                self._remember_person(key, value)
+
+        return store
+
+    def _cached_person(self, key: PersonKey) -> Optional[int]:
+        value = self._people.get(key)
+        if value is not None:
+            self._people.move_to_end(key)
+        return value
+
+    def _remember_person(self, key: PersonKey, value: int) -> None:
+        if self.max_entries <= 0:
+            return
+        self._people[key] = value
+        self._people.move_to_end(key)
+        while len(self._people) > self.max_entries:
+            self._people.popitem(last=False)
+
+
+def create_reference_resolver() -> ReferenceResolver:
+    """Build the resolver from ``REFERENCE_CACHE_MAX_ENTRIES``."""
+
+    return ReferenceResolver(
+        max_entries=int(os.getenv("REFERENCE_CACHE_MAX_ENTRIES", 4096))
+    )
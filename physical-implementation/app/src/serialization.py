@@ -0,0 +1,53 @@
+"""Single-pass JSON output for responses built from trusted data.
+
+The read endpoints assemble their Pydantic models from rows of our own
+schema. Returning such a model lets FastAPI dump it, validate the dump
+against ``response_model`` and encode the result again. Returning a
+:class:`JSONBytesResponse` skips all of that: pydantic-core writes the model
+straight to JSON bytes, with the same aliases and formats FastAPI would use.
+``response_model`` stays on the route for the OpenAPI schema only.
+"""
+
+import json
+from typing import Any, Awaitable, Callable
+
+from fastapi.responses import Response
+from pydantic import BaseModel
+
+
+class JSONBytesResponse(Response):
+    """``application/json`` response whose body is already encoded."""
+
+    media_type = "application/json"
+
+
+def dump_json(model: BaseModel) -> bytes:
+    """Serialize ``model`` the way FastAPI's ``response_model`` path does."""
+
+    return type(model).__pydantic_serializer__.to_json(model, by_alias=True)
+
+
+def encode_json(content: Any) -> bytes:
+    """Encode plain JSON values exactly as ``JSONResponse`` renders them.
+
+    For dict/list payloads that already hold only JSON types, this skips
+    FastAPI's ``jsonable_encoder``, which visits every value in Python.
+    """
+
+    return json.dumps(
+        content, ensure_ascii=False, allow_nan=False, separators=(",", ":")
+    ).encode("utf-8")
+
+
+def json_loader(
+    loader: Callable[[], Awaitable[BaseModel]],
+) -> Callable[[], Awaitable[bytes]]:
+    """Wrap a model loader so the response cache stores encoded bodies."""
+
+    async def load() -> bytes:
+        return dump_json(await loader())
+
+    return load
+
+
+__all__ = ["JSONBytesResponse", "dump_json", "encode_json", "json_loader"]
@@ -27,10 +27,12 @@ ON ClinicalActivity(DEP_ID,Date);
 
 -- index 2:
 
--- Optimizes join with Staff and filtering by activity date range
+-- Optimizes join with Staff and filtering by activity date range; the
+-- trailing Time column also makes the double-booking check a point lookup
+-- (see POST /api/appointments below)
 
-CREATE INDEX idx_ClinicalActivity_STAFF_ID_Date
-ON ClinicalActivity(STAFF_ID,Date);
+CREATE INDEX idx_ClinicalActivity_STAFF_ID_Date_Time
+ON ClinicalActivity(STAFF_ID,Date,Time);
 
 
 
@@ -57,3 +59,80 @@ ON ClinicalActivity(IID,Date,Time);
 
 
 
+
+
+
+-- Endpoint : GET /api/appointments
+
+-- index 1 :
+
+-- Serves the keyset pages ordered by (Date, Time, CAID) newest first;
+-- InnoDB appends the CAID primary key, so the cursor predicate is an index range
+-- Also drives the core dashboard's recent-appointments top-N and its
+-- range-bounded summary counts (Date BETWEEN ... scans only the range)
+
+CREATE INDEX idx_ClinicalActivity_Date_Time
+ON ClinicalActivity(Date,Time);
+
+
+
+-- Endpoint : GET /api/core-dashboard (summary counters)
+
+-- index 1 :
+
+-- totalAppointments / upcomingAppointments: narrow covering index, COUNT(*)
+-- and Status = 'Scheduled' resolve without touching the clustered rows
+
+CREATE INDEX idx_Appointment_Status
+ON Appointment(Status);
+
+-- index 2:
+
+-- activeStaff: Status = 'Active' becomes a covered ref count
+
+CREATE INDEX idx_Staff_Status
+ON Staff(Status);
+
+-- index 3:
+
+-- admittedPatients: Outcome = 'Admitted' range yields the CAIDs from the index
+-- alone before the primary-key join to ClinicalActivity
+
+CREATE INDEX idx_Emergency_Outcome_CAID
+ON Emergency(Outcome,CAID);
+
+
+
+-- Endpoint : GET /api/patients?search=
+
+-- index 1 :
+
+-- Name-prefix search tier and alphabetical patient ordering;
+-- InnoDB appends IID, so (FullName, IID) comes for free
+
+CREATE INDEX idx_Patient_FullName
+ON Patient(FullName);
+
+-- index 2:
+
+-- Substring search on names through the ngram parser; exact and prefix CIN
+-- lookups use the existing CIN unique key
+
+CREATE FULLTEXT INDEX ftx_Patient_FullName
+ON Patient(FullName) WITH PARSER ngram;
+
+
+
+-- Endpoint : POST /api/appointments
+
+-- index 1 :
+
+-- Staff name -> STAFF_ID resolution for bookings becomes a ref lookup
+-- (patient names use idx_Patient_FullName)
+
+CREATE INDEX idx_Staff_FullName
+ON Staff(FullName);
+
+-- The double-booking check in trg_no_double_booking_before_insert/_update and
+-- the bulk endpoint's slot pre-check are (STAFF_ID, Date, Time) point lookups
+-- on idx_ClinicalActivity_STAFF_ID_Date_Time (View 2, index 2)
@@ -0,0 +1,557 @@
+-- Pre-aggregated summary tables read by the FastAPI dashboards.
+-- Run after triggers/triggers.sql; every summary ends with a full backfill.
+-- The AFTER INSERT triggers do nothing while @mnhs_bulk_load is set: the bulk
+-- loader (app/seed/load.py) sets it on its sessions and runs the refresh_*
+-- procedures once the data is in.
+
+DELIMITER $$
+
+-- 1. BillingDaily: expense totals per day, hospital, department and insurer.
+--    InsID = 0 stands for Self-Pay (Expense.InsID IS NULL) so it can be part
+--    of the primary key.
+
+CREATE TABLE IF NOT EXISTS BillingDaily (
+    ActivityDate DATE NOT NULL,
+    HID INT NOT NULL,
+    DEP_ID INT NOT NULL,
+    InsID INT NOT NULL DEFAULT 0,
+    Total DECIMAL(14,2) NOT NULL DEFAULT 0,
+    ExpenseCount INT NOT NULL DEFAULT 0,
+    InsuredTotal DECIMAL(14,2) NOT NULL DEFAULT 0,
+    PRIMARY KEY (ActivityDate, HID, DEP_ID, InsID),
+    KEY idx_BillingDaily_HID_Date (HID, ActivityDate),
+    KEY idx_BillingDaily_DEP_ID_Date (DEP_ID, ActivityDate)
+) $$
+
+DROP PROCEDURE IF EXISTS billing_daily_apply $$
+CREATE PROCEDURE billing_daily_apply(
+    IN p_date DATE,
+    IN p_dep_id INT,
+    IN p_ins_id INT,
+    IN p_total DECIMAL(10,2),
+    IN p_sign INT
+)
+BEGIN
+    DECLARE v_hid INT;
+    SELECT D.`HID` INTO v_hid FROM `Department` D WHERE D.`DEP_ID` = p_dep_id;
+
+    INSERT INTO BillingDaily (ActivityDate, HID, DEP_ID, InsID, Total, ExpenseCount, InsuredTotal)
+    VALUES (
+        p_date,
+        v_hid,
+        p_dep_id,
+        COALESCE(p_ins_id, 0),
+        p_sign * p_total,
+        p_sign,
+        IF(p_ins_id IS NULL, 0, p_sign * p_total)
+    ) AS delta
+    ON DUPLICATE KEY UPDATE
+        Total = BillingDaily.Total + delta.Total,
+        ExpenseCount = BillingDaily.ExpenseCount + delta.ExpenseCount,
+        InsuredTotal = BillingDaily.InsuredTotal + delta.InsuredTotal;
+
+    IF p_sign < 0 THEN
+        DELETE FROM BillingDaily
+        WHERE ActivityDate = p_date
+          AND HID = v_hid
+          AND DEP_ID = p_dep_id
+          AND InsID = COALESCE(p_ins_id, 0)
+          AND ExpenseCount <= 0;
+    END IF;
+END $$
+
+-- Rebuild the summary for [p_from, p_to]; NULL bounds mean unbounded.
+-- Use after bulk loads or when a department moves to another hospital.
+DROP PROCEDURE IF EXISTS refresh_billing_daily $$
+CREATE PROCEDURE refresh_billing_daily(IN p_from DATE, IN p_to DATE)
+BEGIN
+    DELETE FROM BillingDaily
+    WHERE (p_from IS NULL OR ActivityDate >= p_from)
+      AND (p_to IS NULL OR ActivityDate <= p_to);
+
+    INSERT INTO BillingDaily (ActivityDate, HID, DEP_ID, InsID, Total, ExpenseCount, InsuredTotal)
+    SELECT
+        C.`Date`,
+        D.`HID`,
+        C.`DEP_ID`,
+        COALESCE(E.`InsID`, 0),
+        SUM(E.`Total`),
+        COUNT(*),
+        SUM(CASE WHEN E.`InsID` IS NOT NULL THEN E.`Total` ELSE 0 END)
+    FROM `Expense` E
+    JOIN `ClinicalActivity` C ON C.`CAID` = E.`CAID`
+    JOIN `Department` D ON D.`DEP_ID` = C.`DEP_ID`
+    WHERE (p_from IS NULL OR C.`Date` >= p_from)
+      AND (p_to IS NULL OR C.`Date` <= p_to)
+    GROUP BY C.`Date`, D.`HID`, C.`DEP_ID`, COALESCE(E.`InsID`, 0);
+END $$
+
+DROP TRIGGER IF EXISTS trg_expense_after_insert_billing_daily $$
+CREATE TRIGGER trg_expense_after_insert_billing_daily
+AFTER INSERT ON Expense
+FOR EACH ROW
+BEGIN
+    DECLARE v_date DATE;
+    DECLARE v_dep_id INT;
+    IF @mnhs_bulk_load IS NULL THEN
+        SELECT C.`Date`, C.`DEP_ID` INTO v_date, v_dep_id
+        FROM `ClinicalActivity` C WHERE C.`CAID` = NEW.CAID;
+        CALL billing_daily_apply(v_date, v_dep_id, NEW.InsID, NEW.Total, 1);
+    END IF;
+END $$
+
+-- Fires for POST /api/billing/expense corrections and for the Includes-driven
+-- calculate_expense recomputation in trg_iclude_after_update.
+DROP TRIGGER IF EXISTS trg_expense_after_update_billing_daily $$
+CREATE TRIGGER trg_expense_after_update_billing_daily
+AFTER UPDATE ON Expense
+FOR EACH ROW
+BEGIN
+    DECLARE v_date DATE;
+    DECLARE v_dep_id INT;
+    IF NOT (NEW.Total <=> OLD.Total AND NEW.InsID <=> OLD.InsID AND NEW.CAID = OLD.CAID) THEN
+        SELECT C.`Date`, C.`DEP_ID` INTO v_date, v_dep_id
+        FROM `ClinicalActivity` C WHERE C.`CAID` = OLD.CAID;
+        CALL billing_daily_apply(v_date, v_dep_id, OLD.InsID, OLD.Total, -1);
+
+        SELECT C.`Date`, C.`DEP_ID` INTO v_date, v_dep_id
+        FROM `ClinicalActivity` C WHERE C.`CAID` = NEW.CAID;
+        CALL billing_daily_apply(v_date, v_dep_id, NEW.InsID, NEW.Total, 1);
+    END IF;
+END $$
+
+DROP TRIGGER IF EXISTS trg_expense_after_delete_billing_daily $$
+CREATE TRIGGER trg_expense_after_delete_billing_daily
+AFTER DELETE ON Expense
+FOR EACH ROW
+BEGIN
+    DECLARE v_date DATE;
+    DECLARE v_dep_id INT;
+    SELECT C.`Date`, C.`DEP_ID` INTO v_date, v_dep_id
+    FROM `ClinicalActivity` C WHERE C.`CAID` = OLD.CAID;
+    CALL billing_daily_apply(v_date, v_dep_id, OLD.InsID, OLD.Total, -1);
+END $$
+
+-- Rescheduling an activity moves its expense to another day/department.
+DROP TRIGGER IF EXISTS trg_ca_after_update_billing_daily $$
+CREATE TRIGGER trg_ca_after_update_billing_daily
+AFTER UPDATE ON ClinicalActivity
+FOR EACH ROW
+BEGIN
+    DECLARE v_ins_id INT;
+    DECLARE v_total DECIMAL(10,2);
+    DECLARE v_found INT DEFAULT 0;
+    IF NOT (NEW.Date <=> OLD.Date AND NEW.DEP_ID <=> OLD.DEP_ID) THEN
+        SELECT COUNT(*), MAX(E.`InsID`), MAX(E.`Total`) INTO v_found, v_ins_id, v_total
+        FROM `Expense` E WHERE E.`CAID` = NEW.CAID;
+        IF v_found > 0 THEN
+            CALL billing_daily_apply(OLD.Date, OLD.DEP_ID, v_ins_id, v_total, -1);
+            CALL billing_daily_apply(NEW.Date, NEW.DEP_ID, v_ins_id, v_total, 1);
+        END IF;
+    END IF;
+END $$
+
+-- 2. StockCurrent: the latest Stock row per (hospital, medication).
+--    Stock is an append-only log; trg_stock_after_insert_current upserts this
+--    table on every Stock insert (API, dumps or manual SQL) so "current stock"
+--    is a primary key lookup instead of ROW_NUMBER() over the whole history.
+
+CREATE TABLE IF NOT EXISTS StockCurrent (
+    HID INT NOT NULL,
+    MID INT NOT NULL,
+    StockTimestamp DATETIME NOT NULL,
+    UnitPrice DECIMAL(10,2) DEFAULT NULL,
+    Qty INT DEFAULT 0,
+    ReorderLevel INT DEFAULT 10,
+    PRIMARY KEY (HID, MID),
+    KEY idx_StockCurrent_MID (MID)
+) $$
+
+-- Rebuild from the Stock log. Run after bulk loads (@mnhs_bulk_load set)
+-- or after Stock rows are updated in place.
+DROP PROCEDURE IF EXISTS refresh_stock_current $$
+CREATE PROCEDURE refresh_stock_current()
+BEGIN
+    DELETE FROM StockCurrent;
+
+    INSERT INTO StockCurrent (HID, MID, StockTimestamp, UnitPrice, Qty, ReorderLevel)
+    SELECT S.`HID`, S.`MID`, S.`StockTimestamp`, S.`UnitPrice`, S.`Qty`, S.`ReorderLevel`
+    FROM `Stock` S
+    JOIN (
+        SELECT `HID`, `MID`, MAX(`StockTimestamp`) AS LatestTimestamp
+        FROM `Stock`
+        GROUP BY `HID`, `MID`
+    ) L ON L.`HID` = S.`HID`
+       AND L.`MID` = S.`MID`
+       AND L.LatestTimestamp = S.`StockTimestamp`;
+END $$
+
+-- A row older than the current one (a back-dated entry) leaves it in place.
+-- StockTimestamp is assigned last so the other columns compare against the
+-- stored value.
+DROP TRIGGER IF EXISTS trg_stock_after_insert_current $$
+CREATE TRIGGER trg_stock_after_insert_current
+AFTER INSERT ON Stock
+FOR EACH ROW
+BEGIN
+    IF @mnhs_bulk_load IS NULL THEN
+        INSERT INTO StockCurrent (HID, MID, StockTimestamp, UnitPrice, Qty, ReorderLevel)
+        VALUES (NEW.HID, NEW.MID, NEW.StockTimestamp, NEW.UnitPrice, NEW.Qty, NEW.ReorderLevel)
+            AS latest
+        ON DUPLICATE KEY UPDATE
+            UnitPrice = IF(latest.StockTimestamp >= StockCurrent.StockTimestamp,
+                           latest.UnitPrice, StockCurrent.UnitPrice),
+            Qty = IF(latest.StockTimestamp >= StockCurrent.StockTimestamp,
+                     latest.Qty, StockCurrent.Qty),
+            ReorderLevel = IF(latest.StockTimestamp >= StockCurrent.StockTimestamp,
+                              latest.ReorderLevel, StockCurrent.ReorderLevel),
+            StockTimestamp = GREATEST(latest.StockTimestamp, StockCurrent.StockTimestamp);
+    END IF;
+END $$
+
+-- 3. PatientSummary: one row per patient with the values /api/patients shows.
+--    Location, latest insurance, latest status and next visit are kept here by
+--    the triggers below, each recomputing only the affected patient. Reference
+--    data (Insurance, Department, Hospital) is stored by id and joined on read.
+
+CREATE TABLE IF NOT EXISTS PatientSummary (
+    IID INT NOT NULL,
+    CIN VARCHAR(10) NOT NULL,
+    FullName VARCHAR(100) NOT NULL,
+    Sex ENUM('M','F') NOT NULL,
+    Birth DATE DEFAULT NULL,
+    BloodGroup ENUM('A+','A-','B+','B-','O+','O-','AB+','AB-') DEFAULT NULL,
+    Phone VARCHAR(15) DEFAULT NULL,
+    City VARCHAR(50) DEFAULT NULL,
+    InsID INT DEFAULT NULL,
+    Status ENUM('Admitted','Outpatient') NOT NULL DEFAULT 'Outpatient',
+    NextVisitCAID INT DEFAULT NULL,
+    NextVisitDate DATE DEFAULT NULL,
+    NextVisitTime TIME DEFAULT NULL,
+    NextVisitDEP_ID INT DEFAULT NULL,
+    NextVisitReason VARCHAR(100) DEFAULT NULL,
+    PRIMARY KEY (IID),
+    KEY idx_PatientSummary_FullName_IID (FullName, IID),
+    KEY idx_PatientSummary_Status_FullName_IID (Status, FullName, IID),
+    KEY idx_PatientSummary_NextVisitDate (NextVisitDate)
+) $$
+
+-- Recompute one patient's row, or every row when p_iid IS NULL (backfill,
+-- or after loading data with triggers disabled).
+DROP PROCEDURE IF EXISTS refresh_patient_summary $$
+CREATE PROCEDURE refresh_patient_summary(IN p_iid INT)
+BEGIN
+    DELETE FROM PatientSummary WHERE p_iid IS NULL OR IID = p_iid;
+
+    INSERT INTO PatientSummary (
+        IID, CIN, FullName, Sex, Birth, BloodGroup, Phone, City, InsID, Status,
+        NextVisitCAID, NextVisitDate, NextVisitTime, NextVisitDEP_ID, NextVisitReason
+    )
+    SELECT
+        P.`IID`,
+        P.`CIN`,
+        P.`FullName`,
+        P.`Sex`,
+        P.`Birth`,
+        P.`BloodGroup`,
+        P.`Phone`,
+        Loc.City,
+        Ins.InsID,
+        IF(Stat.Outcome <=> 'Admitted', 'Admitted', 'Outpatient'),
+        NA.CAID,
+        NA.ActivityDate,
+        NA.ActivityTime,
+        NA.DEP_ID,
+        NA.Reason
+    FROM `Patient` P
+    LEFT JOIN LATERAL (
+        SELECT CL.`City`
+        FROM `have` H
+        JOIN `ContactLocation` CL ON CL.`CLID` = H.`CLID`
+        WHERE H.`IID` = P.`IID`
+        ORDER BY H.`CLID`
+        LIMIT 1
+    ) Loc ON TRUE
+    LEFT JOIN LATERAL (
+        SELECT E.`InsID`
+        FROM `ClinicalActivity` CA
+        JOIN `Expense` E ON E.`CAID` = CA.`CAID`
+        WHERE CA.`IID` = P.`IID`
+        ORDER BY CA.`Date` DESC, COALESCE(CA.`Time`, '00:00:00') DESC, CA.`CAID` DESC
+        LIMIT 1
+    ) Ins ON TRUE
+    LEFT JOIN LATERAL (
+        SELECT EM.`Outcome`
+        FROM `ClinicalActivity` CA
+        LEFT JOIN `Emergency` EM ON EM.`CAID` = CA.`CAID`
+        WHERE CA.`IID` = P.`IID`
+        ORDER BY CA.`Date` DESC, COALESCE(CA.`Time`, '00:00:00') DESC, CA.`CAID` DESC
+        LIMIT 1
+    ) Stat ON TRUE
+    LEFT JOIN LATERAL (
+        SELECT
+            CA.`CAID`,
+            CA.`Date` AS ActivityDate,
+            CA.`Time` AS ActivityTime,
+            CA.`DEP_ID`,
+            A.`Reason`
+        FROM `ClinicalActivity` CA
+        JOIN `Appointment` A ON A.`CAID` = CA.`CAID`
+        WHERE CA.`IID` = P.`IID` AND CA.`Date` >= CURRENT_DATE
+        ORDER BY CA.`Date`, COALESCE(CA.`Time`, '00:00:00'), CA.`CAID`
+        LIMIT 1
+    ) NA ON TRUE
+    WHERE p_iid IS NULL OR P.`IID` = p_iid;
+END $$
+
+-- The next visit is relative to today, so rows whose visit has passed are
+-- recomputed once a day (requires event_scheduler=ON).
+DROP PROCEDURE IF EXISTS refresh_patient_summary_past_visits $$
+CREATE PROCEDURE refresh_patient_summary_past_visits()
+BEGIN
+    DECLARE v_done INT DEFAULT 0;
+    DECLARE v_iid INT;
+    DECLARE past_visits CURSOR FOR
+        SELECT IID FROM PatientSummary WHERE NextVisitDate < CURRENT_DATE;
+    DECLARE CONTINUE HANDLER FOR NOT FOUND SET v_done = 1;
+
+    OPEN past_visits;
+    read_loop: LOOP
+        FETCH past_visits INTO v_iid;
+        IF v_done THEN
+            LEAVE read_loop;
+        END IF;
+        CALL refresh_patient_summary(v_iid);
+    END LOOP;
+    CLOSE past_visits;
+END $$
+
+DROP EVENT IF EXISTS ev_patient_summary_past_visits $$
+CREATE EVENT ev_patient_summary_past_visits
+ON SCHEDULE EVERY 1 DAY
+STARTS CURRENT_DATE + INTERVAL 1 DAY + INTERVAL 1 MINUTE
+DO CALL refresh_patient_summary_past_visits() $$
+
+DROP TRIGGER IF EXISTS trg_patient_after_insert_patient_summary $$
+CREATE TRIGGER trg_patient_after_insert_patient_summary
+AFTER INSERT ON Patient
+FOR EACH ROW
+BEGIN
+    IF @mnhs_bulk_load IS NULL THEN
+        CALL refresh_patient_summary(NEW.IID);
+    END IF;
+END $$
+
+DROP TRIGGER IF EXISTS trg_patient_after_update_patient_summary $$
+CREATE TRIGGER trg_patient_after_update_patient_summary
+AFTER UPDATE ON Patient
+FOR EACH ROW
+BEGIN
+    IF NEW.IID <> OLD.IID THEN
+        DELETE FROM PatientSummary WHERE IID = OLD.IID;
+    END IF;
+    CALL refresh_patient_summary(NEW.IID);
+END $$
+
+DROP TRIGGER IF EXISTS trg_patient_after_delete_patient_summary $$
+CREATE TRIGGER trg_patient_after_delete_patient_summary
+AFTER DELETE ON Patient
+FOR EACH ROW
+BEGIN
+    DELETE FROM PatientSummary WHERE IID = OLD.IID;
+END $$
+
+-- Activities drive insurance, status and next visit. Cascaded deletes of
+-- Appointment/Emergency rows fire no triggers; the delete below covers them.
+DROP TRIGGER IF EXISTS trg_ca_after_insert_patient_summary $$
+CREATE TRIGGER trg_ca_after_insert_patient_summary
+AFTER INSERT ON ClinicalActivity
+FOR EACH ROW
+BEGIN
+    IF @mnhs_bulk_load IS NULL THEN
+        CALL refresh_patient_summary(NEW.IID);
+    END IF;
+END $$
+
+DROP TRIGGER IF EXISTS trg_ca_after_update_patient_summary $$
+CREATE TRIGGER trg_ca_after_update_patient_summary
+AFTER UPDATE ON ClinicalActivity
+FOR EACH ROW
+BEGIN
+    IF NOT (NEW.IID <=> OLD.IID AND NEW.Date <=> OLD.Date
+            AND NEW.Time <=> OLD.Time AND NEW.DEP_ID <=> OLD.DEP_ID) THEN
+        IF NEW.IID <> OLD.IID THEN
+            CALL refresh_patient_summary(OLD.IID);
+        END IF;
+        CALL refresh_patient_summary(NEW.IID);
+    END IF;
+END $$
+
+DROP TRIGGER IF EXISTS trg_ca_after_delete_patient_summary $$
+CREATE TRIGGER trg_ca_after_delete_patient_summary
+AFTER DELETE ON ClinicalActivity
+FOR EACH ROW
+BEGIN
+    CALL refresh_patient_summary(OLD.IID);
+END $$
+
+-- Appointment, Expense and Emergency reach the patient through their CAID.
+DROP PROCEDURE IF EXISTS refresh_patient_summary_for_activity $$
+CREATE PROCEDURE refresh_patient_summary_for_activity(IN p_caid INT)
+BEGIN
+    DECLARE v_iid INT;
+    SELECT C.`IID` INTO v_iid FROM `ClinicalActivity` C WHERE C.`CAID` = p_caid;
+    IF v_iid IS NOT NULL THEN
+        CALL refresh_patient_summary(v_iid);
+    END IF;
+END $$
+
+DROP TRIGGER IF EXISTS trg_appointment_after_insert_patient_summary $$
+CREATE TRIGGER trg_appointment_after_insert_patient_summary
+AFTER INSERT ON Appointment
+FOR EACH ROW
+BEGIN
+    IF @mnhs_bulk_load IS NULL THEN
+        CALL refresh_patient_summary_for_activity(NEW.CAID);
+    END IF;
+END $$
+
+-- Status changes do not affect the next visit, so only Reason/CAID matter.
+DROP TRIGGER IF EXISTS trg_appointment_after_update_patient_summary $$
+CREATE TRIGGER trg_appointment_after_update_patient_summary
+AFTER UPDATE ON Appointment
+FOR EACH ROW
+BEGIN
+    IF NOT (NEW.CAID = OLD.CAID AND NEW.Reason <=> OLD.Reason) THEN
+        IF NEW.CAID <> OLD.CAID THEN
+            CALL refresh_patient_summary_for_activity(OLD.CAID);
+        END IF;
+        CALL refresh_patient_summary_for_activity(NEW.CAID);
+    END IF;
+END $$
+
+DROP TRIGGER IF EXISTS trg_appointment_after_delete_patient_summary $$
+CREATE TRIGGER trg_appointment_after_delete_patient_summary
+AFTER DELETE ON Appointment
+FOR EACH ROW
+BEGIN
+    CALL refresh_patient_summary_for_activity(OLD.CAID);
+END $$
+
+DROP TRIGGER IF EXISTS trg_expense_after_insert_patient_summary $$
+CREATE TRIGGER trg_expense_after_insert_patient_summary
+AFTER INSERT ON Expense
+FOR EACH ROW
+BEGIN
+    IF @mnhs_bulk_load IS NULL THEN
+        CALL refresh_patient_summary_for_activity(NEW.CAID);
+    END IF;
+END $$
+
+-- Total recomputations (calculate_expense) leave the summary untouched.
+DROP TRIGGER IF EXISTS trg_expense_after_update_patient_summary $$
+CREATE TRIGGER trg_expense_after_update_patient_summary
+AFTER UPDATE ON Expense
+FOR EACH ROW
+BEGIN
+    IF NOT (NEW.CAID = OLD.CAID AND NEW.InsID <=> OLD.InsID) THEN
+        IF NEW.CAID <> OLD.CAID THEN
+            CALL refresh_patient_summary_for_activity(OLD.CAID);
+        END IF;
+        CALL refresh_patient_summary_for_activity(NEW.CAID);
+    END IF;
+END $$
+
+DROP TRIGGER IF EXISTS trg_expense_after_delete_patient_summary $$
+CREATE TRIGGER trg_expense_after_delete_patient_summary
+AFTER DELETE ON Expense
+FOR EACH ROW
+BEGIN
+    CALL refresh_patient_summary_for_activity(OLD.CAID);
+END $$
+
+DROP TRIGGER IF EXISTS trg_emergency_after_insert_patient_summary $$
+CREATE TRIGGER trg_emergency_after_insert_patient_summary
+AFTER INSERT ON Emergency
+FOR EACH ROW
+BEGIN
+    IF @mnhs_bulk_load IS NULL THEN
+        CALL refresh_patient_summary_for_activity(NEW.CAID);
+    END IF;
+END $$
+
+DROP TRIGGER IF EXISTS trg_emergency_after_update_patient_summary $$
+CREATE TRIGGER trg_emergency_after_update_patient_summary
+AFTER UPDATE ON Emergency
+FOR EACH ROW
+BEGIN
+    IF NOT (NEW.CAID = OLD.CAID AND NEW.Outcome <=> OLD.Outcome) THEN
+        IF NEW.CAID <> OLD.CAID THEN
+            CALL refresh_patient_summary_for_activity(OLD.CAID);
+        END IF;
+        CALL refresh_patient_summary_for_activity(NEW.CAID);
+    END IF;
+END $$
+
+DROP TRIGGER IF EXISTS trg_emergency_after_delete_patient_summary $$
+CREATE TRIGGER trg_emergency_after_delete_patient_summary
+AFTER DELETE ON Emergency
+FOR EACH ROW
+BEGIN
+    CALL refresh_patient_summary_for_activity(OLD.CAID);
+END $$
+
+-- The primary location is the patient's lowest CLID in have.
+DROP TRIGGER IF EXISTS trg_have_after_insert_patient_summary $$
+CREATE TRIGGER trg_have_after_insert_patient_summary
+AFTER INSERT ON have
+FOR EACH ROW
+BEGIN
+    IF @mnhs_bulk_load IS NULL THEN
+        CALL refresh_patient_summary(NEW.IID);
+    END IF;
+END $$
+
+DROP TRIGGER IF EXISTS trg_have_after_update_patient_summary $$
+CREATE TRIGGER trg_have_after_update_patient_summary
+AFTER UPDATE ON have
+FOR EACH ROW
+BEGIN
+    IF NEW.IID <> OLD.IID THEN
+        CALL refresh_patient_summary(OLD.IID);
+    END IF;
+    CALL refresh_patient_summary(NEW.IID);
+END $$
+
+DROP TRIGGER IF EXISTS trg_have_after_delete_patient_summary $$
+CREATE TRIGGER trg_have_after_delete_patient_summary
+AFTER DELETE ON have
+FOR EACH ROW
+BEGIN
+    CALL refresh_patient_summary(OLD.IID);
+END $$
+
+DROP TRIGGER IF EXISTS trg_contact_location_after_update_patient_summary $$
+CREATE TRIGGER trg_contact_location_after_update_patient_summary
+AFTER UPDATE ON ContactLocation
+FOR EACH ROW
+BEGIN
+    IF NOT (NEW.City <=> OLD.City) THEN
+        UPDATE PatientSummary PS
+        JOIN `have` H ON H.`IID` = PS.IID AND H.`CLID` = NEW.CLID
+        SET PS.City = (
+            SELECT CL.`City`
+            FROM `have` H2
+            JOIN `ContactLocation` CL ON CL.`CLID` = H2.`CLID`
+            WHERE H2.`IID` = PS.IID
+            ORDER BY H2.`CLID`
+            LIMIT 1
+        );
+    END IF;
+END $$
+
+DELIMITER ;
+
+CALL refresh_billing_daily(NULL, NULL);
+CALL refresh_stock_current();
+CALL refresh_patient_summary(NULL);
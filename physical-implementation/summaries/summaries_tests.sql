@@ -0,0 +1,123 @@
+-- 1. BillingDaily
+CALL refresh_billing_daily(NULL, NULL);
+
+SELECT *
+FROM BillingDaily
+ORDER BY ActivityDate, HID, DEP_ID, InsID;
+
+-- Must return no rows: the summary matches a fresh aggregation of Expense.
+SELECT C.Date, C.DEP_ID, COALESCE(E.InsID, 0) AS InsID, SUM(E.Total) AS Total, COUNT(*) AS Cnt
+FROM Expense E
+JOIN ClinicalActivity C ON C.CAID = E.CAID
+GROUP BY C.Date, C.DEP_ID, COALESCE(E.InsID, 0)
+HAVING (Total, Cnt) NOT IN (
+    SELECT BD.Total, BD.ExpenseCount
+    FROM BillingDaily BD
+    WHERE BD.ActivityDate = C.Date AND BD.DEP_ID = C.DEP_ID AND BD.InsID = COALESCE(E.InsID, 0)
+);
+
+INSERT INTO ClinicalActivity (CAID, IID, STAFF_ID, DEP_ID, Date, Time)
+VALUES (60000, 1, 501, 10, '2025-12-02', '08:00:00');
+
+INSERT INTO Expense (InsID, CAID, Total)
+VALUES (100, 60000, 250.00);
+
+SELECT *
+FROM BillingDaily
+WHERE ActivityDate = '2025-12-02';
+
+UPDATE Expense
+SET Total = 300.00, InsID = NULL
+WHERE CAID = 60000;
+
+SELECT *
+FROM BillingDaily
+WHERE ActivityDate = '2025-12-02';
+
+UPDATE ClinicalActivity
+SET Date = '2025-12-03'
+WHERE CAID = 60000;
+
+SELECT *
+FROM BillingDaily
+WHERE ActivityDate IN ('2025-12-02', '2025-12-03');
+
+DELETE FROM Expense
+WHERE CAID = 60000;
+
+SELECT *
+FROM BillingDaily
+WHERE ActivityDate IN ('2025-12-02', '2025-12-03');
+
+
+-- 2. StockCurrent
+CALL refresh_stock_current();
+
+-- Must return no rows: every (HID, MID) holds its latest Stock entry.
+SELECT S.HID, S.MID, S.StockTimestamp, S.Qty
+FROM Stock S
+WHERE S.StockTimestamp = (
+    SELECT MAX(S2.StockTimestamp) FROM Stock S2 WHERE S2.HID = S.HID AND S2.MID = S.MID
+)
+AND NOT EXISTS (
+    SELECT 1 FROM StockCurrent SC
+    WHERE SC.HID = S.HID AND SC.MID = S.MID
+      AND SC.StockTimestamp = S.StockTimestamp
+      AND SC.Qty <=> S.Qty
+      AND SC.UnitPrice <=> S.UnitPrice
+      AND SC.ReorderLevel <=> S.ReorderLevel
+);
+
+-- Must return no rows: no (HID, MID) is missing or duplicated.
+SELECT HID, MID FROM Stock GROUP BY HID, MID
+HAVING (HID, MID) NOT IN (SELECT HID, MID FROM StockCurrent);
+
+
+-- 3. PatientSummary
+CALL refresh_patient_summary(NULL);
+
+-- Must return no rows: every patient has exactly one summary row.
+SELECT P.IID FROM Patient P
+WHERE NOT EXISTS (SELECT 1 FROM PatientSummary PS WHERE PS.IID = P.IID)
+UNION ALL
+SELECT PS.IID FROM PatientSummary PS
+WHERE NOT EXISTS (SELECT 1 FROM Patient P WHERE P.IID = PS.IID);
+
+INSERT INTO Patient (IID, CIN, FullName, Birth, Sex, BloodGroup, Phone)
+VALUES (99990, 'ZZ99990', 'Summary Test', '1990-01-01', 'F', 'O+', '0600000000');
+
+INSERT INTO ContactLocation (City) VALUES ('Summaryville');
+INSERT INTO have (IID, CLID) VALUES (99990, LAST_INSERT_ID());
+
+INSERT INTO ClinicalActivity (CAID, IID, STAFF_ID, DEP_ID, Date, Time)
+VALUES (60001, 99990, 501, 10, CURRENT_DATE + INTERVAL 7 DAY, '09:00:00'),
+       (60002, 99990, 501, 10, CURRENT_DATE - INTERVAL 1 DAY, '10:00:00');
+
+INSERT INTO Appointment (CAID, Reason, Status)
+VALUES (60001, 'Follow-up', 'Scheduled');
+
+INSERT INTO Emergency (CAID, TriageLevel, Outcome)
+VALUES (60002, 2, 'Admitted');
+
+INSERT INTO Expense (InsID, CAID, Total)
+VALUES (101, 60002, 120.00);
+
+-- Expect City 'Summaryville', InsID 101, Status 'Admitted', next visit 60001.
+SELECT *
+FROM PatientSummary
+WHERE IID = 99990;
+
+UPDATE Emergency SET Outcome = 'Discharged' WHERE CAID = 60002;
+DELETE FROM Appointment WHERE CAID = 60001;
+
+-- Expect Status 'Outpatient' and no next visit.
+SELECT IID, Status, NextVisitCAID, NextVisitDate
+FROM PatientSummary
+WHERE IID = 99990;
+
+DELETE FROM Expense WHERE CAID = 60002;
+DELETE FROM ClinicalActivity WHERE CAID IN (60001, 60002);
+DELETE FROM Patient WHERE IID = 99990;
+
+-- Expect no rows.
+SELECT * FROM PatientSummary WHERE IID = 99990;
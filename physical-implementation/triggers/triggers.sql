@@ -1,111 +1,136 @@
 DELIMITER $$
 -- 1. Reject double booking for a staff member
+--    The new appointment's slot is read by primary key, then checked with a
+--    point lookup on idx_ClinicalActivity_STAFF_ID_Date_Time (indexes.sql)
+--    instead of joining every booked activity to every other one.
+--    Sessions that set @mnhs_bulk_load (app/seed/load.py) skip the insert
+--    check; the loader looks for double bookings in one query afterwards.
+
+DROP PROCEDURE IF EXISTS assert_staff_slot_free $$
+CREATE PROCEDURE assert_staff_slot_free(IN p_caid INT)
+BEGIN
+    DECLARE v_staff_id INT;
+    DECLARE v_date DATE;
+    DECLARE v_time TIME;
+
+    SELECT C.`STAFF_ID`, C.`Date`, C.`Time` INTO v_staff_id, v_date, v_time
+    FROM `ClinicalActivity` C WHERE C.`CAID` = p_caid;
+
+    IF v_time IS NOT NULL AND EXISTS (
+        SELECT 1 FROM `ClinicalActivity` C
+        JOIN `Appointment` A ON A.`CAID` = C.`CAID`
+        WHERE C.`STAFF_ID` = v_staff_id
+          AND C.`Date` = v_date
+          AND C.`Time` = v_time
+          AND C.`CAID` <> p_caid
+    ) THEN
+        SET @errorMsg = CONCAT('Double booking for CAID: ', p_caid);
+        SIGNAL SQLSTATE '45000'
+            SET MESSAGE_TEXT = @errorMsg;
+    END IF;
+END $$
 
-
+DROP TRIGGER IF EXISTS trg_no_double_booking_before_insert $$
 CREATE TRIGGER trg_no_double_booking_before_insert
 BEFORE INSERT ON Appointment
 FOR EACH ROW
-
 BEGIN
-    IF EXISTS (    SELECT 1 FROM `ClinicalActivity` C
-    JOIN `Appointment` A ON A.`CAID` = C.`CAID`
-    JOIN `ClinicalActivity` C2
-    ON C2.`CAID`=NEW.CAID 
-    AND C2.`STAFF_ID`=C.`STAFF_ID` 
-    AND C.`Time` = C2.`Time` 
-    AND C.`Date`=C2.`Date`
-    AND C.`CAID` <> C2.`CAID`)
-    THEN
-    SET @errorMsg = CONCAT('Double booking for CAID: ', NEW.CAID);
-    SIGNAL SQLSTATE '45000'
-		
-        SET MESSAGE_TEXT = @errorMsg;
+    IF @mnhs_bulk_load IS NULL THEN
+        CALL assert_staff_slot_free(NEW.CAID);
     END IF;
 END $$
 
+DROP TRIGGER IF EXISTS trg_no_double_booking_before_update $$
 CREATE TRIGGER trg_no_double_booking_before_update
 BEFORE UPDATE ON Appointment
 FOR EACH ROW
-
 BEGIN
-    IF EXISTS (    SELECT 1 FROM `ClinicalActivity` C
-    JOIN `Appointment` A ON A.`CAID` = C.`CAID`
-    JOIN `ClinicalActivity` C2
-    ON C2.`CAID`=NEW.CAID 
-    AND C2.`STAFF_ID`=C.`STAFF_ID` 
-    AND C.`Time` = C2.`Time` 
-    AND C.`Date`=C2.`Date`
-    AND C.`CAID` <> C2.`CAID`)
-    THEN
-    SET @errorMsg = CONCAT('Double booking for CAID: ', NEW.CAID);
-    SIGNAL SQLSTATE '45000'
-		
-        SET MESSAGE_TEXT = @errorMsg;
-    END IF;
+    CALL assert_staff_slot_free(NEW.CAID);
 END $$
 
 
 -- 2. Recompute Expense.Total when prescription lines change.
+--    Only a change of medication (MID) or prescription (PID) moves the price;
+--    Dosage/Duration edits leave the expense alone. MySQL triggers are row
+--    level only, so bulk corrections set @mnhs_defer_expense_recompute = 1:
+--    the trigger then just collects CAIDs in @mnhs_pending_expense_caids and
+--    the caller runs recompute_expenses once for the whole batch
+--    (src/pages/billing.py: deferred_expense_recompute).
 
 DROP FUNCTION IF EXISTS calculate_expense $$
 CREATE FUNCTION calculate_expense(CAID INT) RETURNS DECIMAL(10,2) READS SQL DATA
 BEGIN
 	DECLARE null_cnt int default 0;
     DECLARE sum_prices DECIMAL(10,2) default 0;
-    SELECT count(*) INTO null_cnt
-FROM (
-        SELECT S.*, ROW_NUMBER() OVER (
-                PARTITION BY
-                    S.`MID`
-                ORDER BY S.`StockTimestamp` DESC
-            ) as rn_m
-        from
-            `ClinicalActivity` C
-            JOIN `Prescription` P ON P.`CAID` = C.`CAID`
-            JOIN `Includes` I ON I.`PID` = P.`PID`
-            JOIN `Department` D ON D.`DEP_ID` = C.`DEP_ID`
-            JOIN `Hospital` H ON H.`HID` = D.`HID`
-            LEFT JOIN `Stock` S ON (
-                S.`MID` = I.`MID`
-                AND S.`HID` = H.`HID`
-            )
-        WHERE
-            C.`CAID` = CAID
-    ) X
-WHERE X.rn_m=1 and UnitPrice IS null;
+    -- StockCurrent holds the latest price per (HID, MID), so each
+    -- prescribed medication is a primary key lookup; missing prices and the
+    -- total come out of the same pass.
+    SELECT count(*) - count(S.`UnitPrice`), SUM(S.`UnitPrice`)
+    INTO null_cnt, sum_prices
+FROM
+    `ClinicalActivity` C
+    JOIN `Prescription` P ON P.`CAID` = C.`CAID`
+    JOIN `Includes` I ON I.`PID` = P.`PID`
+    JOIN `Department` D ON D.`DEP_ID` = C.`DEP_ID`
+    LEFT JOIN `StockCurrent` S ON (
+        S.`MID` = I.`MID`
+        AND S.`HID` = D.`HID`
+    )
+WHERE
+    C.`CAID` = CAID;
 
 	IF null_cnt > 0
     THEN
     SIGNAL SQLSTATE '45000'
         SET MESSAGE_TEXT = 'Missing unit price.';
     END IF;
-    
-    SELECT SUM(`UnitPrice`) INTO sum_prices
-FROM (
-        SELECT S.*, ROW_NUMBER() OVER (
-                PARTITION BY
-                    S.`MID`
-                ORDER BY S.`StockTimestamp` DESC
-            ) as rn_m
-        from
-            `ClinicalActivity` C
-            JOIN `Prescription` P ON P.`CAID` = C.`CAID`
-            JOIN `Includes` I ON I.`PID` = P.`PID`
-            JOIN `Department` D ON D.`DEP_ID` = C.`DEP_ID`
-            JOIN `Hospital` H ON H.`HID` = D.`HID`
-            LEFT JOIN `Stock` S ON (
-                S.`MID` = I.`MID`
-                AND S.`HID` = H.`HID`
-            )
-        WHERE
-            C.`CAID` = CAID
-    ) X
-WHERE X.rn_m=1 ;
 
 return sum_prices;
-        
+END $$
+
 
+-- Set-based form of calculate_expense: p_caids is a JSON array of CAIDs
+-- (duplicates and NULLs are fine). Every listed activity that has
+-- prescription lines gets its Expense.Total rewritten once, by one grouped
+-- join; activities without lines keep their captured total.
+DROP PROCEDURE IF EXISTS recompute_expenses $$
+CREATE PROCEDURE recompute_expenses(IN p_caids JSON)
+BEGIN
+    IF EXISTS (
+        SELECT 1
+        FROM JSON_TABLE(p_caids, '$[*]' COLUMNS (`CAID` INT PATH '$')) J
+        JOIN `ClinicalActivity` C ON C.`CAID` = J.`CAID`
+        JOIN `Prescription` P ON P.`CAID` = C.`CAID`
+        JOIN `Includes` I ON I.`PID` = P.`PID`
+        JOIN `Department` D ON D.`DEP_ID` = C.`DEP_ID`
+        LEFT JOIN `StockCurrent` S ON (
+            S.`MID` = I.`MID`
+            AND S.`HID` = D.`HID`
+        )
+        WHERE S.`UnitPrice` IS NULL
+    ) THEN
+        SIGNAL SQLSTATE '45000'
+            SET MESSAGE_TEXT = 'Missing unit price.';
+    END IF;
 
+    UPDATE `Expense` E
+    JOIN (
+        SELECT C.`CAID`, SUM(S.`UnitPrice`) AS `Total`
+        FROM (
+            SELECT DISTINCT J.`CAID`
+            FROM JSON_TABLE(p_caids, '$[*]' COLUMNS (`CAID` INT PATH '$')) J
+        ) A
+        JOIN `ClinicalActivity` C ON C.`CAID` = A.`CAID`
+        JOIN `Prescription` P ON P.`CAID` = C.`CAID`
+        JOIN `Includes` I ON I.`PID` = P.`PID`
+        JOIN `Department` D ON D.`DEP_ID` = C.`DEP_ID`
+        JOIN `StockCurrent` S ON (
+            S.`MID` = I.`MID`
+            AND S.`HID` = D.`HID`
+        )
+        GROUP BY C.`CAID`
+    ) T ON T.`CAID` = E.`CAID`
+    SET E.`Total` = T.`Total`;
 END $$
 
 
@@ -114,17 +139,27 @@ CREATE  TRIGGER trg_iclude_after_update
 AFTER UPDATE ON Includes
 FOR EACH ROW
 BEGIN 
-	declare new_total decimal(10,2);
-    declare caid int;
-    declare expid int;
-    SELECT P.`CAID` INTO caid   FROM `Prescription` P WHERE P.`PID`=NEW.PID;
-    SELECT E.`ExpID` into expid from `Expense` E WHERE E.`CAID`=caid;
-    SET new_total = calculate_expense( caid);
-    UPDATE `Expense` SET `Total`=new_total WHERE `ExpID`=expid;
+    declare new_caid int;
+    declare old_caid int;
+    IF NOT (NEW.PID <=> OLD.PID AND NEW.MID <=> OLD.MID) THEN
+        SELECT P.`CAID` INTO new_caid FROM `Prescription` P WHERE P.`PID`=NEW.PID;
+        SELECT P.`CAID` INTO old_caid FROM `Prescription` P WHERE P.`PID`=OLD.PID;
+        IF @mnhs_defer_expense_recompute THEN
+            SET @mnhs_pending_expense_caids = JSON_ARRAY_APPEND(
+                COALESCE(@mnhs_pending_expense_caids, JSON_ARRAY()),
+                '$', new_caid, '$', old_caid
+            );
+        ELSE
+            -- A line moved to another prescription reprices both activities.
+            CALL recompute_expenses(JSON_ARRAY(new_caid, old_caid));
+        END IF;
+    END IF;
 END $$
 
 	
 -- 3.Prevent negative or inconsistent stock.
+--   Bulk loads (@mnhs_bulk_load set) skip the insert check; the loader
+--   counts offending Stock rows once the data is in.
 
 	
 
@@ -132,7 +167,11 @@ CREATE TRIGGER trg_stock_before_insert
 AFTER INSERT ON Stock
 FOR EACH ROW
 	
-BEGIN 
+stock_check: BEGIN 
+
+   IF @mnhs_bulk_load IS NOT NULL THEN
+	  LEAVE stock_check;
+   END IF;
 	
    IF NEW.Qty<0 THEN
 	  SIGNAL SQLSTATE '45000'
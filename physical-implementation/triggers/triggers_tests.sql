@@ -34,3 +34,30 @@ SET UnitPrice = 0.00
 WHERE HID = 1 AND MID = 9000
 ORDER BY StockTimestamp DESC
 LIMIT 1;
+
+-- Expense recomputation: a Dosage edit keeps the total, a medication change
+-- reprices it, and recompute_expenses handles a batch (duplicates included).
+INSERT INTO Medication (MID, Name, Form, Strength, ActiveIngredient, TherapeuticClass, Manufacturer)
+VALUES (9001, 'TempMed2', 'Tab', '20mg', 'Y', 'Test', 'Lab');
+
+INSERT INTO Stock (HID, MID, StockTimestamp, UnitPrice, Qty, ReorderLevel)
+VALUES (1, 9001, '2025-11-20 08:00:00', 35.00, 10, 5);
+
+INSERT INTO Expense (InsID, CAID, Total) VALUES (NULL, 50000, 1.00);
+
+UPDATE Includes SET Dosage = '3' WHERE PID = 9000 AND MID = 9000;
+SELECT Total AS expect_1_00 FROM Expense WHERE CAID = 50000;
+
+UPDATE Includes SET MID = 9001 WHERE PID = 9000 AND MID = 9000;
+SELECT Total AS expect_35_00 FROM Expense WHERE CAID = 50000;
+
+UPDATE Expense SET Total = 1.00 WHERE CAID = 50000;
+CALL recompute_expenses('[50000, 50000, 50001]');
+SELECT Total AS expect_35_00 FROM Expense WHERE CAID = 50000;
+
+SET @mnhs_defer_expense_recompute = 1, @mnhs_pending_expense_caids = JSON_ARRAY();
+UPDATE Includes SET MID = 9000 WHERE PID = 9000 AND MID = 9001;
+SELECT @mnhs_pending_expense_caids AS expect_50000_pending;
+CALL recompute_expenses(@mnhs_pending_expense_caids);
+SELECT Total AS expect_latest_9000_price FROM Expense WHERE CAID = 50000;
+SET @mnhs_defer_expense_recompute = NULL, @mnhs_pending_expense_caids = NULL;